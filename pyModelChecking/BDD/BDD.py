@@ -1,96 +1,1272 @@
-from weakref import WeakSet
-from .ordering import Ordering
+import weakref
 
+from array import array
+from itertools import islice, product
 
-def BDDsons_and_BDD(operator, A, B, ordering, r_cache):
-    low = apply(operator, A.low, B, ordering, r_cache)
-    high = apply(operator, A.high, B, ordering, r_cache)
-    return BDDNonTerminalNode(A.var, low, high)
+from .ordering import Ordering, cmp_to_key
 
+# the handles of the terminal nodes: the second one is the complemented
+# edge to the first one
+FALSE = 0
+TRUE = 1
 
-def BDD_and_BDDsons(operator, A, B, ordering, r_cache):
-    low = apply(operator, A, B.low, ordering, r_cache)
-    high = apply(operator, A, B.high, ordering, r_cache)
-    return BDDNonTerminalNode(B.var, low, high)
+# the variable index of terminal and free rows
+TERMINAL = -1
+FREE = -2
 
 
-def BDDsons_and_BDDsons(operator, A, B, ordering, r_cache):
-    low = apply(operator, A.low, B.low, ordering, r_cache)
-    high = apply(operator, A.high, B.high, ordering, r_cache)
-    return BDDNonTerminalNode(A.var, low, high)
+class ComputedTable(object):
+    r'''
+    A class to represent size-bounded tables of BDD operation results.
+
+    Keys are integers that pack an operation identifier (see
+    :meth:`BDDManager.operation_id`), shifted by 96 bits, together with at
+    most three 32-bit operand handles, so that distinct operations never
+    share keys.
+    Whenever the table exceeds its bound, the oldest half of its entries is
+    evicted: this is cheaper than a least-recently-used policy. The BDD
+    operations check the bound once they have completed, so the table may
+    temporarily exceed it while an operation is running.
+    '''
 
+    def __init__(self, max_entries=None):
+        r''' Initialize a new computed table
 
-def apply(operator, A, B, ordering, r_cache):
-    if A not in r_cache:
-        r_cache[A] = dict()
+        :param max_entries: the maximum number of stored results or None for
+                            no bound
+        :type max_entries: int
+        '''
+        self.max_entries = max_entries
+        self.entries = dict()
 
-    if B in r_cache[A]:
-        return r_cache[A][B]
+        self.hits = 0
+        self.misses = 0
 
-    r_cache[A][B] = compute(operator, A, B, ordering, r_cache)
+    def __contains__(self, key):
+        return key in self.entries
 
-    return r_cache[A][B]
+    def __len__(self):
+        return len(self.entries)
 
+    def get(self, key, default=None):
+        r''' Return the result associated to a key
 
-def compute(operator, A, B, ordering, r_cache):
-    if isinstance(A, BDDTerminalNode):
-        if isinstance(B, BDDTerminalNode):
-            return BDDTerminalNode(operator(A.value, B.value))
+        :param key: the key to be searched
+        :param default: the value to be returned when the key is not stored
+        :returns: the value associated to :param key:, if it is stored,
+                  :param default:, otherwise
+        '''
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
 
-        return BDD_and_BDDsons(operator, A, B, ordering, r_cache)
+            return default
 
-    if (isinstance(B, BDDTerminalNode) or ordering.in_order(A.var, B.var)):
-        return BDDsons_and_BDD(operator, A, B, ordering, r_cache)
+        self.hits += 1
 
-    if A.var == B.var:
-        return BDDsons_and_BDDsons(operator, A, B, ordering, r_cache)
+        return value
 
-    if ordering.in_order(B.var, A.var):
-        return BDD_and_BDDsons(operator, A, B, ordering, r_cache)
+    def __setitem__(self, key, value):
+        self.entries[key] = value
 
-    raise RuntimeError('Unsupported configuration %s %s' % A,  B)
+        if (self.max_entries is not None and
+                len(self.entries) > self.max_entries):
+            self.evict()
 
+    def evict(self):
+        r''' Remove the oldest half of the stored results
 
-def descendents(root, checked=None):
-    if checked is None:
-        checked = set()
+        The table is shrunk below its bound whenever it is needed.
+        '''
+        entries = self.entries
+
+        num_of_evicted = len(entries) - len(entries) // 2
+        if self.max_entries is not None:
+            num_of_evicted = max(num_of_evicted,
+                                 len(entries) - self.max_entries)
+
+        for key in list(islice(entries, num_of_evicted)):
+            del entries[key]
+
+    def clear(self):
+        r''' Remove all the stored results
+        '''
+        self.entries.clear()
+
+    def __str__(self):
+        return ('ComputedTable(entries={}, '.format(len(self.entries)) +
+                'hits={}, misses={})'.format(self.hits, self.misses))
+
+
+class BDDManager(object):
+    r'''
+    A class to represent the store of all the BDD nodes.
+
+    Nodes are rows of three parallel integer arrays, `var`, `low` and
+    `high`, and they are referred by complementable edges: the handle of
+    an edge is twice the index of the row it points to plus its complement
+    bit and the edge represents the negation of the function of the node
+    whenever the bit is set. Thus, negation is a constant time operation.
+    Row 0 is the unique terminal node and the handles :data:`FALSE` and
+    :data:`TRUE` are the regular and the complemented edges to it. The
+    variables labelling non-terminal nodes are stored as indices of the
+    list `var_names`. In order to keep the representation canonical, the
+    low edge of every node is regular.
+
+    The unique table maps every triple :math:`(var, low, high)` into the
+    row of the node labelled by :math:`var` whose sons are :math:`low`
+    and :math:`high`, so that isomorphic nodes are never built twice. The
+    computed table is a size-bounded :class:`ComputedTable` that stores the
+    results of the BDD operations, keyed by the operation and by its
+    operands, and it is shared among all the calls of the operations.
+    All the binary operations are reduced to the if-then-else operator
+    (see :func:`ite`), whose operands are normalized to standard triples
+    before accessing the computed table.
+
+    :class:`BDDNode` objects are lightweight views of the rows that are
+    built on demand and that are unique for each handle. The nodes that
+    are not reachable from any living :class:`BDDNode` are dead and they
+    are reclaimed by a mark-and-sweep collection (see
+    :meth:`BDDManager.collect`).
+    '''
+
+    def __init__(self, cache_size=2**18, gc_threshold=2**20):
+        r''' Initialize a BDD manager
+
+        :param cache_size: the maximum number of results stored in the
+                           computed table or None for no bound
+        :type cache_size: int
+        :param gc_threshold: the number of nodes in the store that triggers
+                             a garbage collection. After any collection,
+                             the threshold is raised to twice the number of
+                             living nodes, whenever this is greater
+        :type gc_threshold: int
+        '''
+        self.var = array('i', [TERMINAL])
+        self.low = array('i', [FALSE])
+        self.high = array('i', [FALSE])
+
+        self.var_names = []
+        self.var_indices = dict()
+
+        self.unique = dict()
+        self.free = []
+
+        self.computed = ComputedTable(max_entries=cache_size)
+        self.operations = dict()
+        self._ranks = dict()
+
+        self.gc_threshold = gc_threshold
+        self.collections = 0
+        self._next_collection = gc_threshold
+
+        self._reorder = None
+        self.reordering_threshold = None
+        self._next_reordering = None
+
+        self._views = weakref.WeakValueDictionary()
+        self._terminals = [self.node(FALSE), self.node(TRUE)]
+
+    def var_index(self, var):
+        r''' Return the index of a variable
+
+        :param var: variable name
+        :type var: str
+        :returns: the index of :param var: in `var_names`. The variable is
+                  added to `var_names` whenever it is not there yet
+        :rtype: int
+        '''
+        index = self.var_indices.get(var)
+        if index is None:
+            index = len(self.var_names)
+            self.var_names.append(var)
+            self.var_indices[var] = index
+
+        return index
+
+    def operation_id(self, operation):
+        r''' Return the identifier of an operation
+
+        :param operation: a hashable object that describes an operation
+                          and its parameters other than the operands,
+                          e.g., the operator and the variable ordering
+        :returns: a non-negative integer that identifies :param operation:
+                  in the keys of the computed table
+        :rtype: int
+        '''
+        op_id = self.operations.get(operation)
+        if op_id is None:
+            op_id = len(self.operations)
+            self.operations[operation] = op_id
+
+        return op_id
+
+    def ranks(self, ordering):
+        r''' Return the positions of the variables in an ordering
+
+        :param ordering: a variable ordering
+        :type ordering: Ordering
+        :returns: a list that associates the index of every variable in
+                  `var_names` to its position in :param ordering:, or
+                  None whenever the variable is not in :param ordering:
+        :rtype: list
+        '''
+        ranks = self._ranks.get(ordering)
+        if ranks is None or len(ranks) < len(self.var_names):
+            ranks = [None] * len(self.var_names)
+
+            in_ordering = [var for var in self.var_names if var in ordering]
+            in_ordering.sort(key=cmp_to_key(ordering.cmp))
+            for position, var in enumerate(in_ordering):
+                ranks[self.var_indices[var]] = position
+
+            self._ranks[ordering] = ranks
+
+        return ranks
+
+    def make_node(self, var, low, high):
+        r''' Return the handle of a node
+
+        :param var: the index of the variable labelling the node
+        :type var: int
+        :param low: the handle of the low son
+        :type low: int
+        :param high: the handle of the high son
+        :type high: int
+        :returns: the handle of the edge to the node labelled by
+                  :param var: whose sons are :param low: and :param high:.
+                  The node is added to the store whenever it does not
+                  exist yet
+        :rtype: int
+        '''
+        if low == high:
+            return low
+
+        # the low edge must be regular: f = ~(~f)
+        complemented = low & 1
+        if complemented:
+            low ^= 1
+            high ^= 1
+
+        key = (var << 64) | (low << 32) | high
+
+        row = self.unique.get(key)
+        if row is None:
+            if self.free:
+                row = self.free.pop()
+                self.var[row] = var
+                self.low[row] = low
+                self.high[row] = high
+            else:
+                row = len(self.var)
+                self.var.append(var)
+                self.low.append(low)
+                self.high.append(high)
+
+            self.unique[key] = row
+
+        return (row << 1) | complemented
+
+    def node(self, handle):
+        r''' Return the BDDNode of a handle
+
+        :param handle: an edge handle
+        :type handle: int
+        :returns: the unique BDDNode having :param handle: as handle
+        :rtype: BDDNode
+        '''
+        node = self._views.get(handle)
+        if node is None:
+            if handle < 2:
+                node = object.__new__(BDDTerminalNode)
+            else:
+                node = object.__new__(BDDNonTerminalNode)
+
+            node.handle = handle
+            self._views[handle] = node
+
+        return node
+
+    def find_node(self, var, low, high):
+        r''' Search a non-terminal node in the unique table
+
+        :param var: variable name
+        :type var: str
+        :param low: the low BDDNode
+        :type low: BDDNode
+        :param high: the high BDDNode
+        :type high: BDDNode
+        :returns: the living node labelled by :param var: whose sons are
+                  :param low: and :param high:, if it exists, None,
+                  otherwise
+        :rtype: BDDNonTerminalNode
+        '''
+        if var not in self.var_indices or low is high:
+            return None
+
+        complemented = low.handle & 1
+        key = ((self.var_indices[var] << 64) |
+               ((low.handle ^ complemented) << 32) |
+               (high.handle ^ complemented))
+
+        row = self.unique.get(key)
+        if row is None:
+            return None
+
+        return self.node((row << 1) | complemented)
+
+    def collect(self):
+        r''' Reclaim the dead nodes
+
+        A node is dead whenever it is not reachable from any living
+        :class:`BDDNode`. This method marks the living nodes, frees the
+        rows of the dead ones, and clears the computed table, whose entries
+        may refer dead nodes.
+
+        :returns: the number of reclaimed nodes
+        :rtype: int
+        '''
+        marked = bytearray(len(self.var))
+        marked[0] = 1
+
+        stack = [handle >> 1 for handle in list(self._views.keys())]
+        while stack:
+            row = stack.pop()
+            if not marked[row]:
+                marked[row] = 1
+                stack.append(self.low[row] >> 1)
+                stack.append(self.high[row] >> 1)
+
+        living = dict()
+        for key, row in self.unique.items():
+            if marked[row]:
+                living[key] = row
+            else:
+                self.var[row] = FREE
+                self.free.append(row)
+
+        reclaimed = len(self.unique) - len(living)
+
+        self.unique = living
+        self.computed.clear()
+        self.operations.clear()
+        self._ranks.clear()
+
+        self.collections += 1
+        self._next_collection = max(self.gc_threshold, 2 * len(living))
+
+        return reclaimed
+
+    def maybe_collect(self):
+        r''' Reclaim the dead nodes whenever the store is large enough
+
+        Collections are triggered exclusively by this method, which is
+        called before the BDD operations start, because, while computing,
+        the operations refer nodes by handles that are not marked as alive.
+        For the same reason, the automatic variable reordering (see
+        :meth:`BDDManager.set_reordering`) is performed here.
+        '''
+        if len(self.unique) > self._next_collection:
+            self.collect()
+
+        if (self._reorder is not None and
+                len(self.unique) > self._next_reordering):
+            self._reorder()
+            self._next_reordering = max(self.reordering_threshold,
+                                        2 * len(self.unique))
+
+    def set_reordering(self, reorder, threshold=None):
+        r''' Set the automatic variable reordering
+
+        :param reorder: a function that reorders the variables in place
+                        or None to disable the automatic reordering
+        :type reorder: function
+        :param threshold: the number of nodes in the store that triggers
+                          the reordering. After any reordering, the
+                          threshold is raised to twice the number of
+                          living nodes, whenever this is greater
+        :type threshold: int
+        '''
+        self._reorder = reorder
+        self.reordering_threshold = threshold
+        self._next_reordering = threshold
+
+    def nodes(self):
+        r''' Return the living non-terminal nodes
+
+        :returns: the regular edges to the non-terminal nodes that are
+                  reachable from some living BDDNode
+        :rtype: set of BDDNonTerminalNode
+        '''
+        self.collect()
+
+        return set([self.node(row << 1) for row in self.unique.values()])
+
+    def set_cache_size(self, cache_size):
+        r''' Set the maximum number of entries in the computed table
+
+        The oldest entries are evicted whenever the table exceeds the new
+        bound.
+
+        :param cache_size: the maximum number of results stored in the
+                           computed table or None for no bound
+        :type cache_size: int
+        '''
+        self.computed.max_entries = cache_size
+
+        if (cache_size is not None and
+                len(self.computed) > cache_size):
+            self.computed.evict()
+
+    def clear_cache(self):
+        r''' Remove all the results stored in the computed table
+        '''
+        self.computed.clear()
+
+    def __len__(self):
+        return len(self.unique)
+
+    def __str__(self):
+        return ('BDDManager(nodes={}, '.format(len(self.unique)) +
+                'collections={}, '.format(self.collections) +
+                'computed={})'.format(self.computed))
+
+
+def conjunction(a, b):
+    return a and b
+
+
+def disjunction(a, b):
+    return a or b
+
+
+def exclusive_disjunction(a, b):
+    return a ^ b
+
+
+def _terminal(value):
+    if not (value in set([0, 1, False, True])):
+        raise TypeError('expected a value among [0, 1, False, True], ' +
+                        'got {}'.format(value))
+
+    return TRUE if value else FALSE
+
+
+def _ite(F, G, H, ordering):
+    m = manager
+    var, low, high, unique = m.var, m.low, m.high, m.unique
+    computed = m.computed
+    entries = computed.entries
+    ranks = m.ranks(ordering)
+    op_key = m.operation_id(('ite', ordering)) << 96
+    hits = misses = 0
+
+    def precedes(A, B_rank, B):
+        A_rank = ranks[var[A >> 1]]
+
+        return A_rank < B_rank or (A_rank == B_rank and A < B)
+
+    # the triples of operands to be evaluated and, as 4-tuples, the nodes
+    # to be built from the two topmost values once both have been evaluated
+    tasks = [(F, G, H)]
+    values = []
+    while tasks:
+        task = tasks.pop()
+        if len(task) == 4:
+            v, key, complemented, _ = task
+            h_value = values.pop()
+            l_value = values.pop()
+            if l_value == h_value:
+                result = l_value
+            elif l_value & 1:
+                result = m.make_node(v, l_value, h_value)
+            else:
+                row = unique.get((v << 64) | (l_value << 32) | h_value)
+                if row is None:
+                    result = m.make_node(v, l_value, h_value)
+                else:
+                    result = row << 1
+
+            entries[key] = result
+            values.append(result ^ complemented)
+
+            continue
+
+        F, G, H = task
+        if F < 2:
+            values.append(G if F == TRUE else H)
+
+            continue
+
+        if G == F:
+            G = TRUE
+        elif G == F ^ 1:
+            G = FALSE
+
+        if H == F:
+            H = FALSE
+        elif H == F ^ 1:
+            H = TRUE
+
+        if G == H:
+            values.append(G)
+
+            continue
+
+        if G < 2 and H < 2:
+            values.append(F if G == TRUE else F ^ 1)
+
+            continue
+
+        # standard triples: among equivalent triples, the one whose first
+        # operand precedes the others is chosen
+        if G < 2 or H < 2 or G == H ^ 1:
+            F_rank = ranks[var[F >> 1]]
+            if G == TRUE:
+                if precedes(H, F_rank, F):
+                    F, H = H, F
+            elif H == FALSE:
+                if precedes(G, F_rank, F):
+                    F, G = G, F
+            elif G == FALSE:
+                if precedes(H, F_rank, F):
+                    F, H = H ^ 1, F ^ 1
+            elif H == TRUE:
+                if precedes(G, F_rank, F):
+                    F, G = G ^ 1, F ^ 1
+            elif precedes(G, F_rank, F):
+                F, G, H = G, F, F ^ 1
+
+        # the first and the second operands must be regular
+        if F & 1:
+            F, G, H = F ^ 1, H, G
+
+        complemented = G & 1
+        if complemented:
+            G, H = G ^ 1, H ^ 1
+
+        key = op_key | (F << 64) | (G << 32) | H
+        result = entries.get(key)
+        if result is not None:
+            hits += 1
+            values.append(result ^ complemented)
+
+            continue
+
+        misses += 1
+
+        # the top variable and the cofactors: F and G are regular
+        v = var[F >> 1]
+        if G > 1 and ranks[var[G >> 1]] < ranks[v]:
+            v = var[G >> 1]
+        if H > 1 and ranks[var[H >> 1]] < ranks[v]:
+            v = var[H >> 1]
+
+        if var[F >> 1] == v:
+            F0, F1 = low[F >> 1], high[F >> 1]
+        else:
+            F0 = F1 = F
+
+        if G > 1 and var[G >> 1] == v:
+            G0, G1 = low[G >> 1], high[G >> 1]
+        else:
+            G0 = G1 = G
+
+        if H > 1 and var[H >> 1] == v:
+            H0, H1 = low[H >> 1] ^ (H & 1), high[H >> 1] ^ (H & 1)
+        else:
+            H0 = H1 = H
+
+        tasks.append((v, key, complemented, None))
+        tasks.append((F1, G1, H1))
+        tasks.append((F0, G0, H0))
+
+    computed.hits += hits
+    computed.misses += misses
+    if (computed.max_entries is not None and
+            len(entries) > computed.max_entries):
+        computed.evict()
+
+    return values[0]
+
+
+def ite(F, G, H, ordering):
+    r''' Compute the if-then-else of three BDDs.
+
+    :param F: a BDD that respects the ordering
+    :type F: BDDNode
+    :param G: a BDD that respects the ordering
+    :type G: BDDNode
+    :param H: a BDD that respects the ordering
+    :type H: BDDNode
+    :param ordering: a variable ordering
+    :type ordering: Ordering
+    :returns: the BDDNode representing :math:`(f \land g) \lor
+              (\neg f \land h)` where :math:`f`, :math:`g` and :math:`h`
+              are the functions encoded by :param F:, :param G: and
+              :param H:, respectively
+    :rtype: BDDNode
+    '''
+    manager.maybe_collect()
+
+    return manager.node(_ite(F.handle, G.handle, H.handle, ordering))
+
+
+def _cofactor_of(operator, value, B):
+    # the function x |-> operator(value, x) is either a constant, the
+    # identity, or the negation
+    on_false = _terminal(operator(value, False))
+    on_true = _terminal(operator(value, True))
+
+    if on_false == on_true:
+        return on_false
+
+    if on_true == TRUE:
+        return B
+
+    return B ^ 1
+
+
+def _apply(operator, A, B, ordering):
+    return _ite(A, _cofactor_of(operator, True, B),
+                _cofactor_of(operator, False, B), ordering)
+
+
+def apply(operator, A, B, ordering):
+    r''' Apply a binary Boolean operator to two BDDs.
+
+    The operation is reduced to :func:`ite` because
+    :math:`f \circ g = ite(f, 1 \circ g, 0 \circ g)`.
+
+    :param operator: a binary Boolean operator
+    :type operator: function
+    :param A: a BDD that respects the ordering
+    :type A: BDDNode
+    :param B: a BDD that respects the ordering
+    :type B: BDDNode
+    :param ordering: a variable ordering
+    :type ordering: Ordering
+    :returns: the BDDNode representing :math:`f \circ g` where
+              :math:`\circ` is :param operator:, while :math:`f` and
+              :math:`g` are the functions encoded by :param A: and
+              :param B:, respectively
+    :rtype: BDDNode
+    '''
+    manager.maybe_collect()
+
+    return manager.node(_apply(operator, A.handle, B.handle, ordering))
+
+
+def _map(bdd, operation, sons, combine, terminal=(lambda handle: handle)):
+    r''' Evaluate a unary operation on a BDD without recursion
+
+    :param bdd: a node handle
+    :type bdd: int
+    :param operation: a hashable object that identifies the operation and
+                      its parameters in the computed table
+    :param sons: a function that maps a non-terminal node handle into the
+                 handles of the sons on which the operation must be
+                 evaluated before evaluating it on the node itself
+    :type sons: function
+    :param combine: a function that maps a non-terminal node handle and
+                    the results of the operation on the handles returned
+                    by :param sons: into the result on the node
+    :type combine: function
+    :param terminal: a function that evaluates the operation on terminal
+                     node handles
+    :type terminal: function
+    :returns: the handle of the result
+    :rtype: int
+    '''
+    computed = manager.computed
+    entries = computed.entries
+    op_key = manager.operation_id(operation) << 96
+    hits = misses = 0
+
+    # the handles to be evaluated and, as pairs, the handles whose sons
+    # have already been evaluated together with the number of those sons
+    tasks = [bdd]
+    values = []
+    while tasks:
+        task = tasks.pop()
+        if task.__class__ is tuple:
+            handle, num_of_sons = task
+            result = combine(handle, values[-num_of_sons:])
+            del values[-num_of_sons:]
+
+            entries[op_key | handle] = result
+            values.append(result)
+
+            continue
+
+        if task < 2:
+            values.append(terminal(task))
+
+            continue
+
+        result = entries.get(op_key | task)
+        if result is not None:
+            hits += 1
+            values.append(result)
+
+            continue
+
+        misses += 1
+        task_sons = sons(task)
+
+        tasks.append((task, len(task_sons)))
+        tasks.extend(reversed(task_sons))
+
+    computed.hits += hits
+    computed.misses += misses
+    if (computed.max_entries is not None and
+            len(entries) > computed.max_entries):
+        computed.evict()
+
+    return values[0]
+
+
+def _sons(handle):
+    complemented = handle & 1
+
+    return (manager.low[handle >> 1] ^ complemented,
+            manager.high[handle >> 1] ^ complemented)
+
+
+def _exists(bdd, variables, ordering):
+    m = manager
+
+    def combine(handle, results):
+        if m.var[handle >> 1] in variables:
+            return _ite(results[0], TRUE, results[1], ordering)
+
+        return m.make_node(m.var[handle >> 1], results[0], results[1])
+
+    return _map(bdd, ('exists', variables, ordering), _sons, combine)
+
+
+def exists(bdd, variables, ordering):
+    r''' Existentially quantify some variables of a BDD.
+
+    :param bdd: a BDD that respects the ordering
+    :type bdd: BDDNode
+    :param variables: the variables to be quantified
+    :type variables: a container of str
+    :param ordering: a variable ordering
+    :type ordering: Ordering
+    :returns: the BDDNode representing :math:`\exists x_1 \ldots \exists x_n.f`
+              where :math:`x_1, \ldots, x_n` are the variables in
+              :param variables: and :math:`f` is the function encoded by
+              :param bdd:
+    :rtype: BDDNode
+    '''
+    manager.maybe_collect()
+
+    variables = frozenset([manager.var_indices[var] for var in variables
+                           if var in manager.var_indices])
+
+    return manager.node(_exists(bdd.handle, variables, ordering))
+
+
+def forall(bdd, variables, ordering):
+    r''' Universally quantify some variables of a BDD.
+
+    The operation is reduced to :func:`exists` because
+    :math:`\forall x.f = \neg \exists x.\neg f` and negation is a constant
+    time operation.
+
+    :param bdd: a BDD that respects the ordering
+    :type bdd: BDDNode
+    :param variables: the variables to be quantified
+    :type variables: a container of str
+    :param ordering: a variable ordering
+    :type ordering: Ordering
+    :returns: the BDDNode representing :math:`\forall x_1 \ldots \forall x_n.f`
+              where :math:`x_1, \ldots, x_n` are the variables in
+              :param variables: and :math:`f` is the function encoded by
+              :param bdd:
+    :rtype: BDDNode
+    '''
+    return ~exists(~bdd, variables, ordering)
+
+
+def _and_exists(F, G, variables, ordering):
+    m = manager
+    var, low, high = m.var, m.low, m.high
+    computed = m.computed
+    entries = computed.entries
+    ranks = m.ranks(ordering)
+    op_key = m.operation_id(('and_exists', variables, ordering)) << 96
+    hits = misses = 0
+
+    # below the last quantified variable, the relational product is the
+    # conjunction
+    last = max([ranks[v] for v in variables if ranks[v] is not None] + [-1])
+
+    # the tasks are tagged tuples: EVAL evaluates a pair of operands; BUILD
+    # builds a node from the two topmost values; QUANTIFY evaluates the
+    # high cofactors of a quantified variable unless the topmost value,
+    # i.e., the result on the low cofactors, is TRUE; OR replaces the two
+    # topmost values by their disjunction
+    EVAL, BUILD, QUANTIFY, OR = range(4)
+
+    tasks = [(EVAL, F, G)]
+    values = []
+    while tasks:
+        task = tasks.pop()
+        tag = task[0]
+        if tag == BUILD:
+            h_value = values.pop()
+            result = m.make_node(task[1], values.pop(), h_value)
+            entries[task[2]] = result
+            values.append(result)
+
+            continue
+
+        if tag == QUANTIFY:
+            if values[-1] == TRUE:
+                entries[task[1]] = TRUE
+            else:
+                tasks.append((OR, task[1]))
+                tasks.append((EVAL, task[2], task[3]))
+
+            continue
+
+        if tag == OR:
+            h_value = values.pop()
+            l_value = values.pop()
+            if l_value == FALSE or l_value == h_value:
+                result = h_value
+            elif h_value == FALSE:
+                result = l_value
+            elif h_value == TRUE or l_value == h_value ^ 1:
+                result = TRUE
+            else:
+                result = _ite(l_value, TRUE, h_value, ordering)
+            entries[task[1]] = result
+            values.append(result)
+
+            continue
+
+        _, F, G = task
+
+        # the conjunction is commutative: F <= G
+        if G < F:
+            F, G = G, F
+
+        if F == FALSE or F == G ^ 1:
+            values.append(FALSE)
+
+            continue
+
+        if F == G:
+            F = TRUE
+
+        if G == TRUE:
+            values.append(TRUE)
+
+            continue
+
+        G_rank = ranks[var[G >> 1]]
+        if F == TRUE:
+            if G_rank > last:
+                values.append(G)
+
+                continue
+
+            F_rank = G_rank
+        else:
+            F_rank = ranks[var[F >> 1]]
+            if F_rank > last and G_rank > last:
+                values.append(_ite(F, G, FALSE, ordering))
+
+                continue
+
+        key = op_key | (F << 32) | G
+        result = entries.get(key)
+        if result is not None:
+            hits += 1
+            values.append(result)
+
+            continue
+
+        misses += 1
+
+        if F != TRUE and F_rank <= G_rank:
+            v = var[F >> 1]
+            F0, F1 = low[F >> 1] ^ (F & 1), high[F >> 1] ^ (F & 1)
+        else:
+            v = var[G >> 1]
+            F0 = F1 = F
+
+        if var[G >> 1] == v:
+            G0, G1 = low[G >> 1] ^ (G & 1), high[G >> 1] ^ (G & 1)
+        else:
+            G0 = G1 = G
+
+        if v in variables:
+            tasks.append((QUANTIFY, key, F1, G1))
+        else:
+            tasks.append((BUILD, v, key))
+            tasks.append((EVAL, F1, G1))
+
+        tasks.append((EVAL, F0, G0))
+
+    computed.hits += hits
+    computed.misses += misses
+    if (computed.max_entries is not None and
+            len(entries) > computed.max_entries):
+        computed.evict()
+
+    return values[0]
+
+
+def and_exists(A, B, variables, ordering):
+    r''' Compute the relational product of two BDDs.
+
+    The conjunction and the existential quantification are evaluated in a
+    single pass, so that the conjunction is never built as a whole, and
+    the high cofactors of a quantified variable are not explored whenever
+    the result on the low cofactors is already true.
+
+    :param A: a BDD that respects the ordering
+    :type A: BDDNode
+    :param B: a BDD that respects the ordering
+    :type B: BDDNode
+    :param variables: the variables to be quantified
+    :type variables: a container of str
+    :param ordering: a variable ordering
+    :type ordering: Ordering
+    :returns: the BDDNode representing :math:`\exists x_1 \ldots \exists
+              x_n.(f \land g)` where :math:`x_1, \ldots, x_n` are the
+              variables in :param variables:, while :math:`f` and :math:`g`
+              are the functions encoded by :param A: and :param B:,
+              respectively
+    :rtype: BDDNode
+    '''
+    manager.maybe_collect()
+
+    variables = frozenset([manager.var_indices[var] for var in variables
+                           if var in manager.var_indices])
+
+    return manager.node(_and_exists(A.handle, B.handle, variables,
+                                    ordering))
+
+
+def _rename(bdd, renaming, renaming_key, ordering):
+    m = manager
+
+    def combine(handle, results):
+        low, high = results
+        var_name = m.var_names[m.var[handle >> 1]]
+        var_name = renaming.get(var_name, var_name)
+
+        if var_name not in ordering:
+            raise RuntimeError('%s in not in %s' % (var_name, ordering))
+
+        var = m.var_index(var_name)
+        if all([son < 2 or
+                ordering.in_order(var_name, m.var_names[m.var[son >> 1]])
+                for son in [low, high]]):
+            return m.make_node(var, low, high)
+
+        # the renaming does not preserve the ordering of the variables: the
+        # node is rebuilt as ite(var, high, low)
+        return _ite(m.make_node(var, FALSE, TRUE), high, low, ordering)
+
+    return _map(bdd, ('rename', renaming_key, ordering), _sons, combine)
+
+
+def rename(bdd, renaming, ordering):
+    r''' Rename the variables of a BDD.
+
+    :param bdd: a BDD that respects the ordering
+    :type bdd: BDDNode
+    :param renaming: an injective map from variable names to variable names
+    :type renaming: dict
+    :param ordering: a variable ordering
+    :type ordering: Ordering
+    :returns: the BDDNode representing the function obtained by replacing
+              any variable :math:`x` of the function encoded by
+              :param bdd: by :math:`renaming[x]`
+    :rtype: BDDNode
+    '''
+    manager.maybe_collect()
+
+    return manager.node(_rename(bdd.handle, renaming,
+                                frozenset(renaming.items()), ordering))
+
+
+def _restrict(bdd, var, value):
+    m = manager
+
+    def sons(handle):
+        if m.var[handle >> 1] == var:
+            return (_sons(handle)[1 if value else 0],)
+
+        return _sons(handle)
+
+    def combine(handle, results):
+        if len(results) == 1:
+            return results[0]
+
+        return m.make_node(m.var[handle >> 1], results[0], results[1])
+
+    return _map(bdd, ('restrict', var, value), sons, combine)
+
+
+def _levels(variables):
+    # the position of every variable, by index, in a list of variable names
+    return dict([(manager.var_index(var), level)
+                 for level, var in enumerate(variables)])
+
+
+def _satcount(bdd, levels, levels_key):
+    var = manager.var
+    num_of_levels = len(levels)
+
+    def level(handle):
+        return num_of_levels if handle < 2 else levels[var[handle >> 1]]
+
+    def combine(handle, results):
+        low, high = _sons(handle)
+        handle_level = levels[var[handle >> 1]]
+
+        return ((results[0] << (level(low) - handle_level - 1)) +
+                (results[1] << (level(high) - handle_level - 1)))
+
+    count = _map(bdd, ('satcount', levels_key), _sons, combine,
+                 terminal=(lambda handle: 1 if handle == TRUE else 0))
+
+    return count << level(bdd)
+
+
+def _check_variables(bdd, variables):
+    missing = bdd.variables() - set(variables)
+    if missing:
+        raise RuntimeError('{} are not in {}'.format(missing, variables))
+
+
+def satcount(bdd, variables):
+    r''' Count the satisfying assignments of a BDD.
+
+    The number of satisfying assignments of every node is memoised in the
+    computed table, so that the count is linear in the size of the BDD.
+
+    :param bdd: a BDD
+    :type bdd: BDDNode
+    :param variables: the variables of the assignments, sorted according
+                      to an ordering respected by :param bdd:. They must
+                      include all the variables in :param bdd:
+    :type variables: list of str
+    :returns: the number of the assignments to :param variables: that
+              satisfy the function encoded by :param bdd:
+    :rtype: int
+    '''
+    _check_variables(bdd, variables)
+
+    levels = _levels(variables)
+
+    return _satcount(bdd.handle, levels,
+                     tuple([manager.var_indices[var] for var in variables]))
+
+
+def cubes(bdd):
+    r''' Lazily enumerate the satisfying cubes of a BDD.
+
+    A cube is a partial assignment whose extensions all satisfy the
+    function encoded by the BDD. Every path from the root to the true
+    terminal is a cube, so each of them is produced in time linear in the
+    number of the BDD variables.
+
+    :param bdd: a BDD
+    :type bdd: BDDNode
+    :returns: a generator of the satisfying cubes of :param bdd:, i.e., of
+              dictionaries mapping some variable names into Boolean values
+    :rtype: generator
+    '''
+    m = manager
+
+    # the paths are linked lists of (variable, value, parent) triples. The
+    # local variable bdd keeps the visited nodes alive while the generator
+    # is suspended
+    stack = [(bdd.handle, None)]
+    while stack:
+        handle, path = stack.pop()
+        if handle == FALSE:
+            continue
+
+        if handle == TRUE:
+            cube = dict()
+            while path is not None:
+                cube[path[0]] = path[1]
+                path = path[2]
+
+            yield cube
+
+            continue
+
+        var_name = m.var_names[m.var[handle >> 1]]
+        low, high = _sons(handle)
+
+        stack.append((high, (var_name, True, path)))
+        stack.append((low, (var_name, False, path)))
+
+
+def minterms(bdd, variables):
+    r''' Lazily enumerate the satisfying assignments of a BDD.
+
+    :param bdd: a BDD
+    :type bdd: BDDNode
+    :param variables: the variables of the assignments. They must include
+                      all the variables in :param bdd:
+    :type variables: list of str
+    :returns: a generator of the assignments to :param variables: that
+              satisfy the function encoded by :param bdd:, i.e., of
+              dictionaries mapping the variable names into Boolean values
+    :rtype: generator
+    '''
+    _check_variables(bdd, variables)
+
+    for cube in cubes(bdd):
+        free = [var for var in variables if var not in cube]
+        for values in product([False, True], repeat=len(free)):
+            minterm = dict(cube)
+            minterm.update(zip(free, values))
+
+            yield minterm
+
+
+def sample(bdd, variables, rng):
+    r''' Pick a satisfying assignment of a BDD uniformly at random.
+
+    Every son of a node is chosen with a probability proportional to the
+    number of its satisfying assignments (see :func:`satcount`), so the
+    sampling is linear in the size of the BDD.
+
+    :param bdd: a BDD
+    :type bdd: BDDNode
+    :param variables: the variables of the assignments, sorted according
+                      to an ordering respected by :param bdd:. They must
+                      include all the variables in :param bdd:
+    :type variables: list of str
+    :param rng: a random number generator, e.g., the module `random`
+    :returns: an assignment to :param variables: satisfying the function
+              encoded by :param bdd:, i.e., a dictionary mapping the
+              variable names into Boolean values, or None whenever the
+              function is unsatisfiable
+    :rtype: dict
+    '''
+    _check_variables(bdd, variables)
+
+    m = manager
+    levels = _levels(variables)
+    levels_key = tuple([m.var_indices[var] for var in variables])
+
+    def level(handle):
+        return len(variables) if handle < 2 else levels[m.var[handle >> 1]]
+
+    def count(handle, upper_level):
+        # the number of the satisfying assignments to the variables below
+        # upper_level
+        return (_satcount(handle, levels, levels_key) >>
+                (upper_level + 1))
+
+    if _satcount(bdd.handle, levels, levels_key) == 0:
+        return None
+
+    assignment = dict()
+    handle, current = bdd.handle, -1
+    while True:
+        # the variables that are skipped by the edge are free
+        for var in variables[current+1:level(handle)]:
+            assignment[var] = bool(rng.getrandbits(1))
+
+        if handle < 2:
+            return assignment
+
+        current = level(handle)
+        low, high = _sons(handle)
+
+        low_count = count(low, current)
+        value = rng.randrange(low_count + count(high, current)) >= low_count
+
+        assignment[variables[current]] = value
+        handle = high if value else low
+
+
+def _descendents(roots, checked):
+    m = manager
 
     desc = set()
-    stack = [root]
+    stack = list(roots)
 
     while stack:
-        node = stack.pop()
-        if node not in desc and node not in checked:
-            desc.add(node)
+        handle = stack.pop()
+        if handle not in desc and handle not in checked:
+            desc.add(handle)
 
-            if (isinstance(node, BDDNonTerminalNode)):
-                stack.append(node.low)
-                stack.append(node.high)
+            if handle > 1:
+                stack.extend(_sons(handle))
 
     return desc
 
 
-def ancestors(leaf, checked=None):
+def descendents(root, checked=None):
     if checked is None:
         checked = set()
 
-    anc = set()
-    stack = [leaf]
+    checked = set([node.handle for node in checked])
+
+    return set([manager.node(handle)
+                for handle in _descendents([root.handle], checked)])
 
-    while stack:
-        node = stack.pop()
-        if node not in anc and node not in checked:
-            anc.add(node)
 
-            stack.extend((node.f_low | node.f_high-checked)-anc)
+def ancestors(leaf, checked=None):
+    if checked is None:
+        checked = set()
 
-    return anc
+    m = manager
+    m.collect()
+
+    # an edge is an ancestor of leaf whenever either it is leaf or one of
+    # its sons is an ancestor of leaf
+    is_ancestor = {leaf.handle: True}
+    for row in m.unique.values():
+        stack = [row << 1, (row << 1) | 1]
+        while stack:
+            handle = stack[-1]
+            if handle in is_ancestor:
+                stack.pop()
+            elif handle < 2:
+                is_ancestor[handle] = False
+                stack.pop()
+            else:
+                sons = [son for son in _sons(handle)
+                        if son not in is_ancestor]
+                if sons:
+                    stack.extend(sons)
+                else:
+                    is_ancestor[handle] = any([is_ancestor[son]
+                                               for son in _sons(handle)])
+                    stack.pop()
+
+    return set([node for node in [m.node(handle)
+                                  for handle, value in is_ancestor.items()
+                                  if value]
+                if node not in checked])
 
 
 class BDDNode(object):
     r'''
     A class to represent Binary Decision Diagram (BDD) nodes.
+
+    BDDNode objects are views of the nodes stored in :data:`manager`: any
+    node is represented by at most one living BDDNode object at a time.
     '''
+
+    __slots__ = ('handle', '__weakref__')
+
     def __new__(cls, *data):
         if len(data) == 1:
             return BDDTerminalNode(data[0])
@@ -106,10 +1282,10 @@ class BDDNode(object):
     def __hash__(self):
         r''' Compute a hash for a BDDNode
 
-        :returns: the id of `self`
+        :returns: the handle of `self`
         :rtype: int
         '''
-        return id(self)
+        return self.handle
 
     def restrict(self, var, value):
         r''' Partially evaluate the binary function encoded by a BDD.
@@ -134,11 +1310,13 @@ class BDDNode(object):
                             'got ({}, {})'.format(var.__class__,
                                                   value.__class__))
 
-        return cache_restrict(self, var, value, dict())
+        if var not in manager.var_indices:
+            return self
+
+        manager.maybe_collect()
 
-    def __reset__(self):
-        self.f_low = WeakSet()
-        self.f_high = WeakSet()
+        return manager.node(_restrict(self.handle,
+                                      manager.var_indices[var], value))
 
     def descendents(self):
         r''' Computes the descendents of this node.
@@ -163,7 +1341,7 @@ class BDDNode(object):
         :returns: all the BDD nodes that are stored in memory
         :rtype: set of `BDDNode`
         '''
-        return BDDNode(0).ancestors() | BDDNode(1).ancestors()
+        return manager.nodes() | set([BDDNode(0), BDDNode(1)])
 
     def variables(self):
         r''' Return the variables contained into a BDD.
@@ -171,71 +1349,67 @@ class BDDNode(object):
         :returns: all the variable that label some the descendents of this node
         :rtype: set of str
         '''
-        return set([node.var for node in self.descendents()
-                    if isinstance(node, BDDNonTerminalNode)])
+        m = manager
 
-    def __repr__(self):
-        return self.__str__()
-
-
-def find_isomorph(var, low, high):
-    if len(low.f_low) < len(high.f_high):
-        node_set = low.f_low
-        lh_test = (lambda low, high: high is node.high)
-    else:
-        node_set = high.f_high
-        lh_test = (lambda low, high: low is node.low)
-
-    for node in node_set:
-        if (isinstance(node, BDDNonTerminalNode) and var == node.var and
-                lh_test(low, high)):
-            return node
+        return set([m.var_names[m.var[handle >> 1]]
+                    for handle in _descendents([self.handle], set())
+                    if handle > 1])
 
-    return None
-
-
-def cache_restrict(bdd, var, value, r_cache):
-    if bdd in r_cache:
-        return r_cache[bdd]
+    def __invert__(self, r_cache=None):
+        r''' Invert the binary function represented by a BDDNode.
 
-    r_cache[bdd] = compute_restrict(bdd, var, value, r_cache)
+        :param r_cache: unused and kept for backward compatibility
+        :type r_cache: dict or None
+        :returns: the BDDNode representing the function `1-f` where `f` is the
+                  function depicted by `self`. It is obtained by
+                  complementing the edge of `self` in constant time
+        :rtype: BDDNode
+        '''
+        return manager.node(self.handle ^ 1)
 
-    return r_cache[bdd]
+    def __eq__(self, O):
+        r''' Test the equivalence of two BDDs.
 
+        :param O: a BDD node
+        :type O: BDDNode
+        :returns: `True` if the two BDDs rooted in `self` and `O` are
+                  isomorph,  `False`,  otherwise
+        :rtype: bool
+        '''
+        return self is O
 
-def compute_restrict(bdd, var, value, r_cache):
-    if isinstance(bdd, BDDTerminalNode):
-        return bdd
+    def __repr__(self):
+        return self.__str__()
 
-    if bdd.var == var:
-        if value:
-            return cache_restrict(bdd.high, var, value, r_cache)
-        else:
-            return cache_restrict(bdd.low, var, value, r_cache)
-    else:
-        low = cache_restrict(bdd.low, var, value, r_cache)
-        high = cache_restrict(bdd.high, var, value, r_cache)
 
-        return BDDNonTerminalNode(bdd.var, low, high)
+def find_isomorph(var, low, high):
+    return manager.find_node(var, low, high)
 
 
 class BDDNonTerminalNode(BDDNode):
+    __slots__ = ()
+
     def __new__(cls, var, low, high):
         for p in [low, high]:
             if not isinstance(p, BDDNode):
                 raise TypeError('expected an BBD node, got {}'.format(p))
 
-        if low is high:
-            return low
+        handle = manager.make_node(manager.var_index(var), low.handle,
+                                   high.handle)
 
-        node = find_isomorph(var, low, high)
-        if node is not None:
-            return node
+        return manager.node(handle)
 
-        node = super(BDDNode, cls).__new__(cls)
-        node.__reset__(var, low, high)
+    @property
+    def var(self):
+        return manager.var_names[manager.var[self.handle >> 1]]
 
-        return node
+    @property
+    def low(self):
+        return manager.node(_sons(self.handle)[0])
+
+    @property
+    def high(self):
+        return manager.node(_sons(self.handle)[1])
 
     def respect_ordering(self, O, checked=None):
         r''' Test whether a BDDNode respects an ordering.
@@ -255,116 +1429,80 @@ class BDDNonTerminalNode(BDDNode):
         if checked is None:
             checked = set()
 
-        if self in checked:
-            return True
-
-        if self.var not in O:
-            raise RuntimeError('%s in not in %s' % (self.var, O))
-
-        for son in [self.low, self.high]:
-            if (isinstance(son, BDDNonTerminalNode) and
-                    not O.in_order(self.var, son.var)):
-                return False
-
-        if (self.high.respect_ordering(O, checked) and
-                self.low.respect_ordering(O, checked)):
-            checked.add(self)
+        m = manager
+        skip = set([node.handle for node in checked])
+        for handle in _descendents([self.handle], skip):
+            if handle < 2:
+                continue
 
-            return True
+            var = m.var_names[m.var[handle >> 1]]
+            if var not in O:
+                raise RuntimeError('%s in not in %s' % (var, O))
 
-        return False
+            for son in _sons(handle):
+                if (son > 1 and
+                        not O.in_order(var, m.var_names[m.var[son >> 1]])):
+                    return False
 
-    def __reset__(self, var, low, high):
-        r''' Reset the value of a BDDNonTerminalNode.
+        checked.add(self)
 
-        :param var: variable name
-        :type var: str
-        :param low: the low BDDNode
-        :type low: BDDNode
-        :param high: the high BDDNode
-        :type high: BDDNode
-        '''
-        super(BDDNonTerminalNode, self).__reset__()
-
-        self.var = var
-        self.low = low
-        self.high = high
-
-        self.low.f_low.add(self)
-        self.high.f_high.add(self)
+        return True
 
-    def __invert__(self, r_cache=None):
-        r''' Invert the binary function represented by a BDDNode.
+    def __str__(self):
+        r''' Produce a string that represents a BDD.
 
-        :param r_cache: a dictionary that caches already computed results
-        :type r_cache: dict or None
-        :returns: the BDDNode representing the function `1-f` where `f` is the
-                  function depicted by `self`
-        :rtype: BDDNode
+        :returns: a string that represents the BDD rooted in `self`
+        :rtype: str
         '''
-        if r_cache is None:
-            r_cache = dict()
+        m = manager
 
-        if self in r_cache:
-            return r_cache[self]
+        # the strings of the non-terminal nodes are computed bottom-up
+        strings = dict()
+        stack = [self.handle]
+        while stack:
+            handle = stack[-1]
+            if handle in strings:
+                stack.pop()
 
-        r_cache[self] = BDDNonTerminalNode(self.var,
-                                           self.low.__invert__(r_cache),
-                                           self.high.__invert__(r_cache))
-        return r_cache[self]
+                continue
 
-    def __hash__(self):
-        return id(self)
+            sons = [son for son in _sons(handle)
+                    if son > 1 and son not in strings]
+            if sons:
+                stack.extend(sons)
 
-    def __eq__(self, O):
-        r''' Test the equivalence of two BDDs.
+                continue
 
-        :param O: a BDD node
-        :type O: BDDNode
-        :returns: `True` if the two BDDs rooted in `self` and `O` are
-                  isomorph,  `False`,  otherwise
-        :rtype: bool
-        '''
-        return self is O
+            stack.pop()
 
-    def __str__(self):
-        r''' Produce a string that represents a BDD.
+            var = m.var_names[m.var[handle >> 1]]
+            low, high = _sons(handle)
 
-        :returns: a string that represents the BDD rooted in `self`
-        :rtype: str
-        '''
-        repr = []
+            repr = []
+            for succ,  neg in [(low, '~'), (high, '')]:
+                if succ < 2:
+                    if succ == TRUE:
+                        repr.append('%s%s' % (neg, var))
+                else:
+                    repr.append('%s%s & %s' % (neg, var, strings[succ]))
 
-        for succ,  neg in [(self.low, '~'), (self.high, '')]:
-            if isinstance(succ, BDDTerminalNode):
-                if succ.value:
-                    repr.append('%s%s' % (neg, self.var))
+            if len(repr) == 2:
+                strings[handle] = '(%s) | (%s)' % (repr[0], repr[1])
             else:
-                repr.append('%s%s & %s' % (neg, self.var, succ))
+                strings[handle] = repr[0]
 
-        if len(repr) == 2:
-            return '(%s) | (%s)' % (repr[0], repr[1])
-
-        return repr[0]
+        return strings[self.handle]
 
 
 class BDDTerminalNode(BDDNode):
-    Tnodes = {}
+    __slots__ = ()
 
     def __new__(cls, value):
-        if not (value in set([0, 1, False, True])):
-            raise TypeError('expected a value among [0, 1, False, True], ' +
-                            'got {}'.format(value))
-
-        if value not in BDDTerminalNode.Tnodes:
-            node = super(BDDNode, cls).__new__(cls)
-
-            # reset the node and set the node value
-            node.__reset__(value)
+        return manager.node(_terminal(value))
 
-            BDDTerminalNode.Tnodes[value] = node
-
-        return BDDTerminalNode.Tnodes[value]
+    @property
+    def value(self):
+        return self.handle == TRUE
 
     def respect_ordering(self, O, checked=None):
         r''' Test whether a BDDNode respects an Ordering or not.
@@ -378,49 +1516,10 @@ class BDDTerminalNode(BDDNode):
         '''
         return True
 
-    def __reset__(self, value):
-        r''' Reset the value of a BDDTerminalNode.
-
-        :param value: the new value
-        :type value: bool
-        '''
-        super(BDDTerminalNode, self).__reset__()
-        self.value = value
-
-    def __invert__(self, r_cache=None):
-        r''' Invert the binary function represented by a BDDNode.
-
-        :param r_cache: a dictionary that caches already computed results
-        :type r_cache: dict or None
-        :returns: the BDDNode representing the function `1-f` where `f` is the
-                  function depicted by `self`
-        :rtype: BDDNode
-        '''
-        if r_cache is None:
-            r_cache = dict()
-
-        if self in r_cache:
-            return r_cache[self]
-
-        r_cache[self] = BDDTerminalNode(not self.value)
-
-        return r_cache[self]
-
-    def __hash__(self):
-        return id(self)
-
-    def __eq__(self, O):
-        r''' Test the equivalence of two BDDs.
-
-        :param O: a BDD node
-        :type O: BDDNode
-        :returns: `True` if the two BDDs rooted in `self` and `O` are
-                  isomorph,  `False`,  otherwise
-        :rtype: bool
-        '''
-        return self is O
-
     def __str__(self):
         if self.value:
             return '1'
         return '0'
+
+
+manager = BDDManager()
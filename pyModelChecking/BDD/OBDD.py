@@ -1,12 +1,23 @@
 import ast
+import random
+import weakref
 
 from .BDD import BDDNode
 from .BDD import apply as BDDapply
+from .BDD import ite as BDDite
+from .BDD import exists as BDDexists
+from .BDD import forall as BDDforall
+from .BDD import and_exists as BDDand_exists
+from .BDD import satcount as BDDsatcount
+from .BDD import cubes as BDDcubes
+from .BDD import minterms as BDDminterms
+from .BDD import sample as BDDsample
+from .BDD import rename as BDDrename
 from .ordering import *
 
 
 def parse_args(args_node):
-    return Ordering([id(arg) for arg in args_node.args])
+    return Ordering([arg.arg for arg in args_node.args])
 
 
 def parse_name(ordering, node):
@@ -139,8 +150,13 @@ class BinaryParser(object):
 class OBDD(object):
     r'''
     A class to represent Ordered Binary Decision Diagrams (OBDDs).
+
+    All the living OBDDs are tracked, so that their variables can be
+    reordered in place (see :meth:`OBDD.reorder`).
     '''
 
+    instances = weakref.WeakValueDictionary()
+
     def __init__(self, bfunct, ordering=None, check_ordering=True):
         r''' Initialize an OBDD.
 
@@ -155,6 +171,8 @@ class OBDD(object):
                                whether the BDDNode respects the ordering
         :type check_ordering: bool
         '''
+        OBDD.instances[id(self)] = self
+
         if ordering is None:
             obdd = BinaryParser.parse_function(bfunct)
             self.ordering = obdd.ordering
@@ -197,7 +215,178 @@ class OBDD(object):
                   the function encoded by current object
         :rtype: OBDD
         '''
-        return OBDD(self.root.restrict(var, value), self.ordering)
+        return OBDD(self.root.restrict(var, value), self.ordering,
+                    check_ordering=False)
+
+    def exists(self, variables):
+        r''' Existentially quantify some variables of an OBDD.
+
+        :param variables: either a variable name or a container of variable
+                          names
+        :type variables: str or a container of str
+        :returns: the OBDD representing :math:`\exists x_1 \ldots \exists
+                  x_n.f` where :math:`x_1, \ldots, x_n` are the variables
+                  in :param variables: and :math:`f` is the function encoded
+                  by current object
+        :rtype: OBDD
+        '''
+        if isinstance(variables, str):
+            variables = [variables]
+
+        bdd = BDDexists(self.root, variables, self.ordering)
+
+        return OBDD(bdd, self.ordering, check_ordering=False)
+
+    def forall(self, variables):
+        r''' Universally quantify some variables of an OBDD.
+
+        :param variables: either a variable name or a container of variable
+                          names
+        :type variables: str or a container of str
+        :returns: the OBDD representing :math:`\forall x_1 \ldots \forall
+                  x_n.f` where :math:`x_1, \ldots, x_n` are the variables
+                  in :param variables: and :math:`f` is the function encoded
+                  by current object
+        :rtype: OBDD
+        '''
+        if isinstance(variables, str):
+            variables = [variables]
+
+        bdd = BDDforall(self.root, variables, self.ordering)
+
+        return OBDD(bdd, self.ordering, check_ordering=False)
+
+    def and_exists(self, A, variables):
+        r''' Compute the relational product of two OBDDs.
+
+        The conjunction and the quantification are evaluated in a single
+        pass (see :func:`BDD.and_exists`).
+
+        :param A: an OBDD
+        :type A: OBDD
+        :param variables: either a variable name or a container of variable
+                          names
+        :type variables: str or a container of str
+        :returns: the OBDD representing :math:`\exists x_1 \ldots \exists
+                  x_n.(f \land g)` where :math:`x_1, \ldots, x_n` are the
+                  variables in :param variables:, while :math:`f` and
+                  :math:`g` are the functions encoded by current object and
+                  :param A:, respectively
+        :rtype: OBDD
+        '''
+        if not isinstance(A, OBDD):
+            raise TypeError('expected an OBDD, got {}'.format(A))
+
+        if self.ordering != A.ordering:
+            raise RuntimeError('Unsupported operation: {}'.format(self) +
+                               ' and {} '.format(A) +
+                               'have different variable ordering')
+
+        if isinstance(variables, str):
+            variables = [variables]
+
+        bdd = BDDand_exists(self.root, A.root, variables, self.ordering)
+
+        return OBDD(bdd, self.ordering, check_ordering=False)
+
+    def rename(self, renaming):
+        r''' Rename the variables of an OBDD.
+
+        :param renaming: an injective map from variable names to variable
+                         names
+        :type renaming: dict
+        :returns: the OBDD representing the function obtained by replacing
+                  any variable :math:`x` of the function encoded by the
+                  current object by :math:`renaming[x]`
+        :rtype: OBDD
+        '''
+        bdd = BDDrename(self.root, renaming, self.ordering)
+
+        return OBDD(bdd, self.ordering, check_ordering=False)
+
+    def reorder(self, method='sifting', **kwargs):
+        r''' Reorder in place the variables of an OBDD.
+
+        The ordering of the current object and of all the living OBDDs
+        having the same ordering is changed in place in order to reduce
+        the number of BDD nodes (see :func:`BDD.reordering.reorder`).
+
+        :param method: either `'sifting'` or `'window'`
+        :type method: str
+        :returns: the number of BDD nodes before and after the reordering
+        :rtype: tuple
+        '''
+        from .reordering import reorder
+
+        return reorder(self.ordering, method=method, **kwargs)
+
+    def _sorted(self, variables):
+        if variables is None:
+            return self.ordering.get_list()
+
+        # the variables that are not in the ordering do not label any node
+        # and they can be placed anywhere
+        in_ordering = [var for var in variables if var in self.ordering]
+        in_ordering.sort(key=cmp_to_key(self.ordering.cmp))
+
+        return in_ordering + [var for var in variables
+                              if var not in self.ordering]
+
+    def satcount(self, variables=None):
+        r''' Count the satisfying assignments of an OBDD.
+
+        :param variables: the variables of the assignments or None for all
+                          the variables in the ordering. They must include
+                          all the variables in the OBDD
+        :type variables: a container of str
+        :returns: the number of the assignments to :param variables: that
+                  satisfy the function encoded by the current object
+        :rtype: int
+        '''
+        return BDDsatcount(self.root, self._sorted(variables))
+
+    def cubes(self):
+        r''' Lazily enumerate the satisfying cubes of an OBDD.
+
+        :returns: a generator of partial assignments, i.e., of dictionaries
+                  mapping some variable names into Boolean values, whose
+                  extensions all satisfy the function encoded by the
+                  current object. Every path to the true terminal is a cube
+        :rtype: generator
+        '''
+        return BDDcubes(self.root)
+
+    def minterms(self, variables=None):
+        r''' Lazily enumerate the satisfying assignments of an OBDD.
+
+        :param variables: the variables of the assignments or None for all
+                          the variables in the ordering. They must include
+                          all the variables in the OBDD
+        :type variables: a container of str
+        :returns: a generator of the assignments to :param variables: that
+                  satisfy the function encoded by the current object,
+                  i.e., of dictionaries mapping variable names into Boolean
+                  values
+        :rtype: generator
+        '''
+        return BDDminterms(self.root, self._sorted(variables))
+
+    def sample(self, variables=None, rng=random):
+        r''' Pick a satisfying assignment uniformly at random.
+
+        :param variables: the variables of the assignment or None for all
+                          the variables in the ordering. They must include
+                          all the variables in the OBDD
+        :type variables: a container of str
+        :param rng: a random number generator
+        :type rng: random.Random
+        :returns: an assignment to :param variables: satisfying the
+                  function encoded by the current object, i.e., a
+                  dictionary mapping variable names into Boolean values,
+                  or None whenever the function is unsatisfiable
+        :rtype: dict
+        '''
+        return BDDsample(self.root, self._sorted(variables), rng)
 
     def variables(self):
         r''' Return the variables in an OBDD.
@@ -259,10 +448,32 @@ class OBDD(object):
                                ' and {} '.format(B) +
                                'have different variable ordering')
 
-        result_cache = dict()
+        bdd = BDDapply(operator, self.root, B.root, self.ordering)
+        return OBDD(bdd, self.ordering, check_ordering=False)
+
+    def ite(self, A, B):
+        r''' Build the if-then-else of three OBDDs.
 
-        bdd = BDDapply(operator, self.root, B.root, self.ordering,
-                       result_cache)
+        :param A: an OBDD
+        :type A: OBDD
+        :param B: an OBDD
+        :type B: OBDD
+        :returns: the OBDD that represents :math:`(f \land g) \lor
+                  (\neg f \land h)` where :math:`f`, :math:`g` and
+                  :math:`h` are the functions encoded by the current object,
+                  :param A: and :param B:, respectively
+        :rtype: OBDD
+        '''
+        for C in [A, B]:
+            if not isinstance(C, OBDD):
+                raise TypeError('expected an OBDD, got {}'.format(C))
+
+            if self.ordering != C.ordering:
+                raise RuntimeError('Unsupported operation: ' +
+                                   '{} and {} '.format(self, C) +
+                                   'have different variable ordering')
+
+        bdd = BDDite(self.root, A.root, B.root, self.ordering)
         return OBDD(bdd, self.ordering, check_ordering=False)
 
     def __and__(self, A):
@@ -274,7 +485,7 @@ class OBDD(object):
                   the two OBDD
         :rtype: OBDD
         '''
-        return self.apply((lambda a, b: a and b), A)
+        return self.ite(A, OBDD(BDDNode(False), self.ordering))
 
     def __or__(self, A):
         r''' Build the non-exclusive disjunction of two OBDD.
@@ -285,7 +496,7 @@ class OBDD(object):
                   disjunction of the two OBDD
         :rtype: OBDD
         '''
-        return self.apply((lambda a, b: a or b), A)
+        return self.ite(OBDD(BDDNode(True), self.ordering), A)
 
     def __xor__(self, A):
         r''' Build the exclusive disjunction of two OBDD.
@@ -296,7 +507,10 @@ class OBDD(object):
                   of the two OBDD
         :rtype: OBDD
         '''
-        return self.apply((lambda a, b: a ^ b), A)
+        if not isinstance(A, OBDD):
+            raise TypeError('expected an OBDD, got {}'.format(A))
+
+        return self.ite(~A, A)
 
     def __invert__(self):
         r''' Build the negation of an OBDD.
@@ -306,7 +520,7 @@ class OBDD(object):
         :returns: the OBDD that represents the logical negation of the OBDD
         :rtype: OBDD
         '''
-        return OBDD(~self.root, self.ordering)
+        return OBDD(~self.root, self.ordering, check_ordering=False)
 
     def __str__(self):
         r''' Return a string that represents an OBDD
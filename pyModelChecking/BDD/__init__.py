@@ -5,6 +5,7 @@
 .. moduleauthor:: Alberto Casagrande <acasagrande@units.it>
 """
 
-from .BDD import BDDNode
+from .BDD import BDDNode, BDDManager, manager
 from .ordering import Ordering
 from .OBDD import OBDD
+from .reordering import reorder, enable_reordering, disable_reordering
@@ -0,0 +1,213 @@
+"""
+.. module:: BDD.heuristics
+   :synopsis: Provides static variable ordering heuristics.
+
+.. moduleauthor:: Alberto Casagrande <acasagrande@units.it>
+"""
+
+import ast
+
+from .BDD import BDDNode
+from .OBDD import OBDD
+from .ordering import ListOrdering
+
+
+def _names(node):
+    return set([n.id for n in ast.walk(node)
+                if isinstance(n, ast.Name) and n.id not in ['True', 'False']])
+
+
+def support(bfunct):
+    r''' Return the variables on which a binary function syntactically
+    depends.
+
+    :param bfunct: either a string representing a binary expression, an
+                   OBDD, a BDDNode, or a container of variable names
+    :type bfunct: str, OBDD, BDDNode, or a container of str
+    :returns: the set of the variables in :param bfunct:
+    :rtype: set
+    '''
+    if isinstance(bfunct, str):
+        return _names(ast.parse(bfunct))
+
+    if isinstance(bfunct, (OBDD, BDDNode)):
+        return bfunct.variables()
+
+    if isinstance(bfunct, bool):
+        return set()
+
+    return set(bfunct)
+
+
+def split_support(bfunct):
+    r''' Return the supports of the conjuncts of a binary expression.
+
+    Whenever :param bfunct: is a string that represents a conjunction, the
+    supports of its conjuncts are returned separately, so that, e.g., a
+    transition relation specified as a conjunction of constraints
+    contributes one support per constraint.
+
+    :param bfunct: either a string representing a binary expression, an
+                   OBDD, a BDDNode, or a container of variable names
+    :type bfunct: str, OBDD, BDDNode, or a container of str
+    :returns: a list of sets of variables
+    :rtype: list
+    '''
+    if not isinstance(bfunct, str):
+        return [support(bfunct)]
+
+    stack = [ast.parse(bfunct).body[0].value]
+    supports = []
+    while stack:
+        node = stack.pop()
+        if isinstance(node, ast.BinOp) and isinstance(node.op, ast.BitAnd):
+            stack.extend([node.right, node.left])
+        elif isinstance(node, ast.BoolOp) and isinstance(node.op, ast.And):
+            stack.extend(reversed(node.values))
+        else:
+            supports.append(_names(node))
+
+    return supports
+
+
+def _variables_in(supports, variables):
+    if variables is None:
+        variables = []
+        for sup in supports:
+            variables.extend(sorted(var for var in sup
+                                    if var not in variables))
+
+    supports = [set(sup) for sup in supports if sup]
+    for sup in supports:
+        if not sup.issubset(variables):
+            raise RuntimeError('{} is not in '.format(sup - set(variables)) +
+                               '{}'.format(variables))
+
+    return list(variables), supports
+
+
+def interleave(variables, suffix='_next'):
+    r''' Build the ordering that interleaves present and next state variables.
+
+    :param variables: a list of variable names
+    :type variables: list of str
+    :param suffix: the suffix of the next state variable names
+    :type suffix: str
+    :returns: the ordering in which every variable :math:`x` is immediately
+              followed by :math:`x` + :param suffix:
+    :rtype: ListOrdering
+    '''
+    ordering = []
+    for var in variables:
+        ordering.extend([var, var+suffix])
+
+    return ListOrdering(ordering)
+
+
+def dfs_ordering(supports, variables=None):
+    r''' Order variables by a depth-first visit of their interaction graph.
+
+    Two variables interact whenever they belong to the same support. The
+    visit starts from the variable having the greatest number of
+    interactions and it goes through the most interacting neighbours
+    first, so that strongly related variables are placed close to each
+    other.
+
+    :param supports: a list of sets of variables, e.g., the supports of the
+                     functions to be represented (see :func:`support`)
+    :type supports: list
+    :param variables: the variables to be ordered in their default
+                      order, which breaks ties, or None to order the
+                      variables in the supports
+    :type variables: list
+    :returns: the computed ordering
+    :rtype: ListOrdering
+    '''
+    variables, supports = _variables_in(supports, variables)
+    position = dict([(var, i) for i, var in enumerate(variables)])
+
+    weight = dict([(var, dict()) for var in variables])
+    for sup in supports:
+        for var in sup:
+            for other in sup:
+                if var != other:
+                    weight[var][other] = weight[var].get(other, 0) + 1
+
+    def by_weight(var, weights):
+        return (-weights[var], position[var])
+
+    degree = dict([(var, sum(weight[var].values())) for var in variables])
+
+    ordering = []
+    visited = set()
+    for root in sorted(variables, key=(lambda var: by_weight(var, degree))):
+        stack = [root]
+        while stack:
+            var = stack.pop()
+            if var in visited:
+                continue
+
+            visited.add(var)
+            ordering.append(var)
+
+            neighbours = sorted([n for n in weight[var] if n not in visited],
+                                key=(lambda n: by_weight(n, weight[var])))
+            stack.extend(reversed(neighbours))
+
+    return ListOrdering(ordering)
+
+
+def _span(supports, position):
+    return sum([max(position[var] for var in sup) -
+                min(position[var] for var in sup) for sup in supports])
+
+
+def force_ordering(supports, variables=None, max_iterations=100):
+    r''' Order variables by using the FORCE heuristic.
+
+    The supports are seen as the hyperedges of a hypergraph whose nodes are
+    the variables. At every iteration, the center of gravity of every
+    hyperedge is computed as the average position of its variables and
+    every variable is moved to the average of the centers of gravity of its
+    hyperedges. The iterations stop as soon as the total span of the
+    hyperedges does not decrease any more (see [AMS03]_).
+
+    :param supports: a list of sets of variables, e.g., the supports of the
+                     functions to be represented (see :func:`support`)
+    :type supports: list
+    :param variables: the initial ordering of the variables or None to
+                      order the variables in the supports
+    :type variables: list
+    :param max_iterations: the maximum number of iterations
+    :type max_iterations: int
+    :returns: the computed ordering
+    :rtype: ListOrdering
+    '''
+    variables, supports = _variables_in(supports, variables)
+
+    position = dict([(var, i) for i, var in enumerate(variables)])
+    best, best_span = list(variables), _span(supports, position)
+
+    for iteration in range(max_iterations):
+        gravity = dict([(var, []) for var in variables])
+        for sup in supports:
+            center = sum([position[var] for var in sup])/float(len(sup))
+            for var in sup:
+                gravity[var].append(center)
+
+        def new_position(var):
+            if gravity[var]:
+                return (sum(gravity[var])/len(gravity[var]), position[var])
+
+            return (position[var], position[var])
+
+        variables = sorted(variables, key=new_position)
+        position = dict([(var, i) for i, var in enumerate(variables)])
+
+        span = _span(supports, position)
+        if span >= best_span:
+            break
+
+        best, best_span = list(variables), span
+
+    return ListOrdering(best)
@@ -47,6 +47,9 @@ class FunctionOrdering(Ordering):
 
         return self.ordering is ordering.ordering
 
+    def __hash__(self):
+        return hash(self.ordering)
+
     def in_order(self, x, y):
         return self.ordering(x, y)
 
@@ -108,12 +111,29 @@ class ListOrdering(Ordering):
             self.ordering[obj] = i
             i += 1
 
+        self._hash = hash(frozenset(self.ordering.items()))
+
+    def set_list(self, ordering):
+        r''' Replace in place the list of the variables
+
+        :param ordering: a permutation of the variables in the ordering
+        :type ordering: list
+        '''
+        if set(ordering) != set(self.ordering.keys()):
+            raise RuntimeError('%s is not a permutation of %s'
+                               % (ordering, self.get_list()))
+
+        self.__init__(ordering)
+
     def __eq__(self, ordering):
         if not isinstance(ordering, ListOrdering):
             return False
 
         return self.ordering == ordering.ordering
 
+    def __hash__(self):
+        return self._hash
+
     def in_order(self, x, y):
         return self.cmp(x, y) < 0
 
@@ -0,0 +1,334 @@
+"""
+.. module:: BDD.reordering
+   :synopsis: Provides dynamic variable reordering for OBDDs.
+
+.. moduleauthor:: Alberto Casagrande <acasagrande@units.it>
+"""
+
+from array import array
+from itertools import permutations
+
+from .BDD import manager, FREE
+from .OBDD import OBDD
+from .ordering import ListOrdering
+
+
+class _Levels(object):
+    r'''
+    A class to swap adjacent levels of the BDD store in place.
+
+    The class maintains the reference counts of the nodes and the set of
+    nodes labelled by each variable, so that the nodes that become dead
+    during the swaps are immediately reclaimed and the size of the store
+    is always the number of the living nodes.
+    '''
+
+    def __init__(self, variables):
+        m = manager
+        m.collect()
+
+        self.levels = [m.var_index(var) for var in variables]
+
+        self.refs = array('i', [0]) * len(m.var)
+        self.subtables = [set() for var in m.var_names]
+
+        for row in m.unique.values():
+            self.refs[m.low[row] >> 1] += 1
+            self.refs[m.high[row] >> 1] += 1
+            self.subtables[m.var[row]].add(row)
+
+        for handle in list(m._views.keys()):
+            self.refs[handle >> 1] += 1
+
+    def size(self):
+        return len(manager.unique)
+
+    def _make_node(self, var, low, high):
+        if low == high:
+            return low
+
+        m = manager
+        complemented = low & 1
+
+        row = m.unique.get((var << 64) | ((low ^ complemented) << 32) |
+                           (high ^ complemented))
+        if row is None:
+            row = m.make_node(var, low, high) >> 1
+
+            if row >= len(self.refs):
+                self.refs.extend([0] * (row + 1 - len(self.refs)))
+
+            self.refs[row] = 0
+            self.refs[low >> 1] += 1
+            self.refs[high >> 1] += 1
+            self.subtables[var].add(row)
+
+        return (row << 1) | complemented
+
+    def _dereference(self, row):
+        m = manager
+
+        stack = [row]
+        while stack:
+            row = stack.pop()
+            if row == 0:
+                continue
+
+            self.refs[row] -= 1
+            if self.refs[row] == 0:
+                del m.unique[(m.var[row] << 64) | (m.low[row] << 32) |
+                             m.high[row]]
+
+                self.subtables[m.var[row]].discard(row)
+                m.var[row] = FREE
+                m.free.append(row)
+
+                stack.append(m.low[row] >> 1)
+                stack.append(m.high[row] >> 1)
+
+    def swap(self, level):
+        r''' Swap a level and the following one
+
+        The nodes labelled by the variable at :param level: that have a
+        son labelled by the following variable are rewritten in place, so
+        that the function represented by every node is preserved.
+
+        :param level: a level
+        :type level: int
+        '''
+        var, low, high = manager.var, manager.low, manager.high
+        unique = manager.unique
+
+        x, y = self.levels[level], self.levels[level+1]
+        for row in list(self.subtables[x]):
+            f0, f1 = low[row], high[row]
+
+            y_in_f0 = f0 > 1 and var[f0 >> 1] == y
+            y_in_f1 = f1 > 1 and var[f1 >> 1] == y
+            if not (y_in_f0 or y_in_f1):
+                continue
+
+            # f0 is regular, thus its sons do not need to be complemented
+            if y_in_f0:
+                f00, f01 = low[f0 >> 1], high[f0 >> 1]
+            else:
+                f00 = f01 = f0
+
+            if y_in_f1:
+                f10 = low[f1 >> 1] ^ (f1 & 1)
+                f11 = high[f1 >> 1] ^ (f1 & 1)
+            else:
+                f10 = f11 = f1
+
+            g0 = self._make_node(x, f00, f10)
+            g1 = self._make_node(x, f01, f11)
+            self.refs[g0 >> 1] += 1
+            self.refs[g1 >> 1] += 1
+
+            # the node keeps its row, so that the edges pointing to it
+            # are still valid, and it is relabelled by y. Since it depends
+            # on x, either g0 or g1 is labelled by x and no other node
+            # labelled by y has the same sons
+            del unique[(x << 64) | (f0 << 32) | f1]
+
+            var[row], low[row], high[row] = y, g0, g1
+            unique[(y << 64) | (g0 << 32) | g1] = row
+
+            self.subtables[x].discard(row)
+            self.subtables[y].add(row)
+
+            self._dereference(f0 >> 1)
+            self._dereference(f1 >> 1)
+
+        self.levels[level], self.levels[level+1] = y, x
+
+    def move(self, src, dst):
+        r''' Move the variable at a level to another level
+
+        :param src: the level of the variable to be moved
+        :type src: int
+        :param dst: the destination level
+        :type dst: int
+        '''
+        while src < dst:
+            self.swap(src)
+            src += 1
+
+        while src > dst:
+            self.swap(src-1)
+            src -= 1
+
+
+def _sift(levels, movable, max_growth):
+    variables = sorted(movable,
+                       key=(lambda var: len(levels.subtables[var])),
+                       reverse=True)
+
+    last = len(levels.levels) - 1
+    for var in variables:
+        position = levels.levels.index(var)
+
+        best_size, best_position = levels.size(), position
+
+        # the closest end is explored first
+        if position < last - position:
+            ends = [0, last]
+        else:
+            ends = [last, 0]
+
+        for end in ends:
+            step = 1 if end > position else -1
+            while position != end:
+                levels.move(position, position+step)
+                position += step
+
+                size = levels.size()
+                if size < best_size:
+                    best_size, best_position = size, position
+                elif size > max_growth * best_size:
+                    break
+
+        levels.move(position, best_position)
+
+
+def _window_permutation(levels, movable, window):
+    improved = True
+    while improved:
+        improved = False
+        for first in range(len(levels.levels)-window+1):
+            variables = levels.levels[first:first+window]
+            if len([var for var in variables if var not in movable]) > 1:
+                continue
+
+            best_size, best_variables = levels.size(), list(variables)
+
+            for candidate in permutations(variables):
+                _place(levels, first, candidate)
+
+                if levels.size() < best_size:
+                    best_size = levels.size()
+                    best_variables = list(candidate)
+                    improved = True
+
+            _place(levels, first, best_variables)
+
+
+def _place(levels, first, variables):
+    # bubble the variables into their positions by adjacent swaps
+    for i, var in enumerate(variables):
+        levels.move(levels.levels.index(var), first+i)
+
+
+def _live_orderings():
+    # the orderings of the living OBDDs grouped by variable list and the
+    # variables of the OBDDs whose ordering is not a list
+    orderings = dict()
+    pinned = set()
+    for obdd in list(OBDD.instances.values()):
+        if isinstance(obdd.ordering, ListOrdering):
+            # equivalent orderings are distinguished by identity
+            orderings.setdefault(tuple(obdd.ordering.get_list()),
+                                 dict())[id(obdd.ordering)] = obdd.ordering
+        else:
+            pinned.update(obdd.variables())
+
+    return orderings, pinned
+
+
+def reorder(ordering=None, method='sifting', max_growth=1.2, window=3):
+    r''' Reorder in place the variables of the living OBDDs.
+
+    The variables are reordered by swapping adjacent levels of the BDD
+    store in place, so that all the living BDD nodes keep representing the
+    same functions. Every living OBDD whose ordering is equivalent to
+    :param ordering: is affected and its ordering is updated in place.
+    Since BDD nodes can be shared among OBDDs having different orderings,
+    a variable that also belongs to the ordering of some other living
+    OBDD is never swapped with another variable of that kind.
+
+    Two methods are available:
+
+    * Rudell's sifting (`'sifting'`) moves every variable through all the
+      levels and leaves it at the level that minimizes the number of
+      nodes;
+    * window permutation (`'window'`) tries all the permutations of the
+      variables in every window of adjacent levels and keeps the best one.
+
+    :param ordering: a variable ordering or None to reorder the variables
+                     of all the orderings of the living OBDDs
+    :type ordering: ListOrdering, list, or None
+    :param method: either `'sifting'` or `'window'`
+    :type method: str
+    :param max_growth: the maximum ratio between the size of the store and
+                       the best size found so far while sifting a variable
+    :type max_growth: float
+    :param window: the size of the windows
+    :type window: int
+    :returns: the number of BDD nodes before and after the reordering
+    :rtype: tuple
+    '''
+    if method not in ['sifting', 'window']:
+        raise ValueError('unsupported reordering method ' +
+                         '{}'.format(method))
+
+    manager.collect()
+    before = len(manager)
+
+    orderings, pinned = _live_orderings()
+    if ordering is None:
+        to_reorder = list(orderings.keys())
+    else:
+        if not isinstance(ordering, ListOrdering):
+            ordering = ListOrdering(ordering)
+
+        to_reorder = [tuple(ordering.get_list())]
+        orderings.setdefault(to_reorder[0], dict())[id(ordering)] = ordering
+
+    for variables in to_reorder:
+        shared = set(pinned)
+        for other in orderings:
+            if other != variables:
+                shared.update(set(other) & set(variables))
+
+        levels = _Levels(variables)
+        movable = set([manager.var_index(var) for var in variables
+                       if var not in shared])
+
+        if method == 'sifting':
+            _sift(levels, movable, max_growth)
+        else:
+            _window_permutation(levels, movable, window)
+
+        new_variables = [manager.var_names[var] for var in levels.levels]
+        for obdd_ordering in orderings[variables].values():
+            obdd_ordering.set_list(new_variables)
+
+    # the computed table is keyed by the orderings and their hashes have
+    # changed
+    manager.collect()
+
+    return (before, len(manager))
+
+
+def enable_reordering(method='sifting', threshold=2**16, **kwargs):
+    r''' Enable the automatic reordering of the living OBDDs.
+
+    Whenever the number of BDD nodes exceeds the threshold at the beginning
+    of a BDD operation, all the orderings of the living OBDDs are reordered
+    (see :func:`reorder`). After any reordering, the threshold is raised to
+    twice the number of nodes, whenever this is greater.
+
+    :param method: either `'sifting'` or `'window'`
+    :type method: str
+    :param threshold: the number of BDD nodes that triggers the reordering
+    :type threshold: int
+    :param kwargs: the remaining parameters of :func:`reorder`
+    '''
+    manager.set_reordering((lambda: reorder(method=method, **kwargs)),
+                           threshold)
+
+
+def disable_reordering():
+    r''' Disable the automatic reordering of the living OBDDs.
+    '''
+    manager.set_reordering(None)
@@ -7,7 +7,7 @@
 """
 
 from .language import *
-from .model_checking import modelcheck
+from .model_checking import modelcheck, modelcheck_many, modelcheck_stream
 
 from ..language import LNot
 
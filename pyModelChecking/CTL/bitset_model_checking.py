@@ -0,0 +1,366 @@
+"""
+.. module:: CTL.bitset_model_checking
+   :synopsis: Provides model checking methods for the CTL language that
+              represent sets of states as bitsets.
+
+.. moduleauthor:: Alberto Casagrande <acasagrande@units.it>
+"""
+
+from array import array
+
+from .language import *
+from pyModelChecking.graph import _CSR_reach, _CSR_compute_SCCs
+from pyModelChecking.kripke import _get_fairness_constraints
+
+import pyModelChecking.CTLS
+
+import sys
+
+CTLS = sys.modules['pyModelChecking.CTLS']
+
+_TO_DIGITS = bytes.maketrans(b'\x00\x01', b'01')
+_TO_FLAGS = bytes.maketrans(b'01', b'\x00\x01')
+
+
+# sets of states are either bitsets, i.e., integers whose i-th bit is set
+# if and only if the i-th state is in the set, or bytearrays of 0/1 flags.
+def _from_flags(flags):
+    return int(flags[::-1].translate(_TO_DIGITS) or b'0', 2)
+
+
+def _to_flags(bitset, size):
+    digits = bin(bitset)[:1:-1].ljust(size, '0')
+
+    return bytearray(digits.encode('ascii').translate(_TO_FLAGS))
+
+
+def _ids(bitset):
+    digits = bin(bitset)[:1:-1]
+
+    ids = []
+    i = digits.find('1')
+    while i >= 0:
+        ids.append(i)
+        i = digits.find('1', i+1)
+
+    return ids
+
+
+class _BitsetKripke(object):
+    def __init__(self, kripke, F=None):
+        # the CSR form is cached by the Kripke structure
+        graph = kripke._get_CSR_graph()
+
+        self.graph = graph
+        self.size = len(graph._nodes)
+        self.all = (1 << self.size)-1
+        self.offsets = graph._offsets
+        self.targets = graph._targets
+        self.r_offsets, self.r_targets = graph._reversed_CSR()
+
+        # the atomic proposition index of the original Kripke structure
+        self.states_labelled_by = kripke.states_labelled_by
+
+        if F is None:
+            self.fair = None
+        else:
+            # the fair states are cached by the original Kripke structure
+            self.fair = self.bitset_of(kripke.get_fair_states(F))
+            self.constraints = [self.bitset_of(P) for P
+                                in _get_fairness_constraints(kripke, F)]
+
+    def states_in(self, bitset):
+        nodes = self.graph._nodes
+
+        return set([nodes[i] for i in _ids(bitset)])
+
+    def bitset_of(self, states):
+        index = self.graph._index
+
+        flags = bytearray(self.size)
+        for v in states:
+            i = index.get(v)
+            if i is not None:
+                flags[i] = 1
+
+        return _from_flags(flags)
+
+    def pre(self, bitset):
+        flags = bytearray(self.size)
+        r_offsets, r_targets = self.r_offsets, self.r_targets
+        for j in _ids(bitset):
+            for i in r_targets[r_offsets[j]:r_offsets[j+1]]:
+                flags[i] = 1
+
+        return _from_flags(flags)
+
+    def backward_reach(self, sources, inside):
+        reached = bytearray(self.size)
+        for i in sources:
+            reached[i] = 1
+
+        _CSR_reach(self.r_offsets, self.r_targets, list(sources), reached,
+                   inside)
+
+        return reached
+
+
+def _checkAtomicProposition(K, formula, L):
+    if formula not in L:
+        L[formula] = K.bitset_of(K.states_labelled_by(formula.name))
+
+    return L[formula]
+
+
+def _checkNot(K, formula, L):
+    if formula not in L:
+        Lphi = _checkStateFormula(K, formula.subformula(0), L)
+
+        L[formula] = K.all ^ Lphi
+
+    return L[formula]
+
+
+def _checkOr(K, formula, L):
+    if formula not in L:
+        Lformula = 0
+        for sf in formula.subformulas():
+            Lformula |= _checkStateFormula(K, sf, L)
+
+        L[formula] = Lformula
+
+    return L[formula]
+
+
+def _checkAnd(K, formula, L):
+    if formula not in L:
+        Lformula = K.all
+        for sf in formula.subformulas():
+            Lformula &= _checkStateFormula(K, sf, L)
+
+        L[formula] = Lformula
+
+    return L[formula]
+
+
+def _checkEX(K, formula, L):
+    if formula not in L:
+        p_formula = formula.subformula(0)
+        Lphi = _checkStateFormula(K, p_formula.subformula(0), L)
+
+        if K.fair is not None:
+            # a fair path through a successor leaves from it
+            Lphi &= K.fair
+
+        L[formula] = K.pre(Lphi)
+
+    return L[formula]
+
+
+def _checkEU(K, formula, L):
+    if formula not in L:
+        Lphi = []
+        p_formula = formula.subformula(0)
+        for i in range(2):
+            Lphi.append(_checkStateFormula(K, p_formula.subformula(i), L))
+
+        if K.fair is not None:
+            # a fair path must leave from the state satisfying phi1
+            Lphi[1] &= K.fair
+
+        inside = _to_flags(Lphi[0], K.size)
+        reached = K.backward_reach(_ids(Lphi[1]), inside)
+
+        L[formula] = _from_flags(reached)
+
+    return L[formula]
+
+
+def _checkEG_by_SCCs(K, ids, inside):
+    offsets, targets = K.offsets, K.targets
+
+    T = []
+    for scc in _CSR_compute_SCCs(offsets, targets, ids, inside):
+        v = scc[0]
+        if len(scc) > 1 or v in targets[offsets[v]:offsets[v+1]]:
+            T.extend(scc)
+
+    return K.backward_reach(T, inside)
+
+
+def _checkEG_by_fixpoint(K, inside, count, queue):
+    # count[i] is the number of the successors of i that satisfy phi and
+    # have not been removed yet, while queue contains the states whose
+    # counter is 0
+    alive = bytearray(inside)
+    r_offsets, r_targets = K.r_offsets, K.r_targets
+    while queue:
+        i = queue.pop()
+        alive[i] = 0
+        for j in r_targets[r_offsets[i]:r_offsets[i+1]]:
+            if alive[j]:
+                count[j] -= 1
+                if not count[j]:
+                    queue.append(j)
+
+    return alive
+
+
+# the greatest fixpoint of EG scans the predecessors of the removed
+# states, while the SCC decomposition walks the edges among the states
+# satisfying phi at a higher cost per edge. The SCCs are used only when
+# removing the states that have no successor satisfying phi scans more
+# than _EG_SCC_RATIO predecessors per state or edge among those states
+_EG_SCC_RATIO = 32
+
+
+def _checkEG_under_fairness(K, Lphi):
+    # the Emerson-Lei greatest fixpoint (see get_fair_EG_states)
+    Z = Lphi
+    changed = True
+    while changed and Z:
+        changed = False
+        for P in K.constraints:
+            inside = _to_flags(Z, K.size)
+            reached = K.backward_reach(_ids(Z & P), inside)
+
+            new_Z = Z & K.pre(_from_flags(reached))
+            if new_Z != Z:
+                changed = True
+                Z = new_Z
+
+    return Z
+
+
+def _get_EG_states(K, Lphi):
+    ids = _ids(Lphi)
+    inside = _to_flags(Lphi, K.size)
+    offsets, targets = K.offsets, K.targets
+    r_offsets = K.r_offsets
+
+    count = array('q', [0])*K.size
+    queue = []
+    for i in ids:
+        count[i] = sum([inside[j] for j in targets[offsets[i]:offsets[i+1]]])
+        if not count[i]:
+            queue.append(i)
+
+    scan = sum([r_offsets[i+1]-r_offsets[i] for i in queue])
+    if scan > _EG_SCC_RATIO*(len(ids) + sum(count)):
+        flags = _checkEG_by_SCCs(K, ids, inside)
+    else:
+        flags = _checkEG_by_fixpoint(K, inside, count, queue)
+
+    return _from_flags(flags)
+
+
+def _checkEG(K, formula, L):
+    if formula not in L:
+        p_formula = formula.subformula(0)
+        Lphi = _checkStateFormula(K, p_formula.subformula(0), L)
+
+        if K.fair is None:
+            L[formula] = _get_EG_states(K, Lphi)
+        else:
+            L[formula] = _checkEG_under_fairness(K, Lphi)
+
+    return L[formula]
+
+
+def _checkStateFormula(K, formula, L):
+    if formula in L:
+        return L[formula]
+
+    if isinstance(formula, CTLS.Not):
+        return _checkNot(K, formula, L)
+
+    if isinstance(formula, CTLS.Or):
+        return _checkOr(K, formula, L)
+
+    if isinstance(formula, CTLS.And):
+        return _checkAnd(K, formula, L)
+
+    if (isinstance(formula, CTLS.Bool) or isinstance(formula, bool)):
+        if formula == Bool(True):
+            return K.all
+
+        return 0
+
+    if isinstance(formula, CTLS.AtomicProposition):
+        return _checkAtomicProposition(K, formula, L)
+
+    if isinstance(formula, CTLS.E):
+        p_formula = formula.subformula(0)
+        if isinstance(p_formula, CTLS.G):
+            return _checkEG(K, formula, L)
+
+        if isinstance(p_formula, CTLS.U):
+            return _checkEU(K, formula, L)
+
+        if isinstance(p_formula, CTLS.X):
+            return _checkEX(K, formula, L)
+
+    restr_f = formula.get_equivalent_restricted_formula()
+
+    Lalter_formula = _checkStateFormula(K, restr_f, L)
+
+    L[formula] = Lalter_formula
+
+    return Lalter_formula
+
+
+def check_state_formula(kripke, formula, F=None):
+    r''' Computes the states satisfying a CTL state formula by using bitsets.
+
+    The states of the Kripke structure are interned into the integers
+    :math:`0, \ldots, n-1` (see :meth:`Kripke.freeze`) and the set of
+    states satisfying each subformula is represented by a Python integer
+    whose :math:`i`-th bit is set if and only if the :math:`i`-th state
+    satisfies the subformula. Hence, Boolean connectives are evaluated by
+    word-parallel integer operations.
+
+    :param kripke: a Kripke structure.
+    :type kripke: Kripke
+    :param formula: a CTL state formula.
+    :type formula: CTL.StateFormula
+    :param F: a container of fairness constraints. Whenever it is not None,
+              the path quantifiers range over the fair paths only (see
+              :meth:`Kripke.get_fair_states`)
+    :type F: a container of sets of states
+    :returns: the set of the Kripke structure states that satisfy the
+              formula.
+    :rtype: set
+    '''
+    return check_state_formulas(kripke, [formula], F)[0]
+
+
+def check_state_formulas(kripke, formulas, F=None, L=None):
+    r''' Computes the states satisfying many CTL state formulas by bitsets.
+
+    The states of the Kripke structure are interned once for all the
+    formulas (see :func:`check_state_formula`) and the bitsets of the
+    subformulas are stored in :param L:, so that every subformula shared
+    by some formulas is evaluated once.
+
+    :param kripke: a Kripke structure.
+    :type kripke: Kripke
+    :param formulas: a list of CTL state formulas.
+    :type formulas: list
+    :param F: a container of fairness constraints. Whenever it is not None,
+              the path quantifiers range over the fair paths only (see
+              :meth:`Kripke.get_fair_states`)
+    :type F: a container of sets of states
+    :param L: either None or an initially empty dictionary in which the
+              bitsets of the evaluated subformulas are stored
+    :type L: dict
+    :returns: the list of the sets of the Kripke structure states that
+              satisfy the formulas.
+    :rtype: list
+    '''
+    if L is None:
+        L = dict()
+
+    K = _BitsetKripke(kripke, F)
+
+    return [K.states_in(_checkStateFormula(K, formula, L))
+            for formula in formulas]
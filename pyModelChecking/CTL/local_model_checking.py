@@ -0,0 +1,177 @@
+"""
+.. module:: CTL.local_model_checking
+   :synopsis: Provides local model checking methods for the CTL language.
+
+.. moduleauthor:: Alberto Casagrande <acasagrande@units.it>
+"""
+
+from .language import *
+
+import pyModelChecking.CTLS
+
+import sys
+
+CTLS = sys.modules['pyModelChecking.CTLS']
+
+
+# L maps every formula into a dictionary that associates the already
+# decided states to their truth values
+def _checkEX(kripke, formula, state, L):
+    phi = formula.subformula(0).subformula(0)
+
+    for succ in kripke.next(state):
+        if _holds(kripke, phi, succ, L):
+            return True
+
+    return False
+
+
+def _checkEU(kripke, formula, state, L):
+    p_formula = formula.subformula(0)
+    phi = [p_formula.subformula(i) for i in range(2)]
+    values = L[formula]
+
+    if _holds(kripke, phi[1], state, L):
+        return True
+
+    if not _holds(kripke, phi[0], state, L):
+        return False
+
+    # depth-first search of a state satisfying phi[1] along a path whose
+    # states satisfy phi[0]: all the states on the stack reach it
+    visited = set([state])
+    stack = [(state, iter(kripke.next(state)))]
+    while stack:
+        src, succs = stack[-1]
+        for dst in succs:
+            if dst in visited or (dst in values and not values[dst]):
+                continue
+
+            if dst in values or _holds(kripke, phi[1], dst, L):
+                for (node, _) in stack:
+                    values[node] = True
+
+                return True
+
+            visited.add(dst)
+            if _holds(kripke, phi[0], dst, L):
+                stack.append((dst, iter(kripke.next(dst))))
+                break
+
+            values[dst] = False
+        else:
+            stack.pop()
+
+    # no visited state reaches a state satisfying phi[1]
+    for node in visited:
+        values[node] = False
+
+    return False
+
+
+def _checkEG(kripke, formula, state, L):
+    phi = formula.subformula(0).subformula(0)
+    values = L[formula]
+
+    if not _holds(kripke, phi, state, L):
+        return False
+
+    # depth-first search of a cycle whose states satisfy phi: whenever
+    # a state is popped out of the stack, no such cycle is reachable from
+    # it and, since Kripke structures are total, it does not satisfy EG phi
+    on_stack = set([state])
+    visited = set([state])
+    stack = [(state, iter(kripke.next(state)))]
+    while stack:
+        src, succs = stack[-1]
+        for dst in succs:
+            if dst in on_stack or values.get(dst, False):
+                for (node, _) in stack:
+                    values[node] = True
+
+                return True
+
+            if dst in visited or dst in values:
+                continue
+
+            visited.add(dst)
+            if _holds(kripke, phi, dst, L):
+                on_stack.add(dst)
+                stack.append((dst, iter(kripke.next(dst))))
+                break
+
+            values[dst] = False
+        else:
+            stack.pop()
+            on_stack.remove(src)
+            values[src] = False
+
+    return False
+
+
+def _holds(kripke, formula, state, L):
+    if formula not in L:
+        L[formula] = dict()
+
+    values = L[formula]
+    if state in values:
+        return values[state]
+
+    if isinstance(formula, CTLS.Not):
+        value = not _holds(kripke, formula.subformula(0), state, L)
+    elif isinstance(formula, CTLS.Or):
+        value = any(_holds(kripke, sf, state, L)
+                    for sf in formula.subformulas())
+    elif isinstance(formula, CTLS.And):
+        value = all(_holds(kripke, sf, state, L)
+                    for sf in formula.subformulas())
+    elif (isinstance(formula, CTLS.Bool) or isinstance(formula, bool)):
+        value = (formula == Bool(True))
+    elif isinstance(formula, CTLS.AtomicProposition):
+        value = formula.name in kripke._get_labels(state)
+    elif (isinstance(formula, CTLS.E) and
+          isinstance(formula.subformula(0), CTLS.G)):
+        value = _checkEG(kripke, formula, state, L)
+    elif (isinstance(formula, CTLS.E) and
+          isinstance(formula.subformula(0), CTLS.U)):
+        value = _checkEU(kripke, formula, state, L)
+    elif (isinstance(formula, CTLS.E) and
+          isinstance(formula.subformula(0), CTLS.X)):
+        value = _checkEX(kripke, formula, state, L)
+    else:
+        restr_f = formula.get_equivalent_restricted_formula()
+
+        value = _holds(kripke, restr_f, state, L)
+
+    values[state] = value
+
+    return value
+
+
+def check_initial_states(kripke, formula):
+    r''' Decides whether all the initial states satisfy a CTL state formula.
+
+    The formula is evaluated locally, in the style of [VL93]_: the truth
+    value of a subformula is computed on demand in the states that are
+    needed to decide the truth value of its superformulas. The temporal
+    operators are evaluated by depth-first searches that stop as soon as
+    their truth value is decided. Hence, only the states reachable from the
+    initial states are explored and the search stops at the first initial
+    state that does not satisfy the formula.
+
+    :param kripke: a Kripke structure.
+    :type kripke: Kripke
+    :param formula: a CTL state formula.
+    :type formula: CTL.StateFormula
+    :returns: the pair :math:`(True, None)` if all the initial states
+              satisfy the formula and the pair :math:`(False, s)`, where
+              :math:`s` is an initial state that does not satisfy the
+              formula, otherwise.
+    :rtype: tuple
+    '''
+    L = dict()
+    for state in kripke.S0:
+        if not _holds(kripke, formula, state, L):
+            return (False, state)
+
+    return (True, None)
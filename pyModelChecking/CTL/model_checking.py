@@ -7,11 +7,22 @@
 
 from .language import *
 from pyModelChecking.graph import compute_SCCs
-from pyModelChecking.kripke import Kripke
+from pyModelChecking.kripke import Kripke, get_fair_EG_states
+from pyModelChecking.kripke import _get_fairness_constraints
+from pyModelChecking.symbolic_kripke import SymbolicKripke
+from pyModelChecking.cache import cached_modelcheck, get_result_key
 
 import pyModelChecking.CTLS
 
 from .parser import Parser
+from pyModelChecking.parser import check_stream
+from .bitset_model_checking import check_state_formula as _check_by_bitsets
+from .bitset_model_checking import check_state_formulas as \
+    _check_many_by_bitsets
+from .symbolic_model_checking import check_state_formula as _check_by_OBDDs
+from .symbolic_model_checking import check_state_formulas as \
+    _check_many_by_OBDDs
+from .local_model_checking import check_initial_states as _check_locally
 
 import sys
 
@@ -23,21 +34,16 @@ def _init_formula_in(formula, L):
         L[formula] = set()
 
 
-def _checkAtomicProposition(kripke, formula, L):
+def _checkAtomicProposition(kripke, formula, L, F):
     if formula not in L:
-        Lformula = set()
-        for v in kripke.states():
-            if formula.name in kripke.labels(v):
-                Lformula.add(v)
-
-        L[formula] = Lformula
+        L[formula] = set(kripke.states_labelled_by(formula.name))
 
     return L[formula]
 
 
-def _checkNot(kripke, formula, L):
+def _checkNot(kripke, formula, L, F):
     if formula not in L:
-        Lphi = _checkStateFormula(kripke, formula.subformula(0), L)
+        Lphi = _checkStateFormula(kripke, formula.subformula(0), L, F)
 
         Lformula = set()
         for v in kripke.states():
@@ -49,11 +55,15 @@ def _checkNot(kripke, formula, L):
     return L[formula]
 
 
-def _checkEX(kripke, formula, L):
+def _checkEX(kripke, formula, L, F):
     if formula not in L:
 
         p_formula = formula.subformula(0)
-        Lphi = _checkStateFormula(kripke, p_formula.subformula(0), L)
+        Lphi = _checkStateFormula(kripke, p_formula.subformula(0), L, F)
+
+        if F is not None:
+            # a fair path through a successor leaves from it
+            Lphi = Lphi & kripke.get_fair_states(F)
 
         Lformula = set()
         for (src, dst) in kripke.transitions_iter():
@@ -65,11 +75,11 @@ def _checkEX(kripke, formula, L):
     return L[formula]
 
 
-def _checkOr(kripke, formula, L):
+def _checkOr(kripke, formula, L, F):
     if formula not in L:
         Lformula = set()
         for sf in formula.subformulas():
-            for v in _checkStateFormula(kripke, sf, L):
+            for v in _checkStateFormula(kripke, sf, L, F):
                 Lformula.add(v)
 
         L[formula] = Lformula
@@ -77,62 +87,102 @@ def _checkOr(kripke, formula, L):
     return L[formula]
 
 
-def _checkEU(kripke, formula, L):
+def _checkEU(kripke, formula, L, F):
     if formula not in L:
         Lphi = []
         p_formula = formula.subformula(0)
         for i in range(2):
-            Lphi.append(_checkStateFormula(kripke, p_formula.subformula(i), L))
-
-        subgraph = kripke.get_subgraph(Lphi[0])
-        subgraph = subgraph.get_reversed_graph()
+            sf = p_formula.subformula(i)
+            Lphi.append(_checkStateFormula(kripke, sf, L, F))
 
-        for v in Lphi[0]:
-            for w in (kripke.next(v) & Lphi[1]):
-                try:
-                    subgraph.add_edge(w, v)
-                except Exception:
-                    pass
+        if F is not None:
+            # a fair path must leave from the state satisfying phi1
+            Lphi[1] = Lphi[1] & kripke.get_fair_states(F)
 
-        # Some of the nodes satisfying p_formula.subformula(1)
-        # can be non-reachable from the reversed subgraph of
-        # the nodes satisfying p_formula.subformula(0).
-        # Hence, the former must be added to the
-        # investigated subgraph
-        for v in Lphi[1]-subgraph.nodes():
-            subgraph.add_node(v)
+        # E(phi0 U phi1) holds in the states that reach a state satisfying
+        # phi1 by walking backward through states satisfying phi0
+        subgraph = kripke.get_subgraph_view(predicate=(lambda v: v in Lphi[0]
+                                                       or v in Lphi[1]))
 
-        L[formula] = subgraph.get_reachable_set_from(Lphi[1])
+        L[formula] = subgraph.get_backward_reachable_set_from(Lphi[1])
 
     return L[formula]
 
 
-def _checkEG(kripke, formula, L):
-    if formula not in L:
-        p_formula = formula.subformula(0)
-        Lphi = _checkStateFormula(kripke, p_formula.subformula(0), L)
+def _checkEG_by_SCCs(kripke, Lphi):
+    subgraph = kripke.get_subgraph_view(Lphi)
+    SCCs = compute_SCCs(subgraph)
+
+    T = set()
+    for scc in SCCs:
+        v = next(iter(scc))
+        if len(scc) > 1 or v in subgraph.next(v):
+            T.update(scc)
+
+    return subgraph.get_backward_reachable_set_from(T)
+
+
+def _checkEG_by_fixpoint(kripke, Lphi, count, queue):
+    # count[v] is the number of the successors of v that satisfy phi and
+    # have not been removed yet, while queue contains the states whose
+    # counter is 0
+    alive = set(Lphi)
+    while queue:
+        v = queue.pop()
+        alive.discard(v)
+        for u in kripke.prev(v) & alive:
+            count[u] -= 1
+            if not count[u]:
+                queue.append(u)
+
+    return alive
 
-        subgraph = kripke.get_subgraph(Lphi)
-        subgraph = subgraph.get_reversed_graph()
-        SCCs = compute_SCCs(subgraph)
 
-        T = set()
-        for scc in SCCs:
-            v = next(iter(scc))
-            if len(scc) > 1 or v in subgraph.next(v):
-                T.update(scc)
+# the greatest fixpoint of EG scans the predecessors of the removed
+# states, while the SCC decomposition walks the edges among the states
+# satisfying phi at a much higher cost per edge. The SCCs are used only
+# when removing the states that have no successor satisfying phi scans
+# more than _EG_SCC_RATIO elements per state or edge among those states
+_EG_SCC_RATIO = 128
 
-        L[formula] = subgraph.get_reachable_set_from(T)
+
+def _get_EG_states(kripke, Lphi):
+    count = dict()
+    queue = []
+    for v in Lphi:
+        count[v] = len(kripke.next(v) & Lphi)
+        if not count[v]:
+            queue.append(v)
+
+    scan = sum([min(len(kripke.prev(v)), len(Lphi)) for v in queue])
+    if scan > _EG_SCC_RATIO*(len(Lphi) + sum(count.values())):
+        return _checkEG_by_SCCs(kripke, Lphi)
+
+    return _checkEG_by_fixpoint(kripke, Lphi, count, queue)
+
+
+def _checkEG(kripke, formula, L, F):
+    if formula not in L:
+        p_formula = formula.subformula(0)
+        Lphi = _checkStateFormula(kripke, p_formula.subformula(0), L, F)
+
+        if F is None:
+            L[formula] = _get_EG_states(kripke, Lphi)
+        else:
+            L[formula] = get_fair_EG_states(kripke, Lphi, F)
 
     return L[formula]
 
 
-def _checkStateFormula(kripke, formula, L):
+def _checkStateFormula(kripke, formula, L, F):
+    if formula in L:
+        return L[formula]
+
     if isinstance(formula, CTLS.Not):
-        return _checkNot(kripke, formula, L)
+        return _checkNot(kripke, formula, L, F)
 
     if isinstance(formula, CTLS.Or):
-        return _checkOr(kripke, formula, L)
+        return _checkOr(kripke, formula, L, F)
 
     if (isinstance(formula, CTLS.Bool) or isinstance(formula, bool)):
         Lang = sys.modules[formula.__module__]
@@ -146,36 +196,69 @@ def _checkStateFormula(kripke, formula, L):
         return Lformula
 
     if isinstance(formula, CTLS.AtomicProposition):
-        return _checkAtomicProposition(kripke, formula, L)
+        return _checkAtomicProposition(kripke, formula, L, F)
 
     if isinstance(formula, CTLS.E):
         p_formula = formula.subformula(0)
         if isinstance(p_formula, CTLS.G):
-            return _checkEG(kripke, formula, L)
+            return _checkEG(kripke, formula, L, F)
 
         if isinstance(p_formula, CTLS.U):
-            return _checkEU(kripke, formula, L)
+            return _checkEU(kripke, formula, L, F)
 
         if isinstance(p_formula, CTLS.X):
-            return _checkEX(kripke, formula, L)
+            return _checkEX(kripke, formula, L, F)
 
     restr_f = formula.get_equivalent_restricted_formula()
 
-    Lalter_formula = _checkStateFormula(kripke, restr_f, L)
+    Lalter_formula = _checkStateFormula(kripke, restr_f, L, F)
 
     L[formula] = Lalter_formula
 
     return Lalter_formula
 
 
-def modelcheck(kripke, formula, parser=None, F=None):
+class _SharedLabelling(dict):
+    def __init__(self):
+        super(_SharedLabelling, self).__init__()
+
+        self.hits = 0
+
+    def __contains__(self, formula):
+        if super(_SharedLabelling, self).__contains__(formula):
+            self.hits += 1
+
+            return True
+
+        return False
+
+
+def _get_state_formula(formula, parser):
+    if isinstance(formula, str):
+        formula = parser(formula)
+
+    if not isinstance(formula, Formula):
+        try:
+            formula = formula.cast_to(sys.modules[__name__])
+        except Exception:
+            raise TypeError('expected a CTL state formula, ' +
+                            'got {}'.format(formula))
+
+    if not isinstance(formula, StateFormula):
+        raise TypeError('expected a CTL state formula, got {}'.format(formula))
+
+    return formula
+
+
+def modelcheck(kripke, formula, parser=None, F=None, bitset=False,
+               symbolic=False, local=False):
     r''' Model checks any CTL formula on a Kripke structure.
 
     This method performs CTL model checking of a formula on a given
     Kripke structure.
 
     :param kripke: a Kripke structure.
-    :type kripke: Kripke
+    :type kripke: Kripke or SymbolicKripke
     :param formula: the state formula to model check.
     :type formula: a type castable in a CTL.Formula or a string representing
                    a CTL state formula
@@ -183,32 +266,244 @@ def modelcheck(kripke, formula, parser=None, F=None):
     :type parser: CTL.Parser
     :param F: a list of fair states
     :type F: Container
+    :param bitset: a Boolean flag: whenever it is True, the states are
+                   interned into integers and the sets of states are
+                   represented as bitsets (see
+                   :func:`CTL.bitset_model_checking.check_state_formula`)
+    :type bitset: bool
+    :param symbolic: a Boolean flag: whenever it is True, the Kripke
+                     structure is encoded by OBDDs (see
+                     :meth:`SymbolicKripke.from_kripke`) and the formula is
+                     symbolically model checked (see
+                     :func:`CTL.symbolic_model_checking.check_state_formula`)
+    :type symbolic: bool
+    :param local: a Boolean flag: whenever it is True, the method decides
+                  whether all the initial states satisfy the formula by
+                  exploring only the states reachable from them (see
+                  :func:`CTL.local_model_checking.check_initial_states`).
+                  The on-the-fly search does not support fairness
+                  constraints: when :param F: is not None, the formula is
+                  model checked on the whole sub-structure reachable from
+                  the initial states, by the engine selected by
+                  :param bitset: and :param symbolic:
+    :type local: bool
     :returns: a list of the Kripke structure states that satisfy the formula.
+              If :param kripke: is a SymbolicKripke, the OBDD representing
+              the set of the states that satisfy the formula. If
+              :param local: is True, the pair :math:`(True, None)` when all
+              the initial states satisfy the formula and the pair
+              :math:`(False, s)`, where :math:`s` is an initial state that
+              does not satisfy the formula, otherwise.
     '''
 
-    if isinstance(formula, str):
-        if parser is None:
-            parser = Parser()
-        formula = parser(formula)
+    if isinstance(formula, str) and parser is None:
+        parser = Parser()
 
-    if not isinstance(formula, Formula):
-        try:
-            formula = formula.cast_to(sys.modules[__name__])
-        except Exception:
-            raise TypeError('expected a CTL state formula, ' +
-                            'got {}'.format(formula))
+    formula = _get_state_formula(formula, parser)
 
-    if not isinstance(formula, StateFormula):
-        raise TypeError('expected a CTL state formula, got {}'.format(formula))
+    if not isinstance(kripke, (Kripke, SymbolicKripke)):
+        raise TypeError('expected a Kripke structure, got {}'.format(kripke))
+
+    if local:
+        return _modelcheck_locally(kripke, formula, F, bitset, symbolic)
+
+    if isinstance(kripke, Kripke):
+        return cached_modelcheck(kripke, formula, F,
+                                 lambda: _modelcheck(kripke, formula, F,
+                                                     bitset, symbolic))
+
+    return _modelcheck(kripke, formula, F, bitset, symbolic)
+
+
+def _modelcheck(kripke, formula, F, bitset, symbolic):
+    if symbolic and isinstance(kripke, Kripke):
+        if F is not None:
+            F = _get_fairness_constraints(kripke, F)
+
+        kripke = SymbolicKripke.from_kripke(kripke)
+        if F is not None:
+            F = [kripke.encode(P) for P in F]
+
+        return kripke.get_states_in(modelcheck(kripke, formula, F=F))
+
+    # the fair path quantifiers are evaluated natively: neither the Kripke
+    # structure nor its labelling function are modified
+    if isinstance(kripke, SymbolicKripke):
+        return _check_by_OBDDs(kripke, formula, F)
+
+    if bitset:
+        return _check_by_bitsets(kripke, formula, F)
+
+    return _checkStateFormula(kripke, formula, L=dict(), F=F)
+
+
+def _modelcheck_locally(kripke, formula, F, bitset, symbolic):
+    if isinstance(kripke, SymbolicKripke):
+        Lformula = _modelcheck(kripke, formula, F, False, True)
+
+        offending = kripke.get_states_in(kripke.S0 & ~Lformula)
+        if offending:
+            return (False, next(iter(offending)))
+
+        return (True, None)
+
+    if F is not None:
+        # the local search does not support fairness constraints: since
+        # the states reachable from the initial ones are closed under
+        # successors, their fair paths and the truth values of the formula
+        # on them do not depend on the remaining states
+        reachable = kripke.get_reachable_set_from(kripke.S0)
+        if len(reachable) < len(kripke.nodes()):
+            F = [P & reachable
+                 for P in _get_fairness_constraints(kripke, F)]
+            kripke = kripke.get_substructure(reachable)
+
+        Lformula = modelcheck(kripke, formula, F=F, bitset=bitset,
+                              symbolic=symbolic)
+
+        for s in kripke.S0:
+            if s not in Lformula:
+                return (False, s)
+
+        return (True, None)
+
+    return _check_locally(kripke, formula)
+
+
+def modelcheck_many(kripke, formulas, parser=None, F=None, bitset=False,
+                    symbolic=False):
+    r''' Model checks a batch of CTL formulas on a Kripke structure.
+
+    This method performs CTL model checking of many formulas on the same
+    Kripke structure. The sets of states satisfying the subformulas are
+    cached across the whole batch, so that every subformula shared by
+    some formulas is evaluated once, and the engine selected by
+    :param bitset: and :param symbolic: prepares the structure once for
+    the whole batch. Whenever the result cache of the Kripke structure has
+    been enabled (see :meth:`Kripke.enable_result_cache`), the formulas
+    whose results are cached are not evaluated and the results of the
+    remaining ones are cached, as :func:`modelcheck` does.
+
+    :param kripke: a Kripke structure.
+    :type kripke: Kripke
+    :param formulas: the state formulas to model check.
+    :type formulas: a list of types castable in a CTL.Formula or of strings
+                    representing CTL state formulas
+    :param parser: a parser to parse a string into a CTL.Formula.
+    :type parser: CTL.Parser
+    :param F: a list of fair states
+    :type F: Container
+    :param bitset: a Boolean flag: whenever it is True, the formulas are
+                   model checked by using bitsets (see :func:`modelcheck`)
+    :type bitset: bool
+    :param symbolic: a Boolean flag: whenever it is True, the formulas are
+                     symbolically model checked (see :func:`modelcheck`)
+    :type symbolic: bool
+    :returns: a pair whose first element is the list of the sets of the
+              Kripke structure states that satisfy the formulas and whose
+              second element is a dictionary of statistics: the number of
+              formulas (key 'formulas'), the number of evaluated
+              subformulas (key 'subformulas'), the number of subformula
+              evaluations saved by the cache (key 'shared') and the number
+              of formulas answered by the result cache (key 'cached').
+    :rtype: tuple
+    '''
+    if parser is None:
+        parser = Parser()
+
+    formulas = [_get_state_formula(formula, parser) for formula in formulas]
 
     if not isinstance(kripke, Kripke):
         raise TypeError('expected a Kripke structure, got {}'.format(kripke))
 
-    if F is not None:
-        kripke = kripke.clone()
+    cache = kripke.result_cache()
+
+    results = [None]*len(formulas)
+    if cache is not None:
+        for i, formula in enumerate(formulas):
+            results[i] = cache.get(get_result_key(formula, F))
+
+    missing = [i for i, result in enumerate(results) if result is None]
+
+    L = _SharedLabelling()
+    checked = _check_many(kripke, [formulas[i] for i in missing], F, L,
+                          bitset, symbolic)
+
+    for i, result in zip(missing, checked):
+        if cache is None:
+            results[i] = set(result)
+        else:
+            results[i] = frozenset(result)
+            cache[get_result_key(formulas[i], F)] = results[i]
+
+    return results, {'formulas': len(formulas),
+                     'subformulas': len(L),
+                     'shared': L.hits,
+                     'cached': len(formulas)-len(missing)}
+
+
+def _check_many(kripke, formulas, F, L, bitset, symbolic):
+    if not formulas:
+        return []
+
+    if symbolic:
+        if F is not None:
+            F = _get_fairness_constraints(kripke, F)
+
+        SK = SymbolicKripke.from_kripke(kripke)
+        if F is not None:
+            F = [SK.encode(P) for P in F]
 
-        fair_label = kripke.label_fair_states(F)
+        return [SK.get_states_in(Lformula)
+                for Lformula in _check_many_by_OBDDs(SK, formulas, F, L)]
+
+    if bitset:
+        return _check_many_by_bitsets(kripke, formulas, F, L)
+
+    return [_checkStateFormula(kripke, formula, L, F)
+            for formula in formulas]
+
+
+def modelcheck_stream(kripke, source, parser=None, F=None, processes=None,
+                      batch_size=1024, bitset=False, symbolic=False):
+    r''' Model checks a stream of CTL formulas on a Kripke structure.
+
+    The formulas are read one per line (see
+    :meth:`pyModelChecking.parser.Parser.parse_stream`) and they are model
+    checked in batches (see :func:`modelcheck_many`). Neither syntax
+    errors nor type errors stop the stream.
+
+    :param kripke: a Kripke structure.
+    :type kripke: Kripke
+    :param source: either a path of a file or an iterable of strings
+    :type source: str or an iterable of str
+    :param parser: a parser to parse a string into a CTL.Formula.
+    :type parser: CTL.Parser
+    :param F: a list of fair states
+    :type F: Container
+    :param processes: the number of processes parsing the stream or None to
+                      parse it in the current process
+    :type processes: int
+    :param batch_size: the maximum number of formulas in a batch
+    :type batch_size: int
+    :param bitset: a Boolean flag: whenever it is True, the formulas are
+                   model checked by using bitsets (see :func:`modelcheck`)
+    :type bitset: bool
+    :param symbolic: a Boolean flag: whenever it is True, the formulas are
+                     symbolically model checked (see :func:`modelcheck`)
+    :type symbolic: bool
+    :returns: a generator of pairs whose first element is a line number and
+              whose second element is either the set of the Kripke
+              structure states that satisfy the formula on that line or
+              the exception raised while parsing or checking it
+    :rtype: generator
+    '''
+    if parser is None:
+        parser = Parser()
 
-        formula = formula.get_equivalent_non_fair_formula(fair_label)
+    def check_batch(formulas):
+        return modelcheck_many(kripke, formulas, parser, F, bitset,
+                               symbolic)[0]
 
-    return _checkStateFormula(kripke, formula, L=dict())
+    return check_stream(parser.parse_stream(source, processes), check_batch,
+                        batch_size)
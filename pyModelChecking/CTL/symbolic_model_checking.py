@@ -0,0 +1,216 @@
+"""
+.. module:: CTL.symbolic_model_checking
+   :synopsis: Provides symbolic model checking methods for the CTL language.
+
+.. moduleauthor:: Alberto Casagrande <acasagrande@units.it>
+"""
+
+from .language import *
+from pyModelChecking.BDD import BDDNode
+
+import pyModelChecking.CTLS
+
+import sys
+
+CTLS = sys.modules['pyModelChecking.CTLS']
+
+
+# the key of the fair states in the labelling: it is equal to no formula
+_FAIR_STATES = object()
+
+
+def _get_fair_states(kripke, L, F):
+    if _FAIR_STATES not in L:
+        L[_FAIR_STATES] = kripke.get_fair_states(F)
+
+    return L[_FAIR_STATES]
+
+
+def _checkAtomicProposition(kripke, formula, L, F):
+    if formula not in L:
+        L[formula] = kripke.states_labelled_by(formula.name)
+
+    return L[formula]
+
+
+def _checkNot(kripke, formula, L, F):
+    if formula not in L:
+        Lphi = _checkStateFormula(kripke, formula.subformula(0), L, F)
+
+        L[formula] = kripke.states() & ~Lphi
+
+    return L[formula]
+
+
+def _checkOr(kripke, formula, L, F):
+    if formula not in L:
+        Lformula = kripke.get_OBDD(False)
+        for sf in formula.subformulas():
+            Lformula = Lformula | _checkStateFormula(kripke, sf, L, F)
+
+        L[formula] = Lformula
+
+    return L[formula]
+
+
+def _checkAnd(kripke, formula, L, F):
+    if formula not in L:
+        Lformula = kripke.states()
+        for sf in formula.subformulas():
+            Lformula = Lformula & _checkStateFormula(kripke, sf, L, F)
+
+        L[formula] = Lformula
+
+    return L[formula]
+
+
+def _checkEX(kripke, formula, L, F):
+    if formula not in L:
+        p_formula = formula.subformula(0)
+        Lphi = _checkStateFormula(kripke, p_formula.subformula(0), L, F)
+
+        if F is not None:
+            # a fair path through a successor leaves from it
+            Lphi = Lphi & _get_fair_states(kripke, L, F)
+
+        L[formula] = kripke.pre(Lphi)
+
+    return L[formula]
+
+
+def _checkEU(kripke, formula, L, F):
+    if formula not in L:
+        Lphi = []
+        p_formula = formula.subformula(0)
+        for i in range(2):
+            sf = p_formula.subformula(i)
+            Lphi.append(_checkStateFormula(kripke, sf, L, F))
+
+        if F is not None:
+            # a fair path must leave from the state satisfying phi1
+            Lphi[1] = Lphi[1] & _get_fair_states(kripke, L, F)
+
+        # least fixpoint of Z = phi1 | (phi0 & EX Z): only the states
+        # added by the last iteration need to be pre-imaged
+        Lformula = Lphi[1]
+        frontier = Lformula
+        while frontier.root is not BDDNode(False):
+            frontier = Lphi[0] & kripke.pre(frontier) & ~Lformula
+            Lformula = Lformula | frontier
+
+        L[formula] = Lformula
+
+    return L[formula]
+
+
+def _checkEG(kripke, formula, L, F):
+    if formula not in L:
+        p_formula = formula.subformula(0)
+        Lphi = _checkStateFormula(kripke, p_formula.subformula(0), L, F)
+
+        if F is None:
+            # greatest fixpoint of Z = phi & EX Z
+            Lformula = Lphi
+            old_root = None
+            while Lformula.root is not old_root:
+                old_root = Lformula.root
+                Lformula = Lformula & kripke.pre(Lformula)
+        else:
+            Lformula = kripke.get_fair_states(F, Lphi)
+
+        L[formula] = Lformula
+
+    return L[formula]
+
+
+def _checkStateFormula(kripke, formula, L, F):
+    if formula in L:
+        return L[formula]
+
+    if isinstance(formula, CTLS.Not):
+        return _checkNot(kripke, formula, L, F)
+
+    if isinstance(formula, CTLS.Or):
+        return _checkOr(kripke, formula, L, F)
+
+    if isinstance(formula, CTLS.And):
+        return _checkAnd(kripke, formula, L, F)
+
+    if (isinstance(formula, CTLS.Bool) or isinstance(formula, bool)):
+        if formula == Bool(True):
+            return kripke.states()
+
+        return kripke.get_OBDD(False)
+
+    if isinstance(formula, CTLS.AtomicProposition):
+        return _checkAtomicProposition(kripke, formula, L, F)
+
+    if isinstance(formula, CTLS.E):
+        p_formula = formula.subformula(0)
+        if isinstance(p_formula, CTLS.G):
+            return _checkEG(kripke, formula, L, F)
+
+        if isinstance(p_formula, CTLS.U):
+            return _checkEU(kripke, formula, L, F)
+
+        if isinstance(p_formula, CTLS.X):
+            return _checkEX(kripke, formula, L, F)
+
+    restr_f = formula.get_equivalent_restricted_formula()
+
+    Lalter_formula = _checkStateFormula(kripke, restr_f, L, F)
+
+    L[formula] = Lalter_formula
+
+    return Lalter_formula
+
+
+def check_state_formula(kripke, formula, F=None):
+    r''' Computes the states satisfying a CTL state formula symbolically.
+
+    The sets of states are represented by OBDDs and the temporal operators
+    are evaluated as fixpoints of the pre-image operator of the symbolic
+    Kripke structure (see :meth:`SymbolicKripke.pre`).
+
+    :param kripke: a symbolic Kripke structure.
+    :type kripke: SymbolicKripke
+    :param formula: a CTL state formula.
+    :type formula: CTL.StateFormula
+    :param F: a container of fairness constraints. Whenever it is not None,
+              the path quantifiers range over the fair paths only (see
+              :meth:`SymbolicKripke.get_fair_states`)
+    :type F: a container of OBDDs
+    :returns: the OBDD representing the set of the Kripke structure states
+              that satisfy the formula.
+    :rtype: OBDD
+    '''
+    return _checkStateFormula(kripke, formula, L=dict(), F=F)
+
+
+def check_state_formulas(kripke, formulas, F=None, L=None):
+    r''' Computes the states satisfying many CTL state formulas symbolically.
+
+    The OBDDs of the subformulas, and those of the fair states, are stored
+    in :param L:, so that every subformula shared by some formulas is
+    evaluated once (see :func:`check_state_formula`).
+
+    :param kripke: a symbolic Kripke structure.
+    :type kripke: SymbolicKripke
+    :param formulas: a list of CTL state formulas.
+    :type formulas: list
+    :param F: a container of fairness constraints. Whenever it is not None,
+              the path quantifiers range over the fair paths only (see
+              :meth:`SymbolicKripke.get_fair_states`)
+    :type F: a container of OBDDs
+    :param L: either None or an initially empty dictionary in which the
+              OBDDs of the evaluated subformulas are stored
+    :type L: dict
+    :returns: the list of the OBDDs representing the sets of the Kripke
+              structure states that satisfy the formulas.
+    :rtype: list
+    '''
+    if L is None:
+        L = dict()
+
+    return [_checkStateFormula(kripke, formula, L=L, F=F)
+            for formula in formulas]
@@ -7,8 +7,10 @@
 
 from .language import *
 from pyModelChecking.kripke import Kripke
+from pyModelChecking.cache import cached_modelcheck
 
 from .parser import Parser
+from pyModelChecking.parser import check_stream
 
 import sys
 
@@ -32,57 +34,58 @@ def _get_a_new_atomic_proposition_for(kripke, formula):
     return f_atom
 
 
-def _remove_state_subformulas(kripke, formula, fair_label=None):
+def _remove_state_subformulas(kripke, formula, F=None, L=None):
     Lang = sys.modules[formula.__module__]
 
     if isinstance(formula, AtomicProposition):
         return formula
 
     if isinstance(formula, PathQuantifier):
+        if L is not None and formula in L:
+            return Lang.AtomicProposition(L[formula])
+
         f_atom = _get_a_new_atomic_proposition_for(kripke, formula)
-        for s in _checkQuantifiedFormula(kripke, formula, fair_label):
-            kripke.labels(s).add(f_atom)
+        kripke.label_states(_checkQuantifiedFormula(kripke, formula, F, L),
+                            f_atom)
+
+        if L is not None:
+            L[formula] = f_atom
 
         return Lang.AtomicProposition(f_atom)
 
     if isinstance(formula, Formula):
         sfs = []
         for sf in formula.subformulas():
-            sfs.append(_remove_state_subformulas(kripke, sf, fair_label))
+            sfs.append(_remove_state_subformulas(kripke, sf, F, L))
 
         return formula.__class__(*sfs)
 
     raise TypeError('expected a CTL* state formula, got {}' % (formula))
 
 
-def _checkQuantifiedFormula(kripke, formula, fair_label=None):
+def _checkQuantifiedFormula(kripke, formula, F=None, L=None):
 
     subformula = _remove_state_subformulas(kripke, formula.subformula(0),
-                                           fair_label)
+                                           F, L)
 
+    # both CTL and LTL model checkers evaluate the path quantifiers over
+    # the fair paths alone
     formula = formula.__class__(subformula)
     try:
-        if fair_label is not None:
-            formula = formula.cast_to(CTL)
-            formula = (formula).get_equivalent_non_fair_formula(fair_label)
-
-        return CTL.modelcheck(kripke, formula)
+        return CTL.modelcheck(kripke, formula.cast_to(CTL), F=F)
     except TypeError:
-        if fair_label is not None:
-            formula = formula.get_equivalent_non_fair_formula(fair_label)
-
         if (not isinstance(formula, A)):
             if (isinstance(formula, E)):
                 formula = LNot(A(LNot(formula.subformula(0))))
 
-            formula = _remove_state_subformulas(kripke, formula)
+            formula = _remove_state_subformulas(kripke, formula, F, L)
 
             return CTL.modelcheck(kripke, formula)
 
-        return LTL.modelcheck(kripke, formula)
+        return LTL.modelcheck(kripke, formula, F=F)
 
 
-def modelcheck(kripke, formula, parser=None, F=None):
+def modelcheck(kripke, formula, parser=None, F=None, local=False):
     r''' Model checks any CTL* formula on a Kripke structure.
 
     This method performs CTL* model checking of a formula on a given
@@ -97,7 +100,20 @@ def modelcheck(kripke, formula, parser=None, F=None):
     :type parser: CTLS.Parser
     :param F: a list of fair states
     :type F: Container
+    :param local: a Boolean flag: whenever it is True, the method decides
+                  whether all the initial states satisfy the formula.
+                  CTL formulas are locally model checked (see
+                  :func:`CTL.local_model_checking.check_initial_states`)
+                  and, for formulas of the form :math:`A \psi`, a
+                  counterexample is searched on-the-fly (see
+                  :func:`LTL.model_checking.find_counterexample`) once the
+                  state subformulas of :math:`\psi` have been labelled
+    :type local: bool
     :returns: a list of the Kripke structure states that satisfy the formula.
+              If :param local: is True, the pair :math:`(True, None)` when
+              all the initial states satisfy the formula and the pair
+              :math:`(False, s)`, where :math:`s` is an initial state that
+              does not satisfy the formula, otherwise.
     '''
 
     if isinstance(formula, str):
@@ -108,18 +124,18 @@ def modelcheck(kripke, formula, parser=None, F=None):
     if not isinstance(kripke, Kripke):
         raise TypeError('expected a Kripke structure, got {}'.format(kripke))
 
-    try:
-        kripkeC = kripke.clone()
+    if local:
+        return _modelcheck_locally(kripke, formula, F)
 
-        if F is not None:
-            fair_label = kripkeC.label_fair_states(F)
+    return cached_modelcheck(kripke, formula, F,
+                             lambda: _modelcheck(kripke, formula, F))
 
-            CTL_frml = _remove_state_subformulas(kripkeC, formula,
-                                                 fair_label)
 
-            CTL_frml = CTL_frml.get_equivalent_non_fair_formula(fair_label)
-        else:
-            CTL_frml = _remove_state_subformulas(kripkeC, formula)
+def _modelcheck(kripke, formula, F):
+    try:
+        kripkeC = kripke.clone()
+
+        CTL_frml = _remove_state_subformulas(kripkeC, formula, F)
 
         return CTL.modelcheck(kripkeC, CTL_frml)
 
@@ -128,3 +144,122 @@ def modelcheck(kripke, formula, parser=None, F=None):
 
         raise TypeError('expected a CTL* state formula, ' +
                         'got {}'.format(formula))
+
+
+def _modelcheck_locally(kripke, formula, F):
+    try:
+        CTL_frml = formula.cast_to(CTL)
+    except TypeError:
+        CTL_frml = None
+
+    if CTL_frml is not None:
+        return CTL.modelcheck(kripke, CTL_frml, F=F, local=True)
+
+    kripkeC = kripke.clone()
+
+    try:
+        if isinstance(formula, A):
+            p_formula = _remove_state_subformulas(kripkeC,
+                                                  formula.subformula(0), F)
+
+            return LTL.modelcheck(kripkeC, A(p_formula), F=F, local=True)
+
+        CTL_frml = _remove_state_subformulas(kripkeC, formula, F)
+    except TypeError:
+        raise TypeError('expected a CTL* state formula, ' +
+                        'got {}'.format(formula))
+
+    return CTL.modelcheck(kripkeC, CTL_frml, local=True)
+
+
+def modelcheck_many(kripke, formulas, parser=None, F=None):
+    r''' Model checks a batch of CTL* formulas on a Kripke structure.
+
+    This method performs CTL* model checking of many formulas on the same
+    Kripke structure. The path quantified subformulas shared by some
+    formulas are evaluated once for the whole batch and so are the CTL
+    subformulas which the formulas are reduced to.
+
+    :param kripke: a Kripke structure.
+    :type kripke: Kripke
+    :param formulas: the formulas to model check.
+    :type formulas: a list of types castable in a CTLS.Formula or of
+                    strings representing CTLS formulas
+    :param parser: a parser to parse a string into a CTLS.Formula.
+    :type parser: CTLS.Parser
+    :param F: a list of fair states
+    :type F: Container
+    :returns: a pair whose first element is the list of the sets of the
+              Kripke structure states that satisfy the formulas and whose
+              second element is a dictionary of statistics: the number of
+              formulas (key 'formulas'), the number of evaluated
+              subformulas (key 'subformulas') and the number of subformula
+              evaluations saved by the cache (key 'shared').
+    :rtype: tuple
+    '''
+    if parser is None:
+        parser = Parser()
+
+    formulas = [parser(formula) if isinstance(formula, str) else formula
+                for formula in formulas]
+
+    if not isinstance(kripke, Kripke):
+        raise TypeError('expected a Kripke structure, got {}'.format(kripke))
+
+    kripkeC = kripke.clone()
+
+    L = CTL.model_checking._SharedLabelling()
+
+    CTL_frmls = []
+    for formula in formulas:
+        try:
+            CTL_frml = _remove_state_subformulas(kripkeC, formula, F, L)
+        except TypeError:
+            raise TypeError('expected a CTL* state formula, ' +
+                            'got {}'.format(formula))
+
+        CTL_frmls.append(CTL_frml)
+
+    results, stats = CTL.modelcheck_many(kripkeC, CTL_frmls)
+
+    return results, {'formulas': len(formulas),
+                     'subformulas': len(L)+stats['subformulas'],
+                     'shared': L.hits+stats['shared']}
+
+
+def modelcheck_stream(kripke, source, parser=None, F=None, processes=None,
+                      batch_size=1024):
+    r''' Model checks a stream of CTL* formulas on a Kripke structure.
+
+    The formulas are read one per line (see
+    :meth:`pyModelChecking.parser.Parser.parse_stream`) and they are model
+    checked in batches (see :func:`modelcheck_many`). Neither syntax
+    errors nor type errors stop the stream.
+
+    :param kripke: a Kripke structure.
+    :type kripke: Kripke
+    :param source: either a path of a file or an iterable of strings
+    :type source: str or an iterable of str
+    :param parser: a parser to parse a string into a CTLS.Formula.
+    :type parser: CTLS.Parser
+    :param F: a list of fair states
+    :type F: Container
+    :param processes: the number of processes parsing the stream or None to
+                      parse it in the current process
+    :type processes: int
+    :param batch_size: the maximum number of formulas in a batch
+    :type batch_size: int
+    :returns: a generator of pairs whose first element is a line number and
+              whose second element is either the set of the Kripke
+              structure states that satisfy the formula on that line or
+              the exception raised while parsing or checking it
+    :rtype: generator
+    '''
+    if parser is None:
+        parser = Parser()
+
+    def check_batch(formulas):
+        return modelcheck_many(kripke, formulas, parser, F)[0]
+
+    return check_stream(parser.parse_stream(source, processes), check_batch,
+                        batch_size)
@@ -7,7 +7,8 @@
 """
 
 from .language import *
-from .model_checking import modelcheck
+from .model_checking import modelcheck, modelcheck_many, modelcheck_stream, \
+    find_counterexample
 from ..language import LNot
 
 from .parser import Parser
@@ -0,0 +1,249 @@
+"""
+.. module:: LTL.automata
+   :synopsis: Translates LTL formulas into Buchi automata.
+
+.. moduleauthor:: Alberto Casagrande <acasagrande@units.it>
+"""
+
+from .language import *
+
+import sys
+
+import pyModelChecking.CTLS
+
+LTL = sys.modules['pyModelChecking.LTL.language']
+CTLS = sys.modules['pyModelChecking.CTLS']
+
+# the identifier of the virtual predecessor of the initial nodes
+_INIT = -1
+
+
+def _get_negation_normal_form(formula, negated=False):
+    if isinstance(formula, CTLS.Bool):
+        return LTL.Bool(formula._value ^ negated)
+
+    if isinstance(formula, CTLS.AtomicProposition):
+        formula = LTL.AtomicProposition(formula.name)
+        if negated:
+            return LTL.Not(formula)
+
+        return formula
+
+    if isinstance(formula, CTLS.Not):
+        return _get_negation_normal_form(formula.subformula(0), not negated)
+
+    if isinstance(formula, CTLS.Imply):
+        sfs = formula.subformulas()
+
+        return _get_negation_normal_form(LTL.Or(LTL.Not(sfs[0]), sfs[1]),
+                                         negated)
+
+    sfs = [_get_negation_normal_form(sf, negated)
+           for sf in formula.subformulas()]
+
+    if isinstance(formula, CTLS.X):
+        return LTL.X(sfs[0])
+
+    if isinstance(formula, CTLS.F):
+        if negated:
+            return LTL.R(LTL.Bool(False), sfs[0])
+
+        return LTL.U(LTL.Bool(True), sfs[0])
+
+    if isinstance(formula, CTLS.G):
+        if negated:
+            return LTL.U(LTL.Bool(True), sfs[0])
+
+        return LTL.R(LTL.Bool(False), sfs[0])
+
+    dual = [(CTLS.And, LTL.And, LTL.Or), (CTLS.Or, LTL.Or, LTL.And),
+            (CTLS.U, LTL.U, LTL.R), (CTLS.R, LTL.R, LTL.U)]
+    for (FormulaClass, Op, DualOp) in dual:
+        if isinstance(formula, FormulaClass):
+            if negated:
+                return DualOp(*sfs)
+
+            return Op(*sfs)
+
+    raise TypeError('expected a LTL path formula, got {}'.format(formula))
+
+
+def _is_a_literal(formula):
+    if isinstance(formula, CTLS.Not):
+        formula = formula.subformula(0)
+
+    return isinstance(formula, CTLS.AtomicProposition)
+
+
+def _get_until_subformulas(formula, untils=None):
+    if untils is None:
+        untils = set()
+
+    if isinstance(formula, CTLS.U):
+        untils.add(formula)
+
+    for sf in formula.subformulas():
+        _get_until_subformulas(sf, untils)
+
+    return untils
+
+
+class _Node(object):
+    def __init__(self, name, incoming, new, old, next):
+        self.name = name
+        self.incoming = incoming
+        self.new = new
+        self.old = old
+        self.next = next
+
+
+class BuchiAutomaton(object):
+    r'''
+    A class to represent generalized Buchi automata whose states are
+    labelled by literals.
+
+    A state of the automaton reads a set of atomic propositions if and only
+    if all the positive literals labelling the state belong to the set and
+    none of the negative literals does. A run is accepting if and only if
+    it visits infinitely often at least a state in each of the accepting
+    sets.
+    '''
+
+    def __init__(self, formula):
+        r''' Build the generalized Buchi automaton of a LTL formula.
+
+        The automaton is built by using the tableau construction presented
+        in [GPVW95]_ and it accepts exactly the infinite sequences of sets
+        of atomic propositions that satisfy the formula.
+
+        :param formula: a LTL path formula
+        :type formula: LTL.PathFormula
+        '''
+        formula = _get_negation_normal_form(formula)
+
+        self.formula = formula
+
+        nodes = self._expand_all(formula)
+
+        self.states = [node.name for node in nodes]
+        self.initial = set()
+        self._next = dict([(name, set()) for name in self.states])
+        self.positive = dict()
+        self.negative = dict()
+
+        for node in nodes:
+            for pred in node.incoming:
+                if pred == _INIT:
+                    self.initial.add(node.name)
+                else:
+                    self._next[pred].add(node.name)
+
+            self.positive[node.name] = frozenset([
+                f.name for f in node.old
+                if isinstance(f, CTLS.AtomicProposition) and
+                not isinstance(f, CTLS.Bool)])
+            self.negative[node.name] = frozenset([
+                f.subformula(0).name for f in node.old
+                if isinstance(f, CTLS.Not)])
+
+        self.accepting = []
+        for phi in _get_until_subformulas(formula):
+            self.accepting.append(frozenset([
+                node.name for node in nodes
+                if phi.subformula(1) in node.old or phi not in node.old]))
+
+    @staticmethod
+    def _expand_all(formula):
+        nodes = dict()
+        names = [0]
+
+        def new_name():
+            names[0] += 1
+
+            return names[0]
+
+        pending = [_Node(new_name(), set([_INIT]), set([formula]), set(),
+                         set())]
+        while pending:
+            node = pending.pop()
+            if not node.new:
+                key = (frozenset(node.old), frozenset(node.next))
+                if key in nodes:
+                    nodes[key].incoming.update(node.incoming)
+                else:
+                    nodes[key] = node
+                    pending.append(_Node(new_name(), set([node.name]),
+                                         set(node.next), set(), set()))
+
+                continue
+
+            phi = node.new.pop()
+
+            if isinstance(phi, CTLS.Bool):
+                if phi == LTL.Bool(True):
+                    pending.append(node)
+
+                continue
+
+            if _is_a_literal(phi):
+                if LNot(phi) not in node.old:
+                    node.old.add(phi)
+                    pending.append(node)
+
+                continue
+
+            node.old.add(phi)
+            sfs = phi.subformulas()
+
+            if isinstance(phi, CTLS.And):
+                node.new.update(set(sfs)-node.old)
+                pending.append(node)
+
+                continue
+
+            if isinstance(phi, CTLS.X):
+                node.next.add(sfs[0])
+                pending.append(node)
+
+                continue
+
+            if isinstance(phi, CTLS.Or):
+                splits = [([sf], []) for sf in sfs]
+            elif isinstance(phi, CTLS.U):
+                splits = [([sfs[0]], [phi]), ([sfs[1]], [])]
+            else:
+                splits = [([sfs[1]], [phi]), (sfs, [])]
+
+            for (new, next) in splits:
+                pending.append(_Node(new_name(), set(node.incoming),
+                                     node.new | (set(new)-node.old),
+                                     set(node.old), node.next | set(next)))
+
+        return list(nodes.values())
+
+    def next(self, state):
+        r''' Return the successors of a state.
+
+        :param state: a state of the automaton
+        :returns: the set of the successors of :param state:
+        :rtype: set
+        '''
+        return self._next[state]
+
+    def reads(self, state, APs):
+        r''' Test whether a state reads a set of atomic propositions.
+
+        :param state: a state of the automaton
+        :param APs: a set of atomic propositions
+        :type APs: set
+        :returns: True if and only if all the positive literals of
+                  :param state: are in :param APs: and none of the negative
+                  literals is
+        :rtype: bool
+        '''
+        return (self.positive[state] <= APs and
+                self.negative[state].isdisjoint(APs))
+
+    def __str__(self):
+        return ('(Q={}, Q0={}, '.format(self.states, self.initial) +
+                'delta={}, F={})'.format(self._next, self.accepting))
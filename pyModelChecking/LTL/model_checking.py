@@ -8,10 +8,13 @@
 from .language import *
 from pyModelChecking.graph import DiGraph
 from pyModelChecking.graph import compute_SCCs
-from pyModelChecking.kripke import Kripke
+from pyModelChecking.kripke import Kripke, _get_fairness_constraints
+from pyModelChecking.cache import cached_modelcheck
 from pyModelChecking.CTLS import LNot as LNot
 
 from .parser import Parser
+from pyModelChecking.parser import check_stream
+from .automata import BuchiAutomaton
 
 import sys
 
@@ -146,7 +149,7 @@ def _build_atoms(K, closure):
             else:
                 if isinstance(phi, CTLS.AtomicProposition):
                     for atom in A:
-                        if phi in K.labels(atom.state):
+                        if phi in K._get_labels(atom.state):
                             atom.add(phi)
                         else:
                             atom.add(neg_phi)
@@ -185,9 +188,12 @@ def _build_atoms(K, closure):
                                 atom.add(phi)
                             else:
                                 if Lang.Not(Lang.X(phi)) not in atom:
-                                    A_tail.append( atom | {Lang.Not(Lang.X(phi))})
+                                    A_tail.append(atom | set([neg_phi,
+                                                  Lang.Not(Lang.X(phi))]))
                                     atom.add(phi)
                                     atom.add(Lang.X(phi))
+                                else:
+                                    atom.add(neg_phi)
                         else:
                             atom.add(neg_phi)
 
@@ -228,7 +234,7 @@ class _Tableu(DiGraph):
                                                  self.atoms)
 
 
-def _is_non_trivial_self_fulfilling(T, C, closure):
+def _is_non_trivial_self_fulfilling(T, C, closure, constraints=None):
     i_atom = next(C.__iter__())
     if len(C) > 1 or i_atom in T.next(i_atom):
         formulas = set()
@@ -237,7 +243,14 @@ def _is_non_trivial_self_fulfilling(T, C, closure):
 
         for f in closure:
             if isinstance(f, CTLS.U):
-                if (f in formulas) ^ (f.subformula(1) in formulas):
+                if f in formulas and f.subformula(1) not in formulas:
+                    return False
+
+        # a fair path can cycle in C only if C meets every constraint
+        if constraints is not None:
+            states = set([T.atoms[i].state for i in C])
+            for P in constraints:
+                if not (states & P):
                     return False
 
         return True
@@ -245,24 +258,53 @@ def _is_non_trivial_self_fulfilling(T, C, closure):
     return False
 
 
-def _checkE_path_formula(kripke, p_formula):
+def _checkE_path_formula(kripke, p_formula, F=None):
 
     closure = _get_closure(p_formula)
     T = _Tableu(kripke, closure=closure)
 
+    constraints = None
+    if F is not None:
+        constraints = _get_fairness_constraints(kripke, F)
+
     in_ntsf = []
 
     for C in compute_SCCs(T):
-        if _is_non_trivial_self_fulfilling(T, C, closure):
+        if _is_non_trivial_self_fulfilling(T, C, closure, constraints):
             in_ntsf.extend(C)
 
-    T_reversed = T.get_reversed_graph()
-    R = T_reversed.get_reachable_set_from(in_ntsf)
+    R = T.get_backward_reachable_set_from(in_ntsf)
 
     return set([T.atoms[i].state for i in R if p_formula in T.atoms[i]])
 
 
-def modelcheck(kripke, formula, parser=None, F=None):
+def _get_state_formula(formula, parser):
+    if isinstance(formula, str):
+        formula = parser(formula)
+
+    if not (isinstance(formula, CTLS.A)):
+        raise TypeError('expected a LTL state formula, got {}'.format(formula))
+
+    return formula
+
+
+def _checkA_formula(kripke, formula, F, L):
+    try:
+        p_formula = LNot(formula.subformula(0))
+        p_formula = p_formula.get_equivalent_restricted_formula()
+
+        # A phi holds in the states from which no fair path satisfies
+        # not phi
+        if p_formula not in L:
+            L[p_formula] = (set(kripke.states()) -
+                            _checkE_path_formula(kripke, p_formula, F))
+
+        return L[p_formula]
+    except TypeError:
+        raise TypeError('expected a LTL formula, got {}'.format(formula))
+
+
+def modelcheck(kripke, formula, parser=None, F=None, local=False):
     r''' Model checks any LTL formula on a Kripke structure.
 
     This method performs LTL model checking of a formula on a given
@@ -277,32 +319,260 @@ def modelcheck(kripke, formula, parser=None, F=None):
     :type parser: LTL.Parser
     :param F: a list of fair states
     :type F: Container
+    :param local: a Boolean flag: whenever it is True, the method decides
+                  whether all the initial states satisfy the formula by
+                  searching a counterexample on-the-fly (see
+                  :func:`LTL.model_checking.find_counterexample`)
+    :type local: bool
     :returns: a list of the Kripke structure states that satisfy the formula.
+              If :param local: is True, the pair :math:`(True, None)` when
+              all the initial states satisfy the formula and the pair
+              :math:`(False, s)`, where :math:`s` is an initial state that
+              does not satisfy the formula, otherwise.
     '''
 
-    if isinstance(formula, str):
-        if parser is None:
-            parser = Parser()
-        formula = parser(formula)
+    if isinstance(formula, str) and parser is None:
+        parser = Parser()
 
-    if not (isinstance(formula, CTLS.A)):
-        raise TypeError('expected a LTL state formula, got {}'.format(formula))
+    formula = _get_state_formula(formula, parser)
 
     if not isinstance(kripke, Kripke):
         raise TypeError('expected a Kripke structure, got {}'.format(kripke))
 
-    try:
-        p_formula = LNot(formula.subformula(0))
-        p_formula = p_formula.get_equivalent_restricted_formula()
+    if local:
+        lasso = _find_counterexample(kripke, formula, F)
+        if lasso is None:
+            return (True, None)
+
+        prefix, cycle = lasso
+
+        return (False, (prefix + cycle)[0])
+
+    return cached_modelcheck(kripke, formula, F,
+                             lambda: _modelcheck(kripke, formula, F))
+
+
+def _modelcheck(kripke, formula, F):
+    return _checkA_formula(kripke, formula, F, L=dict())
+
+
+def modelcheck_many(kripke, formulas, parser=None, F=None):
+    r''' Model checks a batch of LTL formulas on a Kripke structure.
+
+    This method performs LTL model checking of many formulas on the same
+    Kripke structure. Every formula A phi is decided by searching the
+    tableau of the normalized path formula not phi for fair paths, and
+    formulas having the same normalized path formula share this search.
+    Nothing else is shared: the tableau and its strongly connected
+    components are computed once per distinct normalized path formula.
+
+    :param kripke: a Kripke structure.
+    :type kripke: Kripke
+    :param formulas: the formulas to model check.
+    :type formulas: a list of types castable in a LTL.Formula or of strings
+                    representing LTL formulas
+    :param parser: a parser to parse a string into a LTL.Formula.
+    :type parser: LTL.Parser
+    :param F: a list of fairness constraints
+    :type F: Container
+    :returns: a pair whose first element is the list of the sets of the
+              Kripke structure states that satisfy the formulas and whose
+              second element is a dictionary of statistics: the number of
+              formulas (key 'formulas'), the number of distinct normalized
+              path formulas whose tableaux have been searched (key
+              'subformulas') and the number of formulas answered by the
+              search of an earlier formula of the batch (key 'shared').
+    :rtype: tuple
+    '''
+    if parser is None:
+        parser = Parser()
+
+    formulas = [_get_state_formula(formula, parser) for formula in formulas]
+
+    if not isinstance(kripke, Kripke):
+        raise TypeError('expected a Kripke structure, got {}'.format(kripke))
+
+    L = dict()
+    results = [set(_checkA_formula(kripke, formula, F, L))
+               for formula in formulas]
+
+    return results, {'formulas': len(formulas),
+                     'subformulas': len(L),
+                     'shared': len(formulas)-len(L)}
+
+
+def _get_product_successors(kripke, automaton, acceptance):
+    k = len(acceptance)
+
+    def successors(node):
+        state, q, i = node
+        if k > 0 and acceptance[i](state, q):
+            i = (i+1) % k
 
-        if F is not None:
-            kripke = kripke.clone()
+        for next_state in kripke.next(state):
+            labels = kripke._get_labels(next_state)
+            for next_q in automaton.next(q):
+                if automaton.reads(next_q, labels):
+                    yield (next_state, next_q, i)
 
-            fair_label = kripke.label_fair_states(F)
+    return successors
 
-            p_formula = p_formula.get_equivalent_non_fair_formula(fair_label)
-            p_formula = And(fair_label, p_formula)
 
-        return set(kripke.states())-_checkE_path_formula(kripke, p_formula)
+def _search_cycle_to(seed, successors, flagged):
+    stack = [(seed, successors(seed))]
+    while stack:
+        node, succs = stack[-1]
+        for succ in succs:
+            if succ == seed:
+                return [n for (n, _) in stack]
+
+            if succ not in flagged:
+                flagged.add(succ)
+                stack.append((succ, successors(succ)))
+                break
+        else:
+            stack.pop()
+
+    return None
+
+
+def _nested_DFS(initials, successors, is_accepting):
+    visited = set()
+    flagged = set()
+
+    for init in initials:
+        if init in visited:
+            continue
+
+        visited.add(init)
+        stack = [(init, successors(init))]
+        while stack:
+            node, succs = stack[-1]
+            for succ in succs:
+                if succ not in visited:
+                    visited.add(succ)
+                    stack.append((succ, successors(succ)))
+                    break
+            else:
+                stack.pop()
+
+                # nodes are tested in post-order, so the searches for
+                # cycles can share the flagged nodes
+                if is_accepting(node):
+                    cycle = _search_cycle_to(node, successors, flagged)
+                    if cycle is not None:
+                        return [n for (n, _) in stack], cycle
+
+    return None
+
+
+def find_counterexample(kripke, formula, parser=None, F=None):
+    r''' Search for a counterexample of a LTL formula on a Kripke structure.
+
+    This method translates the negation of the formula into a Buchi
+    automaton (see :class:`LTL.automata.BuchiAutomaton`) and explores
+    on-the-fly the product between the Kripke structure and the automaton
+    from the initial states by using nested depth-first search [CVWY92]_.
+    The search stops as soon as an accepting cycle is found, so the product
+    is never built as a whole.
+
+    :param kripke: a Kripke structure.
+    :type kripke: Kripke
+    :param formula: the formula to model check.
+    :type formula: a type castable in a LTL.Formula or a string representing
+                   a LTL formula
+    :param parser: a parser to parse a string into a LTL.Formula.
+    :type parser: LTL.Parser
+    :param F: a list of fairness constraints, i.e., a list of sets of states
+              that must be visited infinitely often by the counterexample
+    :type F: Container
+    :returns: None if all the initial states satisfy the formula.
+              Otherwise, a pair of lists of states :math:`(p, c)` such that
+              :math:`p c^{\omega}` is a path that begins in an initial state
+              and violates the formula.
+    :rtype: tuple
+    '''
+    if isinstance(formula, str) and parser is None:
+        parser = Parser()
+
+    formula = _get_state_formula(formula, parser)
+
+    if not isinstance(kripke, Kripke):
+        raise TypeError('expected a Kripke structure, got {}'.format(kripke))
+
+    return _find_counterexample(kripke, formula, F)
+
+
+def _find_counterexample(kripke, formula, F):
+    try:
+        automaton = BuchiAutomaton(LNot(formula.subformula(0)))
     except TypeError:
         raise TypeError('expected a LTL formula, got {}'.format(formula))
+
+    acceptance = [(lambda state, q, Q=Q: q in Q)
+                  for Q in automaton.accepting]
+    if F is not None:
+        acceptance.extend([(lambda state, q, P=P: state in P)
+                           for P in _get_fairness_constraints(kripke, F)])
+
+    initials = []
+    for state in kripke.S0:
+        labels = kripke._get_labels(state)
+        for q in automaton.initial:
+            if automaton.reads(q, labels):
+                initials.append((state, q, 0))
+
+    successors = _get_product_successors(kripke, automaton, acceptance)
+
+    if acceptance:
+        def is_accepting(node):
+            return node[2] == 0 and acceptance[0](node[0], node[1])
+    else:
+        def is_accepting(node):
+            return True
+
+    lasso = _nested_DFS(initials, successors, is_accepting)
+    if lasso is None:
+        return None
+
+    prefix, cycle = lasso
+
+    return ([node[0] for node in prefix], [node[0] for node in cycle])
+
+
+def modelcheck_stream(kripke, source, parser=None, F=None, processes=None,
+                      batch_size=1024):
+    r''' Model checks a stream of LTL formulas on a Kripke structure.
+
+    The formulas are read one per line (see
+    :meth:`pyModelChecking.parser.Parser.parse_stream`) and they are model
+    checked in batches (see :func:`modelcheck_many`). Neither syntax
+    errors nor type errors stop the stream.
+
+    :param kripke: a Kripke structure.
+    :type kripke: Kripke
+    :param source: either a path of a file or an iterable of strings
+    :type source: str or an iterable of str
+    :param parser: a parser to parse a string into a LTL.Formula.
+    :type parser: LTL.Parser
+    :param F: a list of fair states
+    :type F: Container
+    :param processes: the number of processes parsing the stream or None to
+                      parse it in the current process
+    :type processes: int
+    :param batch_size: the maximum number of formulas in a batch
+    :type batch_size: int
+    :returns: a generator of pairs whose first element is a line number and
+              whose second element is either the set of the Kripke
+              structure states that satisfy the formula on that line or
+              the exception raised while parsing or checking it
+    :rtype: generator
+    '''
+    if parser is None:
+        parser = Parser()
+
+    def check_batch(formulas):
+        return modelcheck_many(kripke, formulas, parser, F)[0]
+
+    return check_stream(parser.parse_stream(source, processes), check_batch,
+                        batch_size)
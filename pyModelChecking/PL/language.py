@@ -75,7 +75,8 @@ class Formula(BooleanLogics.Formula):
                             raise TypeError(err_msg(phi))
 
                     self._subformula.append(phi)
-                    self.height = max(self.height, phi.height+1)
+
+            self.height = max(self.height, self._subformula[-1].height+1)
 
     def cast_to(self, Lang):
         r''' Casts the current object in a formula of a different class.
@@ -152,6 +153,9 @@ class AtomicProposition(Formula, BooleanLogics.AlphabeticSymbol):
         '''
         return []
 
+    def __reduce__(self):
+        return (self.__class__, (self.name,))
+
     def __str__(self):
         return '{}'.format(self.name)
 
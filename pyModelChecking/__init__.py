@@ -16,6 +16,7 @@ __email__ = "acasagrande@units.it"
 __status__ = "Development"
 
 from .kripke import *
+from .symbolic_kripke import SymbolicKripke
 from .language import *
 
 name = "pyModelChecking"
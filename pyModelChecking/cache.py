@@ -0,0 +1,175 @@
+"""
+.. module:: cache
+   :synopsis: A module to cache model checking results
+
+.. moduleauthor:: Alberto Casagrande <acasagrande@units.it>
+"""
+
+import sys
+
+from collections import OrderedDict
+
+
+class LRUCache(object):
+    r'''
+    A class to represent size-bounded caches.
+
+    An LRUCache maps keys into values and accounts the memory occupied by
+    the stored values. Whenever either the number of entries or the
+    accounted memory exceeds its bound, the least recently used entries are
+    evicted.
+    '''
+
+    def __init__(self, max_memory=None, max_entries=None,
+                 sizeof=sys.getsizeof):
+        r''' Initialize a new LRU cache
+
+        :param max_memory: the maximum amount of memory, in bytes, that can
+                           be accounted to the cached values or None for
+                           no bound
+        :type max_memory: int
+        :param max_entries: the maximum number of cached values or None
+                            for no bound
+        :type max_entries: int
+        :param sizeof: a function that estimates the memory occupied by a
+                       value
+        :type sizeof: function
+        '''
+        self.max_memory = max_memory
+        self.max_entries = max_entries
+        self.sizeof = sizeof
+
+        self.memory = 0
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict()
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        r''' Return the value associated to a key
+
+        :param key: the key to be searched
+        :param default: the value to be returned when the key is not cached
+        :returns: the value associated to :param key:, if it is cached,
+                  :param default:, otherwise
+        '''
+        if key not in self._entries:
+            self.misses += 1
+
+            return default
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+
+        return self._entries[key][0]
+
+    def __getitem__(self, key):
+        if key not in self._entries:
+            raise KeyError(key)
+
+        return self.get(key)
+
+    def __setitem__(self, key, value):
+        if key in self._entries:
+            self.memory -= self._entries.pop(key)[1]
+
+        size = self.sizeof(value)
+
+        self._entries[key] = (value, size)
+        self.memory += size
+
+        while (self._entries and
+               ((self.max_entries is not None and
+                 len(self._entries) > self.max_entries) or
+                (self.max_memory is not None and
+                 self.memory > self.max_memory))):
+            self.memory -= self._entries.popitem(last=False)[1][1]
+
+    def clear(self):
+        r''' Remove all the cached values
+        '''
+        self._entries.clear()
+        self.memory = 0
+
+    def __str__(self):
+        return ('LRUCache(entries={}, '.format(len(self._entries)) +
+                'memory={}, hits={}, '.format(self.memory, self.hits) +
+                'misses={})'.format(self.misses))
+
+
+def get_fairness_key(F):
+    r''' Build the key of a container of fairness constraints
+
+    :param F: a container of fairness constraints or None
+    :type F: Container
+    :returns: a hashable object that identifies :param F:
+    :rtype: tuple
+    '''
+    if F is None:
+        return None
+
+    F_key = []
+    for P in F:
+        if isinstance(P, (set, frozenset)):
+            F_key.append(frozenset(P))
+        else:
+            try:
+                # either a single state or a hashable container of states
+                hash(P)
+                F_key.append(P)
+            except TypeError:
+                F_key.append(frozenset(P))
+
+    return tuple(F_key)
+
+
+def get_result_key(formula, F=None):
+    r''' Build the key of a model checking result
+
+    :param formula: a formula
+    :type formula: Formula
+    :param F: a container of fairness constraints
+    :type F: Container
+    :returns: a hashable object that identifies the language of
+              :param formula:, the formula itself, and the fairness
+              constraints
+    :rtype: tuple
+    '''
+    return (formula.__class__.__module__, formula, get_fairness_key(F))
+
+
+def cached_modelcheck(kripke, formula, F, check):
+    r''' Model check a formula by using the result cache of a Kripke structure
+
+    :param kripke: a Kripke structure
+    :type kripke: Kripke
+    :param formula: the formula to model check
+    :type formula: Formula
+    :param F: a container of fairness constraints
+    :type F: Container
+    :param check: a function that model checks :param formula: on
+                  :param kripke: and returns the set of states satisfying it
+    :type check: function
+    :returns: the set of states satisfying :param formula:. If the result
+              cache of :param kripke: has been enabled, the result is
+              a frozenset and it is taken from the cache whenever possible
+    :rtype: set or frozenset
+    '''
+    cache = kripke.result_cache()
+    if cache is None:
+        return check()
+
+    key = get_result_key(formula, F)
+
+    result = cache.get(key)
+    if result is None:
+        result = frozenset(check())
+        cache[key] = result
+
+    return result
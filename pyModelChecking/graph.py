@@ -5,6 +5,23 @@
 .. moduleauthor:: Alberto Casagrande <acasagrande@units.it>
 """
 
+from array import array
+from multiprocessing import Pool
+from queue import Queue
+
+
+def _zeros(typecode, size):
+    return array(typecode, [0])*size
+
+
+def _node_typecode(size):
+    # node identifiers fit into a C int for any realistic graph
+    if size < 2**31:
+        return 'i'
+
+    return 'q'
+
+
 class DiGraph(object):
     r'''
     A class to represent directed graphs.
@@ -24,6 +41,7 @@ class DiGraph(object):
         '''
 
         self._next = dict()
+        self._prev = None
         if V is not None:
             for v in V:
                 self._next[v] = set()
@@ -55,6 +73,8 @@ class DiGraph(object):
                                'is already a node of this DiGraph')
         self._next[v] = set()
 
+        self._structure_changed()
+
     def add_edge(self, src, dst):
         r''' Add a new edge to a DiGraph
 
@@ -73,6 +93,12 @@ class DiGraph(object):
 
         self._next[src].add(dst)
 
+        self._structure_changed()
+
+    def _structure_changed(self):
+        # the predecessor index is rebuilt by the next call to prev()
+        self._prev = None
+
     def sources(self):
         r''' Return the sources of a DiGraph.
 
@@ -94,6 +120,15 @@ class DiGraph(object):
         '''
         return self._next.keys()
 
+    def has_node(self, v):
+        r''' Test whether an object is a node of a DiGraph
+
+        :param v: an object
+        :returns: True if and only if v is a node of the DiGraph
+        :rtype: bool
+        '''
+        return v in self._next
+
     def next(self, src):
         r''' Return the next of a node
 
@@ -111,6 +146,33 @@ class DiGraph(object):
 
         return self._next[src]
 
+    def prev(self, dst):
+        r''' Return the previous of a node
+
+        Given a DiGraph :math:`(V,E)` and one of its node v, the
+        *previous* of :math:`v \in V` is the set of all those nodes
+        :math:`v'` that are source of some edge :math:`(v',v) \in E`.
+        The predecessor index is built at the first call of this method and
+        it is kept until the DiGraph is modified.
+
+        :returns: the set of nodes :math:`\{v' | (v',v) \in E\}`
+        :rtype: set
+        '''
+        if self._prev is None:
+            self._prev = dict()
+            for v in self._next:
+                self._prev[v] = set()
+
+            for src, dsts in self._next.items():
+                for d in dsts:
+                    self._prev[d].add(src)
+
+        if dst not in self._prev:
+            raise RuntimeError('dst = \'{}\' is not a node '.format(dst) +
+                               'of {}'.format(str(self)))
+
+        return self._prev[dst]
+
     def edges(self):
         r''' Return the edges of a DiGraph
 
@@ -166,6 +228,25 @@ class DiGraph(object):
 
         return DiGraph(V=V, E=E)
 
+    def get_subgraph_view(self, nodes=None, predicate=None):
+        r''' Build a view of the subgraph that respects a set of nodes
+
+        Differently from :meth:`get_subgraph`, this method copies neither
+        nodes nor edges: the returned object filters the nodes of this
+        DiGraph on demand.
+
+        :param nodes: either a container of nodes or None
+        :type nodes: a container
+        :param predicate: either a function that selects the nodes of the
+                          subgraph or None
+        :type predicate: function
+        :returns: a view of the subgraph whose nodes are in *nodes*, if this
+                  parameter is not None, and satisfy *predicate*, if this
+                  parameter is not None
+        :rtype: DiGraphView
+        '''
+        return DiGraphView(self, nodes, predicate)
+
     def get_reversed_graph(self):
         r''' Build the reversed graph
 
@@ -176,6 +257,15 @@ class DiGraph(object):
 
         return DiGraph(V=self.nodes(), E=rE)
 
+    def freeze(self):
+        r''' Build the compressed sparse row form of a DiGraph
+
+        :returns: an immutable copy of the DiGraph in compressed sparse
+                  row form
+        :rtype: FrozenDiGraph
+        '''
+        return FrozenDiGraph(self.nodes(), self.edges_iter())
+
     def get_reachable_set_from(self, nodes):
         r''' Compute the reachable set
 
@@ -197,8 +287,513 @@ class DiGraph(object):
 
         return R
 
+    def get_backward_reachable_set_from(self, nodes):
+        r''' Compute the backward reachable set
+
+        This method walks the edges backward by using the predecessor index
+        and, differently from reversing the graph, it does not copy any edge.
+
+        :param nodes: the set of nodes from which the backward reachability
+                      should be evaluated
+        :type nodes: a container of nodes
+        :returns: the set of the nodes from which some node in *nodes* is
+                  reachable
+        :rtype: set
+        '''
+        queue = list(nodes)
+        R = set(nodes)
+
+        while queue:
+            d = queue.pop()
+            for s in self.prev(d):
+                if s not in R:
+                    R.add(s)
+                    queue.append(s)
+
+        return R
+
+
+def _build_CSR(size, srcs, dsts):
+    typecode = _node_typecode(size)
+
+    # counting sort of the edges by source
+    begin = _zeros('q', size+1)
+    for src in srcs:
+        begin[src+1] += 1
+
+    for i in range(size):
+        begin[i+1] += begin[i]
+
+    cursor = array('q', begin)
+    targets = _zeros(typecode, len(srcs))
+    for src, dst in zip(srcs, dsts):
+        targets[cursor[src]] = dst
+        cursor[src] += 1
+
+    # remove repeated edges and compact the rows
+    offsets = _zeros('q', size+1)
+    last = 0
+    for i in range(size):
+        row = sorted(set(targets[begin[i]:begin[i+1]]))
+        targets[last:last+len(row)] = array(typecode, row)
+        last += len(row)
+        offsets[i+1] = last
+
+    del targets[last:]
+
+    return offsets, targets
+
+
+def _reverse_CSR(size, offsets, targets):
+    srcs = _zeros(targets.typecode, len(targets))
+    for i in range(size):
+        for pos in range(offsets[i], offsets[i+1]):
+            srcs[pos] = i
+
+    return _build_CSR(size, targets, srcs)
+
+
+def _CSR_reach(offsets, targets, queue, reached, inside=None):
+    # reached and inside are bytearrays indexed by node identifiers
+    R = list(queue)
+    while queue:
+        i = queue.pop()
+        for j in targets[offsets[i]:offsets[i+1]]:
+            if not reached[j] and (inside is None or inside[j]):
+                reached[j] = 1
+                R.append(j)
+                queue.append(j)
+
+    return R
+
+
+class FrozenDiGraph(DiGraph):
+    r'''
+    A class to represent immutable directed graphs in compressed sparse
+    row (CSR) form.
+
+    The nodes of a FrozenDiGraph are interned into the integer identifiers
+    :math:`0, \ldots, n-1` and the destinations of the edges whose source
+    has identifier :math:`i` are stored in the slice
+    :math:`targets[offsets[i]:offsets[i+1]]`. Both *offsets* and *targets*
+    are :class:`array.array` objects, thus, every edge costs a single machine
+    integer. FrozenDiGraph objects are usually built by calling
+    :meth:`DiGraph.freeze`.
+    '''
+
+    def __init__(self, V=None, E=None):
+        r''' Initialize a new FrozenDiGraph
+
+        :param V: a collection of nodes
+        :type V: a collection
+        :param E: a collection of edges
+        :type E: a collection
+        '''
+
+        self._nodes = []
+        self._index = dict()
+
+        if V is not None:
+            for v in V:
+                self._intern(v)
+
+        srcs = array('q')
+        dsts = array('q')
+        if E is not None:
+            try:
+                for src, dst in E:
+                    srcs.append(self._intern(src))
+                    dsts.append(self._intern(dst))
+            except Exception:
+                raise RuntimeError(('E = \'{}\' '.format(E)) +
+                                   'must be a container of pairs ' +
+                                   'of hashable objects.')
+
+        self._offsets, self._targets = _build_CSR(len(self._nodes),
+                                                  srcs, dsts)
+        self._reversed = None
+
+    @classmethod
+    def _from_CSR(cls, nodes, index, offsets, targets):
+        G = cls.__new__(cls)
+
+        G._nodes = nodes
+        G._index = index
+        G._offsets = offsets
+        G._targets = targets
+        G._reversed = None
+
+        return G
+
+    def _intern(self, v):
+        if v not in self._index:
+            self._index[v] = len(self._nodes)
+            self._nodes.append(v)
+
+        return self._index[v]
+
+    def _id(self, v):
+        try:
+            return self._index[v]
+        except (KeyError, TypeError):
+            raise RuntimeError('src = \'{}\' is not a node '.format(v) +
+                               'of {}'.format(str(self)))
+
+    def add_node(self, v):
+        r''' Add a new node to a FrozenDiGraph
+
+        :raise RuntimeError: FrozenDiGraph objects cannot be modified
+        '''
+        raise RuntimeError('FrozenDiGraph objects cannot be modified')
+
+    def add_edge(self, src, dst):
+        r''' Add a new edge to a FrozenDiGraph
+
+        :raise RuntimeError: FrozenDiGraph objects cannot be modified
+        '''
+        raise RuntimeError('FrozenDiGraph objects cannot be modified')
+
+    def sources(self):
+        r''' Return the sources of a FrozenDiGraph.
+
+        :returns: a generator of all the nodes that are sources of some edges
+        :rtype: generator
+        '''
+        offsets = self._offsets
+        for i, src in enumerate(self._nodes):
+            if offsets[i] < offsets[i+1]:
+                yield src
+
+    def nodes(self):
+        r''' Return the nodes of a FrozenDiGraph
+
+        :returns: the nodes of the FrozenDiGraph
+        :rtype: a set-like view
+        '''
+        return self._index.keys()
+
+    def has_node(self, v):
+        r''' Test whether an object is a node of a FrozenDiGraph
+
+        :param v: an object
+        :returns: True if and only if v is a node of the FrozenDiGraph
+        :rtype: bool
+        '''
+        return v in self._index
+
+    def next(self, src):
+        r''' Return the next of a node
+
+        :returns: the set of nodes :math:`\{v' | (v,v') \in E\}`
+        :rtype: set
+        '''
+        i = self._id(src)
+        nodes = self._nodes
+
+        return set([nodes[j] for j in
+                    self._targets[self._offsets[i]:self._offsets[i+1]]])
+
+    def _reversed_CSR(self):
+        if self._reversed is None:
+            self._reversed = _reverse_CSR(len(self._nodes), self._offsets,
+                                          self._targets)
+
+        return self._reversed
+
+    def prev(self, dst):
+        r''' Return the previous of a node
+
+        The predecessor index is stored in compressed sparse row form and
+        it is built at the first call of this method.
+
+        :returns: the set of nodes :math:`\{v' | (v',v) \in E\}`
+        :rtype: set
+        '''
+        i = self._id(dst)
+        nodes = self._nodes
+        offsets, targets = self._reversed_CSR()
+
+        return set([nodes[j] for j in targets[offsets[i]:offsets[i+1]]])
+
+    def edges_iter(self):
+        r''' Return the edges of a FrozenDiGraph
+
+        :returns: the generator of edges of the FrozenDiGraph
+        :rtype: generator
+        '''
+        nodes = self._nodes
+        offsets = self._offsets
+        targets = self._targets
+        for i, src in enumerate(nodes):
+            for j in targets[offsets[i]:offsets[i+1]]:
+                yield (src, nodes[j])
+
+    def clone(self):
+        r''' Clone a FrozenDiGraph
+
+        Since FrozenDiGraph objects cannot be modified, the clone shares the
+        node index and the CSR arrays of the original object.
+
+        :returns: a clone of the FrozenDiGraph
+        :rtype: FrozenDiGraph
+        '''
+        G = FrozenDiGraph._from_CSR(self._nodes, self._index,
+                                    self._offsets, self._targets)
+        G._reversed = self._reversed
+
+        return G
+
+    def freeze(self):
+        r''' Build the compressed sparse row form of a FrozenDiGraph
+
+        :returns: the FrozenDiGraph itself
+        :rtype: FrozenDiGraph
+        '''
+        return self
+
+    def get_reversed_graph(self):
+        r''' Build the reversed graph
+
+        The reversed graph shares the node index and the arrays of the
+        original one: its edges are those of the predecessor index.
+
+        :returns: the reversed graph
+        :rtype: FrozenDiGraph
+        '''
+        offsets, targets = self._reversed_CSR()
+
+        rG = FrozenDiGraph._from_CSR(self._nodes, self._index,
+                                     offsets, targets)
+        rG._reversed = (self._offsets, self._targets)
+
+        return rG
+
+    def _reach(self, offsets, targets, nodes):
+        reached = bytearray(len(self._nodes))
+        queue = []
+        for v in nodes:
+            i = self._id(v)
+            if not reached[i]:
+                reached[i] = 1
+                queue.append(i)
+
+        R = _CSR_reach(offsets, targets, queue, reached)
+
+        return set([self._nodes[i] for i in R])
+
+    def get_reachable_set_from(self, nodes):
+        r''' Compute the reachable set
+
+        :param nodes: the set of nodes from which the reachability
+                      should be evaluated
+        :type nodes: a container of nodes
+        :returns: the set of the reachable nodes
+        :rtype: set
+        '''
+        return self._reach(self._offsets, self._targets, nodes)
+
+    def get_backward_reachable_set_from(self, nodes):
+        r''' Compute the backward reachable set
+
+        :param nodes: the set of nodes from which the backward reachability
+                      should be evaluated
+        :type nodes: a container of nodes
+        :returns: the set of the nodes from which some node in *nodes* is
+                  reachable
+        :rtype: set
+        '''
+        offsets, targets = self._reversed_CSR()
+
+        return self._reach(offsets, targets, nodes)
+
+
+class DiGraphView(DiGraph):
+    r'''
+    A class to represent subgraphs of a DiGraph without copying them.
+
+    A DiGraphView object refers to a DiGraph and to either a set of nodes,
+    a predicate over the nodes, or both of them. Its nodes are the nodes
+    of the DiGraph that belong to the set and satisfy the predicate and
+    its edges are the edges of the DiGraph whose source and destination are
+    nodes of the view. Nodes and edges are filtered on demand, thus, building
+    a view costs :math:`O(1)`.
+    '''
+
+    def __init__(self, G, nodes=None, predicate=None):
+        r''' Initialize a new DiGraphView
+
+        :param G: the viewed DiGraph
+        :type G: DiGraph
+        :param nodes: either a container of nodes or None
+        :type nodes: a container
+        :param predicate: either a function that selects the nodes of the
+                          view or None
+        :type predicate: function
+        '''
+        if not isinstance(G, DiGraph):
+            raise TypeError('{} is not a DiGraph'.format(G))
+
+        if not (nodes is None or isinstance(nodes, (set, frozenset))):
+            nodes = set(nodes)
+
+        self._graph = G
+        self._mask = nodes
+        self._predicate = predicate
+
+    def _in_mask(self, v):
+        return ((self._mask is None or v in self._mask) and
+                (self._predicate is None or self._predicate(v)))
+
+    def add_node(self, v):
+        r''' Add a new node to a DiGraphView
+
+        :raise RuntimeError: DiGraphView objects cannot be modified
+        '''
+        raise RuntimeError('DiGraphView objects cannot be modified')
+
+    def add_edge(self, src, dst):
+        r''' Add a new edge to a DiGraphView
+
+        :raise RuntimeError: DiGraphView objects cannot be modified
+        '''
+        raise RuntimeError('DiGraphView objects cannot be modified')
+
+    def sources(self):
+        r''' Return the sources of a DiGraphView.
+
+        :returns: a generator of all the nodes that are sources of some edges
+        :rtype: generator
+        '''
+        for src in self.nodes():
+            if self.next(src):
+                yield src
+
+    def nodes(self):
+        r''' Return the nodes of a DiGraphView
+
+        :returns: a generator of the nodes of the DiGraphView
+        :rtype: generator
+        '''
+        if self._mask is None:
+            for v in self._graph.nodes():
+                if self._in_mask(v):
+                    yield v
+        else:
+            for v in self._mask:
+                if self._in_mask(v) and self._graph.has_node(v):
+                    yield v
+
+    def has_node(self, v):
+        r''' Test whether an object is a node of a DiGraphView
+
+        :param v: an object
+        :returns: True if and only if v is a node of the DiGraphView
+        :rtype: bool
+        '''
+        return self._in_mask(v) and self._graph.has_node(v)
 
-def compute_SCCs(G):
+    def next(self, src):
+        r''' Return the next of a node
+
+        :returns: the set of nodes :math:`\{v' | (v,v') \in E\}`
+        :rtype: set
+        '''
+        if not self.has_node(src):
+            raise RuntimeError('src = \'{}\' is not a node '.format(src) +
+                               'of this DiGraphView')
+
+        return set([d for d in self._graph.next(src) if self._in_mask(d)])
+
+    def prev(self, dst):
+        r''' Return the previous of a node
+
+        :returns: the set of nodes :math:`\{v' | (v',v) \in E\}`
+        :rtype: set
+        '''
+        if not self.has_node(dst):
+            raise RuntimeError('dst = \'{}\' is not a node '.format(dst) +
+                               'of this DiGraphView')
+
+        return set([s for s in self._graph.prev(dst) if self._in_mask(s)])
+
+    def edges_iter(self):
+        r''' Return the edges of a DiGraphView
+
+        :returns: the generator of edges of the DiGraphView
+        :rtype: generator
+        '''
+        for src in self.nodes():
+            for dst in self.next(src):
+                yield (src, dst)
+
+    def clone(self):
+        r''' Clone a DiGraphView into a DiGraph
+
+        :returns: a DiGraph having the same nodes and edges of the view
+        :rtype: DiGraph
+        '''
+        return DiGraph(V=self.nodes(), E=self.edges_iter())
+
+
+def _CSR_SCCs(offsets, targets, roots, inside=None):
+    # yields the lists of identifiers of the SCCs of the subgraph induced
+    # by the identifiers i such that inside[i] is not 0
+    size = len(offsets)-1
+    disc = array('q', [-1])*size
+    lowlink = _zeros('q', size)
+    in_a_scc = bytearray(size)
+    scc_stack = []
+    time = 0
+
+    def succs(v):
+        if inside is None:
+            return targets[offsets[v]:offsets[v+1]]
+
+        return [w for w in targets[offsets[v]:offsets[v+1]] if inside[w]]
+
+    for s in roots:
+        if disc[s] < 0:
+            disc[s] = time
+            lowlink[s] = time
+
+            stack = [[s, succs(s), 0]]
+            while stack:
+                v, v_next, pos = stack[-1]
+                if pos < len(v_next):
+                    stack[-1][2] = pos+1
+
+                    w = v_next[pos]
+                    if disc[w] < 0:
+                        time = time+1
+                        disc[w] = time
+                        lowlink[w] = time
+
+                        stack.append([w, succs(w), 0])
+                else:
+                    stack.pop()
+
+                    for w in v_next:
+                        if not in_a_scc[w]:
+                            if disc[w] > disc[v]:
+                                lowlink[v] = min(lowlink[v], lowlink[w])
+                            else:
+                                lowlink[v] = min(lowlink[v], disc[w])
+
+                    if lowlink[v] == disc[v]:
+                        in_a_scc[v] = 1
+                        scc = [v]
+                        while scc_stack and disc[scc_stack[-1]] > disc[v]:
+                            k = scc_stack.pop()
+                            in_a_scc[k] = 1
+                            scc.append(k)
+                        yield scc
+                    else:
+                        scc_stack.append(v)
+
+            time = time+1
+
+
+def compute_SCCs(G, processes=None):
     r''' Compute the strongly connected components of a DiGraph
 
     This method implements a non-recursive version of the
@@ -209,8 +804,19 @@ def compute_SCCs(G):
        connected components in a directed graph.", Information Processing
        Letters 49(1): 9-14, (1994)
 
+    Whenever G is a :class:`FrozenDiGraph`, the algorithm runs directly on
+    the integer identifiers of its CSR form. Whenever the parallel engine
+    is selected, either by :param processes: or by
+    :func:`enable_parallel_SCCs`, the components are computed by
+    :func:`compute_SCCs_in_parallel` and they are not produced in reverse
+    topological order.
+
     :param G: the DiGraph object
     :type G: DiGraph
+    :param processes: the number of worker processes of the parallel
+                      engine, 1 to use the sequential algorithm, or None
+                      to use the setting of :func:`enable_parallel_SCCs`
+    :type processes: int
     :returns: a generator of the sets of nodes of the strongly connected
               components of the DiGraph
     :rtype: generator
@@ -219,6 +825,31 @@ def compute_SCCs(G):
     if not isinstance(G, DiGraph):
         raise TypeError('{} is not a DiGraph'.format(G))
 
+    threshold = 2**14
+    if processes is None and _parallel_SCCs is not None:
+        processes, threshold = _parallel_SCCs
+        if isinstance(G, FrozenDiGraph):
+            size = len(G._nodes)
+        else:
+            size = sum(1 for v in G.nodes())
+
+        parallel = size > threshold
+    else:
+        parallel = processes is not None and processes > 1
+
+    if parallel:
+        for scc in compute_SCCs_in_parallel(G, processes, threshold):
+            yield scc
+
+        return
+
+    if isinstance(G, FrozenDiGraph):
+        nodes = G._nodes
+        for scc in _CSR_SCCs(G._offsets, G._targets, range(len(nodes))):
+            yield [nodes[i] for i in scc]
+
+        return
+
     disc = dict()
     lowlink = dict()
     in_a_scc = set()
@@ -262,3 +893,358 @@ def compute_SCCs(G):
                         yield scc
                     else:
                         scc_stack.append(v)
+
+
+# the setting of the parallel SCC engine: either None or the pair
+# (number of processes, threshold)
+_parallel_SCCs = None
+
+# the pool of worker processes of the parallel SCC engine: it is created
+# by the first parallel decomposition after enable_parallel_SCCs and it is
+# reused by all the following ones until disable_parallel_SCCs is called
+_pool = None
+
+
+def enable_parallel_SCCs(processes=None, threshold=2**14):
+    r''' Enable the parallel SCC engine by default
+
+    Once this function has been called, :func:`compute_SCCs`, and thus the
+    model checking algorithms that decompose graphs into strongly
+    connected components, use :func:`compute_SCCs_in_parallel` on the
+    graphs having more than :param threshold: nodes. All of them share one
+    pool of worker processes, which is started by the first parallel
+    decomposition and terminated by :func:`disable_parallel_SCCs`.
+
+    :param processes: the number of worker processes or None to use as many
+                      processes as the CPUs
+    :type processes: int
+    :param threshold: the number of nodes below which the components are
+                      computed sequentially
+    :type threshold: int
+    '''
+    global _parallel_SCCs
+
+    disable_parallel_SCCs()
+
+    _parallel_SCCs = (processes, threshold)
+
+
+def disable_parallel_SCCs():
+    r''' Disable the parallel SCC engine by default
+
+    The pool of worker processes started since the last call of
+    :func:`enable_parallel_SCCs`, if any, is terminated.
+    '''
+    global _parallel_SCCs, _pool
+
+    _parallel_SCCs = None
+
+    if _pool is not None:
+        _pool.terminate()
+        _pool = None
+
+
+def _get_pool(processes):
+    # returns the pool of the enable_parallel_SCCs setting whenever it has
+    # the requested number of processes and None otherwise
+    global _pool
+
+    if (_parallel_SCCs is None or
+            processes not in (None, _parallel_SCCs[0])):
+        return None
+
+    if _pool is None:
+        _pool = Pool(_parallel_SCCs[0])
+
+    return _pool
+
+
+def _share(values):
+    # multiprocessing.shared_memory is available since Python 3.8: it is
+    # imported by the parallel engine alone, so that the sequential one
+    # works on older versions
+    from multiprocessing.shared_memory import SharedMemory
+
+    size = len(values)*values.itemsize
+
+    shm = SharedMemory(create=True, size=max(1, size))
+    shm.buf[:size] = memoryview(values).cast('B')
+
+    return shm
+
+
+def _attach_CSR(specs):
+    from multiprocessing.shared_memory import SharedMemory
+
+    blocks = [SharedMemory(name=name) for name, _, _ in specs]
+    CSR = [shm.buf[:length*array(typecode).itemsize].cast(typecode)
+           for shm, (name, typecode, length) in zip(blocks, specs)]
+
+    return blocks, CSR
+
+
+def _detach_CSR(blocks, CSR):
+    # the views must be released before the blocks are closed
+    for values in CSR:
+        values.release()
+
+    for shm in blocks:
+        shm.close()
+
+
+def _trim(offsets, targets, r_offsets, r_targets, alive):
+    # iteratively removes the nodes having either no predecessor or no
+    # successor among the alive ones: each of them is a trivial SCC
+    size = len(alive)
+    out_degree = array('q', [offsets[i+1]-offsets[i] for i in range(size)])
+    in_degree = array('q', [r_offsets[i+1]-r_offsets[i]
+                            for i in range(size)])
+
+    queue = [i for i in range(size) if not (out_degree[i] and in_degree[i])]
+    trimmed = []
+    while queue:
+        i = queue.pop()
+        if not alive[i]:
+            continue
+
+        alive[i] = 0
+        trimmed.append(i)
+
+        for j in targets[offsets[i]:offsets[i+1]]:
+            if alive[j]:
+                in_degree[j] -= 1
+                if not in_degree[j]:
+                    queue.append(j)
+
+        for j in r_targets[r_offsets[i]:r_offsets[i+1]]:
+            if alive[j]:
+                out_degree[j] -= 1
+                if not out_degree[j]:
+                    queue.append(j)
+
+    return trimmed
+
+
+def _copy_view(values):
+    copy = array(values.format)
+    with values.cast('B') as raw:
+        copy.frombytes(raw)
+
+    return copy
+
+
+def _FB_task(specs, threshold, ids):
+    # trims the subgraph induced by the identifiers in ids, or the whole
+    # graph if ids is None, splits it by a forward-backward step, and
+    # returns both the SCCs found and the parts that must be further
+    # decomposed
+    blocks, CSR = _attach_CSR(specs)
+    try:
+        return _FB_split(CSR, threshold, ids)
+    finally:
+        _detach_CSR(blocks, CSR)
+
+
+def _FB_split(CSR, threshold, ids):
+    offsets, targets = CSR
+
+    if ids is None:
+        # the whole graph needs no renumbering: its CSR is copied as it is
+        size = len(offsets)-1
+        ids = range(size)
+        l_offsets, l_targets = [_copy_view(values)
+                                for values in [offsets, targets]]
+    else:
+        local = dict((g, i) for i, g in enumerate(ids))
+        srcs = array('q')
+        dsts = array('q')
+        for i, g in enumerate(ids):
+            for w in targets[offsets[g]:offsets[g+1]]:
+                j = local.get(w)
+                if j is not None:
+                    srcs.append(i)
+                    dsts.append(j)
+
+        size = len(ids)
+        l_offsets, l_targets = _build_CSR(size, srcs, dsts)
+
+    r_offsets, r_targets = _reverse_CSR(size, l_offsets, l_targets)
+
+    alive = bytearray(b'\x01')*size
+    SCCs = [[ids[i]] for i in _trim(l_offsets, l_targets,
+                                    r_offsets, r_targets, alive)]
+
+    remaining = [i for i in range(size) if alive[i]]
+    if len(remaining) <= threshold:
+        parts = [remaining]
+    else:
+        # a pivot having many predecessors and successors likely belongs
+        # to a large SCC
+        pivot = max(remaining,
+                    key=(lambda i: (l_offsets[i+1]-l_offsets[i]) *
+                         (r_offsets[i+1]-r_offsets[i])))
+
+        forward = bytearray(size)
+        forward[pivot] = 1
+        _CSR_reach(l_offsets, l_targets, [pivot], forward, alive)
+
+        backward = bytearray(size)
+        backward[pivot] = 1
+        _CSR_reach(r_offsets, r_targets, [pivot], backward, alive)
+
+        SCCs.append([ids[i] for i in remaining if forward[i] and backward[i]])
+
+        parts = [[i for i in remaining if forward[i] and not backward[i]],
+                 [i for i in remaining if backward[i] and not forward[i]],
+                 [i for i in remaining if not (forward[i] or backward[i])]]
+
+    tasks = []
+    for part in parts:
+        if len(part) > threshold:
+            tasks.append(array('q', [ids[i] for i in part]))
+        elif part:
+            inside = bytearray(size)
+            for i in part:
+                inside[i] = 1
+
+            for scc in _CSR_SCCs(l_offsets, l_targets, part, inside):
+                SCCs.append([ids[i] for i in scc])
+
+    return SCCs, tasks
+
+
+def _parallel_CSR_SCCs(offsets, targets, ids, processes=None,
+                       threshold=2**14):
+    # yields the lists of identifiers of the SCCs of the subgraph induced
+    # by the identifiers in ids
+    pool = None
+    temporary = False
+
+    blocks = []
+    try:
+        for values in [offsets, targets]:
+            blocks.append(_share(values))
+
+        # the pool is started after the blocks have been created, so that
+        # its workers share the resource tracker of this process
+        pool = _get_pool(processes)
+        if pool is None:
+            temporary = True
+            pool = Pool(processes)
+
+        specs = [(shm.name, values.typecode, len(values))
+                 for shm, values in zip(blocks, [offsets, targets])]
+
+        results = Queue()
+
+        def submit(task):
+            pool.apply_async(_FB_task, (specs, threshold, task),
+                             callback=results.put,
+                             error_callback=results.put)
+
+        # node identifiers are distinct: if ids has as many elements as the
+        # graph has nodes, the subgraph is the whole graph
+        if len(ids) == len(offsets)-1:
+            submit(None)
+        else:
+            submit(array('q', ids))
+
+        pending = 1
+        while pending:
+            result = results.get()
+            pending -= 1
+
+            if isinstance(result, BaseException):
+                raise result
+
+            SCCs, tasks = result
+
+            # the new tasks are submitted before yielding, so that the
+            # workers are not idle while the SCCs are consumed
+            for task in tasks:
+                submit(task)
+            pending += len(tasks)
+
+            for scc in SCCs:
+                yield scc
+    finally:
+        if temporary:
+            pool.terminate()
+
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+
+def compute_SCCs_in_parallel(G, processes=None, threshold=2**14):
+    r''' Compute the strongly connected components of a DiGraph in parallel
+
+    This method implements the forward-backward algorithm with trimming
+    ([fhp00]_, [mhprs05]_). The CSR form of the graph is stored into
+    shared memory blocks and a pool of worker processes decomposes it.
+    Every task removes the nodes having either no predecessor or no
+    successor in its subgraph, since they are trivial components, and
+    computes the nodes that are forward and backward reachable from a
+    pivot node. Their intersection is the component of the pivot, while
+    the remaining nodes split into three subgraphs that do not share any
+    component and are decomposed by further tasks. The subgraphs having
+    at most :param threshold: nodes are decomposed by the sequential
+    algorithm. The first task, which trims the whole graph and splits it
+    by the first pivot, runs in a single worker: the decomposition becomes
+    parallel from the subgraphs that it produces on.
+
+    The pool of :func:`enable_parallel_SCCs` is used whenever it has
+    :param processes: workers; otherwise, a pool is started for this call
+    alone. The parallel engine requires Python 3.8 or later.
+
+    .. [fhp00] L. K. Fleischer, B. Hendrickson, and A. Pinar. "On
+       identifying strongly connected components in parallel.", In Proc.
+       of IPDPS Workshops, LNCS 1800: 505-511, (2000)
+
+    .. [mhprs05] W. McLendon III, B. Hendrickson, S. J. Plimpton, and
+       L. Rauchwerger. "Finding strongly connected components in
+       distributed graphs.", Journal of Parallel and Distributed Computing
+       65(8): 901-910, (2005)
+
+    Whenever G is neither a :class:`FrozenDiGraph` nor a view of it, its
+    CSR form is built by :meth:`DiGraph.freeze`.
+
+    :param G: the DiGraph object
+    :type G: DiGraph
+    :param processes: the number of worker processes or None to use as many
+                      processes as the CPUs
+    :type processes: int
+    :param threshold: the number of nodes below which the components are
+                      computed sequentially
+    :type threshold: int
+    :returns: a generator of the sets of nodes of the strongly connected
+              components of the DiGraph in no specific order
+    :rtype: generator
+    '''
+
+    if not isinstance(G, DiGraph):
+        raise TypeError('{} is not a DiGraph'.format(G))
+
+    if (isinstance(G, DiGraphView) and
+            isinstance(G._graph, FrozenDiGraph)):
+        F = G._graph
+        ids = [F._index[v] for v in G.nodes()]
+    else:
+        F = G.freeze()
+        ids = range(len(F._nodes))
+
+    nodes = F._nodes
+    for scc in _parallel_CSR_SCCs(F._offsets, F._targets, ids, processes,
+                                  threshold):
+        yield [nodes[i] for i in scc]
+
+
+def _CSR_compute_SCCs(offsets, targets, ids, inside):
+    # selects the SCC engine for the subgraph induced by the identifiers in
+    # ids according to the setting of enable_parallel_SCCs
+    if _parallel_SCCs is not None and len(ids) > _parallel_SCCs[1]:
+        processes, threshold = _parallel_SCCs
+
+        return _parallel_CSR_SCCs(offsets, targets, ids, processes, threshold)
+
+    return _CSR_SCCs(offsets, targets, ids, inside)
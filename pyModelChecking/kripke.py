@@ -6,9 +6,17 @@
 """
 
 
+import weakref
+
+from collections.abc import Mapping, MutableMapping
+
 from .graph import DiGraph
+from .graph import FrozenDiGraph
+from .graph import DiGraphView
 from .graph import compute_SCCs
 
+from .cache import LRUCache, get_fairness_key
+
 from .__init__ import __release__
 
 
@@ -35,6 +43,12 @@ class Kripke(DiGraph):
                     atomic propositions that hold in the state itself.
         :type L: dict
         '''
+        self._results = None
+        self._fair_states = LRUCache(max_entries=16)
+        self._shared_structure = False
+        self._AP_index = None
+        self._CSR_graph = None
+
         super(Kripke, self).__init__(S, R)
 
         if S0 is None:
@@ -56,47 +70,157 @@ class Kripke(DiGraph):
         if L is None:
             L = dict()
 
-        if not isinstance(L, dict):
+        if not isinstance(L, Mapping):
             raise RuntimeError('L=\'%s\' must be a dictionary' % (L))
 
-        self._labels = dict()
+        self._labels = _Labelling(self)
         for state in self.nodes():
             if state in L:
                 try:
-                    self._labels[state] = set(L[state])
+                    self._labels._store(state, L[state])
                 except Exception:
                     raise RuntimeError(('L=\'{}\' must be a '.format(L)) +
                                        'dictionary that labels each state ' +
                                        'with a set of atomic propositions')
             else:
-                self._labels[state] = set()
+                self._labels._store(state, ())
 
     def labelling_function(self):
         r''' Return the labelling function
 
+        The returned dictionary is the labelling function of the Kripke
+        structure itself: changing either it or its label sets changes
+        the labels of the states. The label sets that are assigned to it
+        are copied.
+
         :returns: the labelling function
         :rtype: dict
         '''
-        return self._labels
+        L = self._labels
+        if L.base is not None:
+            # the labels that are still read from the cloned structure
+            # are copied
+            for state in self.states():
+                try:
+                    L._own(state)
+                except KeyError:
+                    pass
+
+            L.base = None
+
+        return L
 
     def replace_labelling_function(self, L):
         r''' Replace the labelling function
 
+        The label sets of :param L: are copied.
+
         :param L: a new labelling function for this Kripke structure
         :type L: dict
         :returns: the former labelling function
         :rtype: dict
         '''
-        old_L = self._labels
+        old_L = self.labelling_function()
 
-        self._labels = L
+        # the former labelling function is detached from this structure
+        old_L._kripke = None
 
+        self._labels = _Labelling(self)
         for s in self.states():
-            if s not in self._labels:
-                self._labels[s] = set()
+            if s in L:
+                self._labels._store(s, L[s])
+            else:
+                self._labels._store(s, ())
+
+        self._AP_index = None
+        self._labelling_changed()
 
         return old_L
 
+    def add_node(self, v):
+        r''' Add a new state to a Kripke structure
+
+        :param v: a state
+        '''
+        self._unshare_structure()
+
+        super(Kripke, self).add_node(v)
+
+    def add_edge(self, src, dst):
+        r''' Add a new transition to a Kripke structure
+
+        :param src: the source state of the transition
+        :param dst: the destination state of the transition
+        '''
+        self._unshare_structure()
+
+        super(Kripke, self).add_edge(src, dst)
+
+    def _unshare_structure(self):
+        # a clone shares the transition relation and the fair states with
+        # the cloned structure until either of them is modified
+        if self._shared_structure:
+            self._next = dict((src, set(dsts))
+                              for src, dsts in self._next.items())
+            self._prev = None
+            self._fair_states = LRUCache(max_entries=16)
+            self._shared_structure = False
+
+    def _structure_changed(self):
+        super(Kripke, self)._structure_changed()
+
+        # the fair states depend on the transition relation alone
+        self._fair_states.clear()
+        self._CSR_graph = None
+
+        self._labelling_changed()
+
+    def _labelling_changed(self):
+        # cached model checking results depend on both the transition
+        # relation and the labelling function
+        if self._results is not None:
+            self._results.clear()
+
+    def enable_result_cache(self, max_memory=2**26, max_entries=None):
+        r''' Attach a model checking result cache to a Kripke structure
+
+        Once the cache is enabled, the model checking functions store in
+        it the sets of states satisfying the checked formulas, so that
+        repeated queries on the same formula and fairness constraints
+        are answered without model checking the structure again. The
+        results stored in the cache are frozensets and the cache is
+        cleared whenever either the structure or its labelling function
+        is changed by the methods of this class.
+
+        :param max_memory: the maximum amount of memory, in bytes, that can
+                           be accounted to the cached results or None for
+                           no bound
+        :type max_memory: int
+        :param max_entries: the maximum number of cached results or None
+                            for no bound
+        :type max_entries: int
+        :returns: the result cache
+        :rtype: LRUCache
+        '''
+        self._results = LRUCache(max_memory=max_memory,
+                                 max_entries=max_entries)
+
+        return self._results
+
+    def disable_result_cache(self):
+        r''' Detach the model checking result cache from a Kripke structure
+        '''
+        self._results = None
+
+    def result_cache(self):
+        r''' Return the model checking result cache
+
+        :returns: the result cache of the Kripke structure, if it has been
+                  enabled, None, otherwise
+        :rtype: LRUCache
+        '''
+        return self._results
+
     def labels(self, state=None):
         r''' Get the atomic propositions
 
@@ -110,16 +234,54 @@ class Kripke(DiGraph):
         :rtype: set
         '''
         if state is not None:
-            if state not in self.nodes():
+            try:
+                return self._labels._own(state)
+            except KeyError:
                 raise RuntimeError(('state=\'{}\' is '.format(state)) +
                                    'not a state of this Kripke structure')
+
+        return set(self._get_AP_index())
+
+    def _get_labels(self, state):
+        # the labels of a state, which must not be modified: differently
+        # from labels, it never copies the labels of a clone
+        try:
             return self._labels[state]
+        except KeyError:
+            raise RuntimeError(('state=\'{}\' is '.format(state)) +
+                               'not a state of this Kripke structure')
+
+    def states_labelled_by(self, AP):
+        r''' Return the set of states labelled by an atomic proposition.
+
+        The states are read from an index that maps every atomic
+        proposition into the set of the states that it labels. The index
+        is built at the first call of either this method or
+        :meth:`labels`, it is updated by :meth:`label_states`, and it is
+        rebuilt after any other change of either the labelling function
+        or its label sets.
+
+        :param AP: an atomic proposition
+        :type AP: str
+        :returns: the set of states labelled by :param AP:
+        :rtype: frozenset
+        '''
+        return self._get_AP_index().get(AP, frozenset())
 
-        AP = set()
-        for ap in self._labels.values():
-            AP.update(ap)
+    def _get_AP_index(self):
+        if self._AP_index is None:
+            index = dict()
+            for state, AP in self._labels._items_of(self.states()):
+                for ap in AP:
+                    if ap in index:
+                        index[ap].append(state)
+                    else:
+                        index[ap] = [state]
 
-        return AP
+            self._AP_index = dict((ap, frozenset(states))
+                                  for ap, states in index.items())
+
+        return self._AP_index
 
     def states(self):
         r''' Return the states of a Kripke structure
@@ -146,6 +308,23 @@ class Kripke(DiGraph):
             raise RuntimeError(('src=\'{}\' is not a state '.format(src)) +
                                'of this Kripke structure')
 
+    def prev(self, dst):
+        r''' Return the previous of a state
+
+        Given a Kripke structure :math:`K=(S,S0,R,L)` and one of its state
+        :math:`s`, the *previous* of :math:`s` in :math:`K` is the set of all
+        those states that are source of some edges whose destination is
+        :math:`s` itself i.e., :math:`K.prev(s)=\{s' | (s',s) \in R\}`.
+
+        :returns: the set of nodes :math:`\{s' | (s',s) \in R\}`
+        :rtype: set
+        '''
+        try:
+            return super(Kripke, self).prev(dst)
+        except Exception:
+            raise RuntimeError(('dst=\'{}\' is not a state '.format(dst)) +
+                               'of this Kripke structure')
+
     def transitions_iter(self):
         r''' Return an interator of the edges of a Kripke structure
 
@@ -165,14 +344,52 @@ class Kripke(DiGraph):
     def clone(self):
         r''' Clone a Kripke structure
 
+        The clone is copy-on-write: it shares the transition relation with
+        the current Kripke structure until either of them is modified,
+        while its labelling function is an overlay that reads the labels
+        of the current structure. The labels of a state are copied into
+        the overlay as soon as either structure changes them or the clone
+        returns them (see :meth:`labels`), so that changing the labels of
+        either structure never affects the other one. Hence, cloning takes
+        time and memory that do not depend on the size of the structure.
+
         :returns: a clone of the current Kripke structure
         :rtype: Kripke
         '''
-        L = dict()
-        for state, AP in self._labels.items():
-            L[state] = set(AP)
+        nK = self.__class__.__new__(self.__class__)
+        nK.__dict__.update(self.__dict__)
+        nK.S0 = set(self.S0)
+        nK._labels = _Labelling(nK, base=self._labels)
+        nK._results = None
+
+        # the index values are frozensets and they can be shared
+        if self._AP_index is not None:
+            nK._AP_index = dict(self._AP_index)
+
+        if not isinstance(self, FrozenDiGraph):
+            self._shared_structure = True
+            nK._shared_structure = True
+
+        return nK
+
+    def freeze(self):
+        r''' Build the compressed sparse row form of a Kripke structure
+
+        :returns: an immutable copy of the transition relation of the Kripke
+                  structure in compressed sparse row form
+        :rtype: FrozenKripke
+        '''
+        L = dict(self._labels._items_of(self.states()))
+
+        return FrozenKripke(self.states(), self.S0, self.transitions_iter(), L)
 
-        return Kripke(self.states(), self.S0, self.transitions(), L)
+    def _get_CSR_graph(self):
+        # the compressed sparse row form of the transition relation is
+        # built once and kept until the structure is modified
+        if self._CSR_graph is None:
+            self._CSR_graph = DiGraph.freeze(self)
+
+        return self._CSR_graph
 
     def get_substructure(self, V):
         r''' Return the sub-structure that respects a set of states
@@ -191,38 +408,51 @@ class Kripke(DiGraph):
         S = V & set(self.states())
         S0 = V & self.S0
         E = [(s, d) for (s, d) in self.transitions_iter() if s in V and d in V]
-        L = {s: S for s, S in self._next.items() if s in V}
+        L = dict(self._labels._items_of(S))
 
         return Kripke(S, S0, E, L)
 
-    def get_fair_states(self, F):
-        r''' Return a set of states from which leaves a fair path.
+    def get_substructure_view(self, V):
+        r''' Return a view of the sub-structure that respects a set of states
 
-        :param F: a container of fairness constraints
-        :type F: a container
-        :returns: the set of states from which leaves a fair path
-        :rtype: set
+        Differently from :meth:`get_substructure`, this method copies
+        neither states nor transitions: the returned object filters the
+        states of this Kripke structure on demand.
+
+        :param V: either a set of states or a function that selects the
+                  states of the sub-structure
+        :type V: set or function
+        :returns: a view of the sub-structure that respects V
+        :rtype: KripkeView
         '''
+        if callable(V):
+            return KripkeView(self, predicate=V)
 
-        def is_a_fair_SCC(self, scc, F):
-            v = next(iter(scc))
-            if len(scc) == 1 or v not in self.next(v):
-                return False
+        return KripkeView(self, nodes=V)
 
-            for P in F:
-                if not set(scc) & P:
-                    return False
+    def get_fair_states(self, F):
+        r''' Return a set of states from which leaves a fair path.
 
-            return True
+        A path is *fair* whenever it visits every fairness constraint
+        infinitely often. The fair states are computed by the Emerson-Lei
+        fixpoint (see :func:`get_fair_EG_states`) and they are cached per
+        fairness constraints until the transition relation is modified.
 
-        F_set = set()
-        for SCC in compute_SCCs(self):
-            if is_a_fair_SCC(self, SCC, F):
-                F_set.update(SCC)
+        :param F: a container of fairness constraints, i.e., of sets of
+                  states
+        :type F: a container
+        :returns: the set of states from which leaves a fair path
+        :rtype: frozenset
+        '''
+        key = get_fairness_key(F)
 
-        R_graph = self.get_reversed_graph()
+        fair_states = self._fair_states.get(key)
+        if fair_states is None:
+            fair_states = frozenset(get_fair_EG_states(self, self.states(),
+                                                       F))
+            self._fair_states[key] = fair_states
 
-        return R_graph.get_reachable_set_from(F_set)
+        return fair_states
 
     def label_fair_states(self, F):
         r''' Label all the fair states by a new atomic proposition.
@@ -243,18 +473,389 @@ class Kripke(DiGraph):
             f_label = 'fair{}'.format(i)
             i += 1
 
-        for s in self.get_fair_states(F):
-            self._labels[s].add(f_label)
+        self.label_states(self.get_fair_states(F), f_label)
 
         return f_label
 
+    def label_states(self, states, ap):
+        r''' Label some states by an atomic proposition.
+
+        This method takes time proportional to the number of the states
+        labelled by :param ap: and it keeps the index of
+        :meth:`states_labelled_by` in sync. Whenever the Kripke structure
+        is a clone, the labels of the cloned structure are not modified
+        (see :meth:`clone`).
+
+        :param states: a container of states of the Kripke structure
+        :type states: a container
+        :param ap: an atomic proposition
+        :type ap: str
+        '''
+        states = frozenset(states)
+
+        L = self._labels
+        for s in states:
+            try:
+                APs = L._own(s)
+            except KeyError:
+                raise RuntimeError(('state=\'{}\' is '.format(s)) +
+                                   'not a state of this Kripke structure')
+
+            if ap not in APs:
+                L._will_change(s)
+                set.add(APs, ap)
+
+        if self._AP_index is not None and states:
+            if ap in self._AP_index:
+                states = self._AP_index[ap] | states
+
+            self._AP_index[ap] = states
+
+        self._labelling_changed()
+
     def __str__(self):
         r''' Return a string that represents a Kripke structure.
 
         :returns: a string that represents the Kripke
         :rtype: str
         '''
+        L = dict(self._labels._items_of(self.states()))
+
         return '(S={},S0={},R={},L={})'.format(self.states(),
                                                self.S0,
                                                list(self.transitions()),
-                                               self._labels)
+                                               L)
+
+
+class _LabelSet(set):
+    # the set of the atomic propositions labelling a state: every change
+    # is notified to the labelling function that contains it, which keeps
+    # its clones and the index of the Kripke structure up to date
+
+    __slots__ = ('_labelling', '_state')
+
+    def __init__(self, APs=(), labelling=None, state=None):
+        super(_LabelSet, self).__init__(APs)
+
+        self._labelling = labelling
+        self._state = state
+
+    def _owner(self):
+        # the labelling function, if this set still belongs to it
+        L = self._labelling
+        if L is not None and dict.get(L, self._state) is self:
+            return L
+
+        return None
+
+    def __repr__(self):
+        return repr(set(self))
+
+
+def _label_set_mutator(name):
+    method = getattr(set, name)
+
+    def mutator(self, *args):
+        L = self._owner()
+        if L is None:
+            return method(self, *args)
+
+        L._will_change(self._state)
+        try:
+            return method(self, *args)
+        finally:
+            L._changed()
+
+    mutator.__name__ = name
+
+    return mutator
+
+
+for name in ['add', 'discard', 'remove', 'pop', 'clear', 'update',
+             'difference_update', 'intersection_update',
+             'symmetric_difference_update', '__ior__', '__iand__',
+             '__isub__', '__ixor__']:
+    setattr(_LabelSet, name, _label_set_mutator(name))
+
+
+class _Labelling(dict):
+    # the labelling function of a Kripke structure: it maps states into
+    # _LabelSet objects and, whenever it belongs to a clone, it reads the
+    # labels of the states that it does not contain from the labelling
+    # function of the cloned structure, i.e., its base. Before changing
+    # the labels of a state, they are copied into the clones that read
+    # them from here
+
+    def __init__(self, kripke=None, base=None):
+        super(_Labelling, self).__init__()
+
+        self._kripke = None if kripke is None else weakref.ref(kripke)
+        self.base = base
+        self._clones = []
+
+        if base is not None:
+            base._clones.append(weakref.ref(self))
+
+    def __missing__(self, state):
+        if self.base is None:
+            raise KeyError(state)
+
+        return self.base[state]
+
+    def _store(self, state, APs):
+        APs = _LabelSet(APs, self, state)
+        dict.__setitem__(self, state, APs)
+
+        return APs
+
+    def _own(self, state):
+        # the label set of state stored here: it is copied from the base
+        # whenever it is missing, so that it can be changed
+        APs = dict.get(self, state)
+        if APs is None:
+            if self.base is None:
+                raise KeyError(state)
+
+            APs = self._store(state, self.base[state])
+
+        return APs
+
+    def _items_of(self, states):
+        for state in states:
+            try:
+                yield state, self[state]
+            except KeyError:
+                pass
+
+    def _will_change(self, state):
+        clones = []
+        for clone_ref in self._clones:
+            clone = clone_ref()
+            if clone is not None and clone.base is self:
+                clones.append(clone_ref)
+
+                if dict.get(clone, state) is None and state in self:
+                    clone._store(state, self[state])
+
+        self._clones = clones
+
+    def _changed(self):
+        kripke = None if self._kripke is None else self._kripke()
+        if kripke is not None:
+            kripke._AP_index = None
+            kripke._labelling_changed()
+
+    def __contains__(self, state):
+        if dict.__contains__(self, state):
+            return True
+
+        return self.base is not None and state in self.base
+
+    def __setitem__(self, state, APs):
+        self._will_change(state)
+        self._store(state, APs)
+        self._changed()
+
+    def __delitem__(self, state):
+        self._will_change(state)
+        dict.__delitem__(self, state)
+        self._changed()
+
+    def __ior__(self, other):
+        self.update(other)
+
+        return self
+
+    pop = MutableMapping.pop
+    popitem = MutableMapping.popitem
+    clear = MutableMapping.clear
+    update = MutableMapping.update
+    setdefault = MutableMapping.setdefault
+
+
+def _get_fairness_constraints(kripke, F):
+    # normalizes the fairness constraints into a non-empty list of sets
+    constraints = []
+    for P in F:
+        if not isinstance(P, (set, frozenset)):
+            try:
+                is_a_state = kripke.has_node(P)
+            except TypeError:
+                is_a_state = False
+
+            # a constraint is either a single state or a container of
+            # states: strings are states and they are never split
+            if is_a_state:
+                P = set([P])
+            else:
+                P = set(P)
+
+        constraints.append(P)
+
+    if not constraints:
+        # without constraints, every infinite path is fair
+        constraints.append(set(kripke.states()))
+
+    return constraints
+
+
+def get_fair_EG_states(kripke, states, F):
+    r''' Compute the states from which leaves a fair path in a set of states.
+
+    This function computes the states from which leaves a path that
+    remains in :param states: and visits every fairness constraint in
+    :param F: infinitely often by using the Emerson-Lei greatest fixpoint
+    ([el86]_)
+
+    .. math::
+
+        Z = \nu Z. states \land \bigwedge_{P \in F} EX\, E[Z\, U\,
+        (Z \land P)]
+
+    Neither the Kripke structure nor its labelling function are modified.
+
+    .. [el86] E. A. Emerson and C.-L. Lei. "Efficient model checking in
+       fragments of the propositional mu-calculus.", In Proc. of LICS,
+       267-278, (1986)
+
+    :param kripke: a Kripke structure
+    :type kripke: Kripke
+    :param states: a set of states
+    :type states: a container of states
+    :param F: a container of fairness constraints, i.e., of sets of
+              states
+    :type F: a container
+    :returns: the set of the states in :param states: from which leaves a
+              fair path that remains in :param states:
+    :rtype: set
+    '''
+    F = _get_fairness_constraints(kripke, F)
+
+    Z = set(states)
+    changed = True
+    while changed and Z:
+        changed = False
+        for P in F:
+            # the states in Z that reach a state in Z and P through Z
+            queue = [v for v in Z if v in P]
+            reached = set(queue)
+            while queue:
+                d = queue.pop()
+                for s in kripke.prev(d) & Z:
+                    if s not in reached:
+                        reached.add(s)
+                        queue.append(s)
+
+            # the states in Z having a successor in reached
+            new_Z = set()
+            for d in reached:
+                new_Z.update(kripke.prev(d) & Z)
+
+            if len(new_Z) < len(Z):
+                changed = True
+                Z = new_Z
+
+    return Z
+
+
+class KripkeView(DiGraphView):
+    r'''
+    A class to represent sub-structures of a Kripke structure without
+    copying them.
+
+    A KripkeView object filters the states of a Kripke structure on demand
+    and it shares the labelling function of the viewed structure.
+    '''
+
+    def __init__(self, K, nodes=None, predicate=None):
+        r''' Initialize a new KripkeView
+
+        :param K: the viewed Kripke structure
+        :type K: Kripke
+        :param nodes: either a container of states or None
+        :type nodes: a container
+        :param predicate: either a function that selects the states of the
+                          view or None
+        :type predicate: function
+        '''
+        if not isinstance(K, Kripke):
+            raise TypeError('expected a Kripke structure, got {}'.format(K))
+
+        super(KripkeView, self).__init__(K, nodes, predicate)
+
+    @property
+    def S0(self):
+        r''' The initial states of a KripkeView
+
+        :returns: the initial states of the viewed Kripke structure that are
+                  states of the view
+        :rtype: set
+        '''
+        return set([s for s in self._graph.S0 if self._in_mask(s)])
+
+    def states(self):
+        r''' Return the states of a KripkeView
+
+        :returns: a generator of the states of the KripkeView
+        :rtype: generator
+        '''
+        return self.nodes()
+
+    def labels(self, state=None):
+        r''' Get the atomic propositions
+
+        :param state: either a state of the KripkeView or None
+        :returns: the atomic propositions that label either a
+                  *state*, whenever a parameter *state* is passed, or
+                  at least one state of the KripkeView, otherwise
+        :rtype: set
+        '''
+        if state is not None:
+            if not self.has_node(state):
+                raise RuntimeError(('state=\'{}\' is '.format(state)) +
+                                   'not a state of this Kripke structure')
+            return self._graph.labels(state)
+
+        AP = set()
+        for s in self.states():
+            AP.update(self._graph.labels(s))
+
+        return AP
+
+    def transitions_iter(self):
+        r''' Return an interator of the edges of a KripkeView
+
+        :returns: an interator of the set of edges of the KripkeView
+        :rtype: iterator
+        '''
+        return self.edges_iter()
+
+    def transitions(self):
+        r''' Return the edges of a KripkeView
+
+        :returns: the list of edges of the KripkeView
+        :rtype: list
+        '''
+        return self.edges()
+
+
+class FrozenKripke(Kripke, FrozenDiGraph):
+    r'''
+    A class to represent Kripke structures whose transition relation is
+    stored in compressed sparse row form.
+
+    The transition relation of a FrozenKripke object cannot be modified,
+    while its initial states and labelling function can. FrozenKripke
+    objects are usually built by calling :meth:`Kripke.freeze`.
+    '''
+
+    def freeze(self):
+        r''' Build the compressed sparse row form of a Kripke structure
+
+        :returns: the FrozenKripke itself
+        :rtype: FrozenKripke
+        '''
+        return self
+
+    def _get_CSR_graph(self):
+        return self
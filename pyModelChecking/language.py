@@ -7,9 +7,53 @@
 
 import sys
 import inspect
+import weakref
 
 
-class Formula(object):
+class FormulaFactory(type):
+    r''' A metaclass that hash-conses formulas.
+
+    Every formula built by the classes of this metaclass is looked up in a
+    table of all the living formulas: if a formula having the same class
+    and the same subformulas has already been built, the existing object is
+    returned. Thus, structurally equal formulas are the same object and
+    shared subformulas are stored once. The hash of each formula is
+    computed once at creation time.
+    '''
+
+    formulas = weakref.WeakValueDictionary()
+
+    def __call__(cls, *args, **kwargs):
+        formula = super(FormulaFactory, cls).__call__(*args, **kwargs)
+
+        # subformulas are hash-consed themselves: their ids identify them
+        # as long as the parent formula, which refers them, is alive
+        key = (cls, getattr(formula, 'name', None),
+               getattr(formula, '_value', None),
+               tuple([id(sf) for sf in formula.subformulas()]))
+
+        interned = FormulaFactory.formulas.get(key)
+        if interned is not None:
+            return interned
+
+        # the hash of a leaf is that of its string, so that atomic
+        # propositions are found in sets of labels, while the hash of an
+        # internal node is built from those of its subformulas in constant
+        # time. Equal formulas of different languages (see
+        # :meth:`Formula.__eq__`) share class names and, thus, hashes
+        subformulas = formula.subformulas()
+        if subformulas:
+            formula._hash = hash((cls.__name__,
+                                  tuple([hash(sf) for sf in subformulas])))
+        else:
+            formula._hash = str(formula).__hash__()
+
+        FormulaFactory.formulas[key] = formula
+
+        return formula
+
+
+class Formula(object, metaclass=FormulaFactory):
     r''' A class to represent formulas.
 
     Formulas are represented as nodes in labelled trees: leaves are terminal
@@ -21,6 +65,10 @@ class Formula(object):
     sub-formula, i.e., :math:`p \lor True`. On the contrary, this last formula
     has two sub-formulas, i.e., :math:`p` and  :math:`True`, thus, the node
     representing it has two sons.
+
+    Formulas are immutable and hash-consed (see :class:`FormulaFactory`),
+    so labelled trees sharing subtrees are actually stored as directed
+    acyclic graphs.
     '''
 
     __desc__ = 'formula'
@@ -69,7 +117,8 @@ class Formula(object):
                         raise TypeError(err_msg(phi))
 
                 self._subformula.append(phi)
-                self.height = max(self.height, phi.height+1)
+
+            self.height = max(self.height, self._subformula[-1].height+1)
 
     def clone(self):
         r''' Clones a formula
@@ -105,11 +154,30 @@ class Formula(object):
         return Lang.Not(self)
 
     def __hash__(self):
-        return str(self).__hash__()
+        try:
+            return self._hash
+        except AttributeError:
+            return str(self).__hash__()
 
     def __eq__(self, other):
+        if self is other:
+            return True
+
+        # hash-consed formulas of the same class are equal if and only if
+        # they are the same object
+        if self.__class__ is other.__class__:
+            return False
+
+        if isinstance(other, Formula) and hash(self) != hash(other):
+            return False
+
         return str(self) == str(other)
 
+    def __reduce__(self):
+        # rebuild formulas through their classes to hash-cons them also
+        # when they are copied or unpickled
+        return (self.__class__, tuple(self.subformulas()))
+
     def __cmp__(self, other):
         self_str = str(self)
         other_str = str(other)
@@ -192,8 +260,10 @@ class Bool(Formula):
         '''
         return []
 
-    def __hash__(self):
-        return str(self).__hash__()
+    __hash__ = Formula.__hash__
+
+    def __reduce__(self):
+        return (self.__class__, (self._value,))
 
     def __eq__(self, other):
 
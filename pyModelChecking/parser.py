@@ -1,5 +1,11 @@
 from lark import Lark, Transformer, exceptions
 
+from .cache import LRUCache
+
+from importlib import import_module
+from itertools import islice
+from multiprocessing import Pool
+
 
 class AST_to_Logics(Transformer, object):
     r''' A class to transform AST into a propositional formula.
@@ -36,6 +42,9 @@ class ParserError(Exception):
     r''' A class to represent parser errors. '''
 
     def __init__(self, string, pos):
+        # the arguments are stored in args, so that errors can be pickled
+        super(ParserError, self).__init__(string, pos)
+
         self.string = string
         self.pos = pos
 
@@ -56,14 +65,37 @@ class UnexpectedCharacters(ParserError):
 class Parser(object):
     r''' A class to parse a propositional formula.
 
-    Every object of this class instanciates a Lark's parser to parse a
-    string reprensenting propositional formulas into the corresponding
-    pyModelChecking's formulas.
+    Every object of this class uses a Lark's parser to parse a string
+    reprensenting propositional formulas into the corresponding
+    pyModelChecking's formulas. Building a Lark's parser requires to
+    compute the LALR tables of the grammar, so the parsers are compiled
+    once per grammar, language and transformer and they are shared by all
+    the objects of this class. The formulas of the most recently parsed
+    strings are also shared in a cache of :attr:`Parser.cache_size`
+    entries: since formulas are hash-consed, the cached formulas are the
+    same objects that parsing would return.
     '''
 
+    cache_size = 2**14
+
+    _compiled = dict()
+
     def __init__(self, grammar, language, AST_Transformer):
-        self._parser = Lark(grammar, start='formula', parser='lalr',
-                            transformer=AST_Transformer(language))
+        key = (grammar, language, AST_Transformer)
+
+        self._key = (grammar, language.__name__, AST_Transformer)
+
+        compiled = Parser._compiled.get(key)
+        if compiled is None:
+            lark_parser = Lark(grammar, start='formula', parser='lalr',
+                               transformer=AST_Transformer(language))
+            cache = LRUCache(max_entries=self.cache_size,
+                             sizeof=(lambda formula: 0))
+
+            compiled = (lark_parser, cache)
+            Parser._compiled[key] = compiled
+
+        self._parser, self.cache = compiled
 
     def __call__(self, string):
         r''' Parses a string and returns the equivalent formula
@@ -77,13 +109,138 @@ class Parser(object):
         :raises: objects of either :py:exception:UnexpectedToken or
                  :py:exception:UnexpectedCharacters
         '''
+        formula = self.cache.get(string)
+        if formula is not None:
+            return formula
+
         try:
-            return self._parser.parse(string)
+            formula = self._parser.parse(string)
         except exceptions.UnexpectedToken as e:
             ex_class = UnexpectedToken
             pos = int(e.pos_in_stream)
         except exceptions.UnexpectedCharacters as e:
             ex_class = UnexpectedCharacters
             pos = int(e.pos_in_stream)
+        else:
+            self.cache[string] = formula
+
+            return formula
 
         raise ex_class(string, pos)
+
+    def parse_stream(self, source, processes=None, chunk_size=256):
+        r''' Lazily parse a stream of formulas, one per line.
+
+        Empty lines and lines starting by `#` are skipped. Parsing does not
+        stop on errors: the error is produced in place of the formula.
+        Formulas are hash-consed, so the subformulas shared by the parsed
+        formulas are represented by the same objects, even when parsing
+        is performed by a pool of processes.
+
+        :param source: either a path of a file or an iterable of strings,
+                       e.g., a file object
+        :type source: str or an iterable of str
+        :param processes: the number of processes parsing the stream or
+                          None to parse it in the current process
+        :type processes: int
+        :param chunk_size: the number of lines sent to a process at once
+        :type chunk_size: int
+        :returns: a generator of pairs whose first element is the line
+                  number, starting from 1, and whose second element is
+                  either the parsed formula or a :class:`ParserError`
+        :rtype: generator
+        '''
+        if isinstance(source, str):
+            with open(source) as source_file:
+                for parsed in self.parse_stream(source_file, processes,
+                                                chunk_size):
+                    yield parsed
+
+            return
+
+        lines = ((line_no, line.strip())
+                 for line_no, line in enumerate(source, 1))
+        lines = ((line_no, line) for line_no, line in lines
+                 if line and not line.startswith('#'))
+
+        if processes is None:
+            for line_no, line in lines:
+                yield _parse_line(self, line_no, line)
+
+            return
+
+        pool = Pool(processes, initializer=_init_worker, initargs=self._key)
+        try:
+            for parsed in pool.imap(_parse_in_worker, lines, chunk_size):
+                yield parsed
+        finally:
+            pool.terminate()
+
+
+def _parse_line(parser, line_no, line):
+    try:
+        return (line_no, parser(line))
+    except ParserError as e:
+        return (line_no, e)
+
+
+_worker_parser = None
+
+
+def _init_worker(grammar, language_name, AST_Transformer):
+    global _worker_parser
+
+    _worker_parser = Parser(grammar, import_module(language_name),
+                            AST_Transformer)
+
+
+def _parse_in_worker(line):
+    return _parse_line(_worker_parser, *line)
+
+
+def check_stream(parsed, check_batch, batch_size=1024):
+    r''' Model check a stream of parsed formulas in batches.
+
+    The formulas are collected in batches which are checked at once, so
+    that the subformulas shared by the formulas of a batch are evaluated
+    once. Whenever a batch cannot be checked because of a
+    :class:`TypeError`, its formulas are checked one by one and the
+    errors are produced in place of the results.
+
+    :param parsed: an iterable of pairs whose first element is a line
+                   number and whose second element is either a formula
+                   or an exception (see :meth:`Parser.parse_stream`)
+    :type parsed: an iterable of pairs
+    :param check_batch: a function that maps a list of formulas into the
+                        list of the results of model checking them
+    :type check_batch: function
+    :param batch_size: the maximum number of formulas in a batch
+    :type batch_size: int
+    :returns: a generator of pairs whose first element is the line number
+              and whose second element is either the result of model
+              checking the formula on that line or an exception
+    :rtype: generator
+    '''
+    parsed = iter(parsed)
+    while True:
+        batch = list(islice(parsed, batch_size))
+        if not batch:
+            return
+
+        valid = [formula for _, formula in batch
+                 if not isinstance(formula, Exception)]
+        try:
+            results = iter(check_batch(valid))
+        except TypeError:
+            results = None
+
+        for line_no, formula in batch:
+            if isinstance(formula, Exception):
+                yield (line_no, formula)
+            elif results is not None:
+                yield (line_no, next(results))
+            else:
+                try:
+                    yield (line_no, check_batch([formula])[0])
+                except TypeError as e:
+                    yield (line_no, e)
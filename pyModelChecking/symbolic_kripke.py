@@ -0,0 +1,569 @@
+"""
+.. module:: symbolic_kripke
+   :synopsis: A module to represent Kripke structures by using OBDDs
+
+.. moduleauthor:: Alberto Casagrande <acasagrande@units.it>
+"""
+
+from .BDD import BDDNode
+from .BDD import OBDD
+from .BDD.BDD import BDDTerminalNode
+from .BDD.ordering import cmp_to_key
+from .BDD.heuristics import (split_support, support, interleave,
+                             dfs_ordering, force_ordering)
+
+import pyModelChecking.kripke
+
+from .__init__ import __release__
+
+import sys
+
+# the module is accessed lazily because pyModelChecking.kripke and this
+# module are both imported while initializing the package
+kripke_module = sys.modules['pyModelChecking.kripke']
+
+
+def _build_BDD(valuations, variables, level=0):
+    if not valuations:
+        return BDDNode(False)
+
+    if level == len(variables):
+        return BDDNode(True)
+
+    low = _build_BDD([v for v in valuations if not v[level]],
+                     variables, level+1)
+    high = _build_BDD([v for v in valuations if v[level]],
+                      variables, level+1)
+
+    return BDDNode(variables[level], low, high)
+
+
+def _valuations(bdd, variables, level=0, prefix=()):
+    if bdd is BDDNode(False):
+        return
+
+    if level == len(variables):
+        yield prefix
+        return
+
+    if (isinstance(bdd, BDDTerminalNode) or bdd.var != variables[level]):
+        sons = (bdd, bdd)
+    else:
+        sons = (bdd.low, bdd.high)
+
+    for value in range(2):
+        for valuation in _valuations(sons[value], variables, level+1,
+                                     prefix+(bool(value),)):
+            yield valuation
+
+
+def _sorting_permutation(ordering, variables):
+    # the indices of the variables sorted according to the ordering. The
+    # ordering may differ from the one in which the structure has been
+    # built because the variables of OBDDs may be reordered in place
+    return sorted(range(len(variables)),
+                  key=cmp_to_key(lambda i, j: ordering.cmp(variables[i],
+                                                           variables[j])))
+
+
+def _formula_supports(formula, labels):
+    # the supports of the subformulas: an atomic proposition depends on the
+    # state variables of its label or, if it is not a label, on the homonym
+    # state variable
+    if isinstance(formula, str):
+        import pyModelChecking.CTLS
+
+        formula = pyModelChecking.CTLS.Parser()(formula)
+
+    supports = dict()
+    stack = [formula]
+    while stack:
+        phi = stack[-1]
+        if phi in supports:
+            stack.pop()
+            continue
+
+        subformulas = phi.subformulas()
+        missing = [sf for sf in subformulas if sf not in supports]
+        if missing:
+            stack.extend(missing)
+            continue
+
+        stack.pop()
+        if not subformulas and hasattr(phi, 'name'):
+            supports[phi] = labels.get(phi.name, set([phi.name]))
+        else:
+            supports[phi] = set()
+            for sf in subformulas:
+                supports[phi].update(supports[sf])
+
+    return [sup for sup in supports.values() if sup]
+
+
+class SymbolicKripke(object):
+    r'''
+    A class to represent Kripke structures by using OBDDs.
+
+    The states of a symbolic Kripke structure are the valuations of a list
+    of Boolean variables, the *state variables*. For every state variable
+    :math:`x`, the variable :math:`x\_next` represents the value of
+    :math:`x` in the next state. The set of states, the set of initial
+    states and the sets of states labelled by the atomic propositions are
+    OBDDs over the state variables, while the transition relation is an OBDD
+    over both the state variables and the next state variables. All these
+    OBDDs share the same ordering which interleaves the state variables
+    and the next state variables. The state variables are ordered as
+    they are declared, unless a static ordering heuristic is selected (see
+    :meth:`SymbolicKripke.static_ordering`).
+    '''
+
+    next_suffix = '_next'
+
+    ordering_heuristics = {'dfs': dfs_ordering, 'force': force_ordering}
+
+    def __init__(self, variables, S0, R, L=None, S=True, ordering=None,
+                 formulas=()):
+        r''' Initialize a new symbolic Kripke structure
+
+        :param variables: a list of state variables
+        :type variables: list of str
+        :param S0: the set of initial states
+        :type S0: OBDD, str, or bool
+        :param R: the transition relation
+        :type R: OBDD, str, or bool
+        :param L: a map from atomic propositions to the set of states in
+                  which they hold. If it is None, every state variable is
+                  also an atomic proposition holding whenever the variable
+                  is true
+        :type L: dict
+        :param S: the set of states
+        :type S: OBDD, str, or bool
+        :param ordering: either None to order the state variables as in
+                         :param variables:, a permutation of
+                         :param variables:, or the name of a static
+                         ordering heuristic (see
+                         :meth:`SymbolicKripke.static_ordering`)
+        :type ordering: None, list of str, or str
+        :param formulas: a container of the formulas to be checked on the
+                         structure, which are used by the static ordering
+                         heuristics
+        :type formulas: a container of Formulas or strs
+        '''
+        if isinstance(ordering, str):
+            ordering = self.static_ordering(variables, S0, R, L, S,
+                                            formulas, method=ordering)
+
+        self._init_variables(variables, ordering)
+
+        self.S = self.get_OBDD(S)
+        self.S0 = self.get_OBDD(S0) & self.S
+        self.R = self.get_OBDD(R)
+
+        if L is None:
+            L = dict([(var, var) for var in self.variables])
+
+        self.replace_labelling_function(L)
+
+        self._code = None
+        self._states = None
+
+        pots = self.S & ~self.pre(True)
+        if pots.root is not BDDNode(False):
+            raise RuntimeError('R=\'{}\' '.format(R) +
+                               'is supposed be total (see Kripke ' +
+                               'definition at ' +
+                               'https://pymodelchecking.readthedocs.io/en/' +
+                               'v'+__release__ +
+                               '/models.html#kripke-structures), ' +
+                               'but it does not contains as sources ' +
+                               'the states {}'.format(pots))
+
+    @classmethod
+    def static_ordering(cls, variables, S0, R, L=None, S=True, formulas=(),
+                        method='force'):
+        r''' Compute an ordering of the state variables before building OBDDs.
+
+        The supports of the initial states, of the set of states, of the
+        operands of the transition relation, of the labels and of the
+        subformulas of :param formulas: are collected, identifying every
+        next state variable with the corresponding state variable, and
+        they are ordered by the selected heuristic: either `'force'` (see
+        :func:`BDD.heuristics.force_ordering`) or `'dfs'` (see
+        :func:`BDD.heuristics.dfs_ordering`).
+
+        :param variables: a list of state variables
+        :type variables: list of str
+        :param S0: the set of initial states
+        :type S0: OBDD, str, or bool
+        :param R: the transition relation
+        :type R: OBDD, str, or bool
+        :param L: a map from atomic propositions to the set of states in
+                  which they hold
+        :type L: dict
+        :param S: the set of states
+        :type S: OBDD, str, or bool
+        :param formulas: a container of formulas
+        :type formulas: a container of Formulas or strs
+        :param method: the name of the heuristic
+        :type method: str
+        :returns: an ordering of the state variables
+        :rtype: list of str
+        '''
+        if method not in cls.ordering_heuristics:
+            raise ValueError('unsupported ordering heuristic ' +
+                             '{}'.format(method))
+
+        to_current = dict([(var+cls.next_suffix, var) for var in variables])
+        if L is None:
+            L = dict()
+
+        def state_supports(bfunct):
+            return [set([to_current.get(var, var) for var in sup])
+                    for sup in split_support(bfunct)]
+
+        supports = state_supports(S0) + state_supports(S) + state_supports(R)
+
+        labels = dict([(AP, support(states)) for AP, states in L.items()])
+        for states in L.values():
+            supports.extend(state_supports(states))
+
+        for formula in formulas:
+            supports.extend(_formula_supports(formula, labels))
+
+        # the names that are not state variables, e.g., the atomic
+        # propositions that do not label any state, are neglected
+        supports = [sup & set(variables) for sup in supports]
+
+        heuristic = cls.ordering_heuristics[method]
+
+        return heuristic(supports, list(variables)).get_list()
+
+    def _init_variables(self, variables, ordering=None):
+        self.variables = list(variables)
+        self.next_variables = [var+self.next_suffix for var in variables]
+
+        if ordering is None:
+            ordering = self.variables
+        elif sorted(ordering) != sorted(self.variables):
+            raise RuntimeError('{} is not a permutation '.format(ordering) +
+                               'of {}'.format(self.variables))
+
+        self.ordering = interleave(ordering, self.next_suffix)
+
+        self._to_next = dict(zip(self.variables, self.next_variables))
+        self._to_current = dict(zip(self.next_variables, self.variables))
+
+    def get_OBDD(self, bfunct):
+        r''' Return an OBDD respecting the ordering of the structure.
+
+        :param bfunct: either an OBDD, a string representing a binary
+                       expression, or a Boolean value
+        :type bfunct: OBDD, str, or bool
+        :returns: the OBDD representing :param bfunct: and respecting the
+                  ordering of the structure
+        :rtype: OBDD
+        '''
+        if isinstance(bfunct, OBDD):
+            if bfunct.ordering != self.ordering:
+                raise RuntimeError('{} does not respect '.format(bfunct) +
+                                   'the ordering {}'.format(self.ordering))
+
+            return bfunct
+
+        if isinstance(bfunct, bool):
+            return OBDD(BDDNode(bfunct), self.ordering)
+
+        if isinstance(bfunct, str):
+            return OBDD(bfunct, self.ordering)
+
+        raise TypeError('expected an OBDD, a str, or a bool, ' +
+                        'got {}'.format(bfunct))
+
+    def labelling_function(self):
+        r''' Return the labelling function.
+
+        :returns: the labelling function
+        :rtype: dict
+        '''
+        return self._labels
+
+    def replace_labelling_function(self, L):
+        r''' Replace the labelling function.
+
+        :param L: a map from atomic propositions to the set of states in
+                  which they hold
+        :type L: dict
+        '''
+        self._labels = dict([(AP, self.get_OBDD(states) & self.S)
+                             for AP, states in L.items()])
+
+    def labels(self):
+        r''' Return the atomic propositions of the structure.
+
+        :returns: the set of the atomic propositions of the structure
+        :rtype: set
+        '''
+        return set(self._labels.keys())
+
+    def states(self):
+        r''' Return the set of states.
+
+        :returns: the set of states of the structure
+        :rtype: OBDD
+        '''
+        return self.S
+
+    def states_labelled_by(self, AP):
+        r''' Return the set of states labelled by an atomic proposition.
+
+        :param AP: an atomic proposition
+        :type AP: str
+        :returns: the set of states labelled by :param AP:
+        :rtype: OBDD
+        '''
+        if AP in self._labels:
+            return self._labels[AP]
+
+        return self.get_OBDD(False)
+
+    def pre(self, P):
+        r''' Compute the existential pre-image of a set of states.
+
+        :param P: a set of states
+        :type P: OBDD, str, or bool
+        :returns: the set of states having a successor in :param P:, i.e.,
+                  :math:`S \land \exists x'.(R \land P[x/x'])`
+        :rtype: OBDD
+        '''
+        next_P = self.get_OBDD(P).rename(self._to_next)
+
+        return self.R.and_exists(next_P, self.next_variables) & self.S
+
+    def post(self, P):
+        r''' Compute the image of a set of states.
+
+        :param P: a set of states
+        :type P: OBDD, str, or bool
+        :returns: the set of the successors of the states in :param P:,
+                  i.e., :math:`(\exists x.(R \land P))[x'/x]`
+        :rtype: OBDD
+        '''
+        next_Q = self.R.and_exists(self.get_OBDD(P), self.variables)
+
+        return next_Q.rename(self._to_current) & self.S
+
+    def get_reachable_states(self):
+        r''' Compute the set of states reachable from the initial states.
+
+        :returns: the set of states reachable from the initial states
+        :rtype: OBDD
+        '''
+        reached = self.S0
+        frontier = reached
+        while frontier.root is not BDDNode(False):
+            frontier = self.post(frontier) & ~reached
+            reached = reached | frontier
+
+        return reached
+
+    def get_fair_states(self, F, P=True):
+        r''' Return the set of states from which leaves a fair path.
+
+        The set is computed by using Emerson-Lei algorithm, i.e., as the
+        greatest fixpoint of the equation
+        :math:`Z = P \land \bigwedge_{Q \in F} EX(E[P U (Z \land Q)])`.
+
+        :param F: a container of fairness constraints
+        :type F: a container of OBDDs, strs, or bools
+        :param P: a set of states
+        :type P: OBDD, str, or bool
+        :returns: the set of states from which leaves a fair path whose
+                  states all belong to :param P:
+        :rtype: OBDD
+        '''
+        F = [self.get_OBDD(Q) for Q in F]
+        P = self.get_OBDD(P) & self.S
+
+        if not F:
+            # without constraints, every infinite path is fair
+            F = [self.S]
+
+        Z = P
+        old_root = None
+        while Z.root is not old_root:
+            old_root = Z.root
+            for Q in F:
+                reach = Z & Q
+                frontier = reach
+                while frontier.root is not BDDNode(False):
+                    frontier = P & self.pre(frontier) & ~reach
+                    reach = reach | frontier
+
+                Z = Z & self.pre(reach)
+
+        return Z
+
+    def label_fair_states(self, F):
+        r''' Label all the fair states by a new atomic proposition.
+
+        This method labels all the states from which a fair path exists by
+        using a new atomic proposition that means "there exists a fair path
+        from here". The new label is returned.
+
+        :param F: a container of fairness constraints
+        :type F: a container of OBDDs, strs, or bools
+        :returns: a new label that means "there exists a fair path from here"
+        :rtype: str
+        '''
+        i = 0
+        f_label = 'fair'
+        while f_label in self._labels:
+            f_label = 'fair{}'.format(i)
+            i += 1
+
+        self._labels[f_label] = self.get_fair_states(F)
+
+        return f_label
+
+    def get_states_in(self, P):
+        r''' Enumerate the states in a set.
+
+        :param P: a set of states
+        :type P: OBDD, str, or bool
+        :returns: the set of the states in :param P:. If the structure
+                  has been built by :meth:`SymbolicKripke.from_kripke`,
+                  the states of the original Kripke structure are returned.
+                  Otherwise, every state is a tuple of Boolean values, one
+                  for each state variable
+        :rtype: set
+        '''
+        P = self.get_OBDD(P) & self.S
+
+        permutation = _sorting_permutation(self.ordering, self.variables)
+        variables = [self.variables[i] for i in permutation]
+
+        valuations = []
+        for sorted_valuation in _valuations(P.root, variables):
+            valuation = [None] * len(variables)
+            for i, value in zip(permutation, sorted_valuation):
+                valuation[i] = value
+
+            valuations.append(tuple(valuation))
+
+        if self._states is None:
+            return set(valuations)
+
+        return set([self._states[valuation] for valuation in valuations])
+
+    def count_states_in(self, P):
+        r''' Count the states in a set.
+
+        The states are counted symbolically (see :meth:`OBDD.satcount`),
+        so that they are never enumerated.
+
+        :param P: a set of states
+        :type P: OBDD, str, or bool
+        :returns: the number of the states in :param P:
+        :rtype: int
+        '''
+        return (self.get_OBDD(P) & self.S).satcount(self.variables)
+
+    def encode(self, states):
+        r''' Encode a set of states of the original Kripke structure.
+
+        :param states: a container of states of the Kripke structure from
+                       which the current object has been built by
+                       :meth:`SymbolicKripke.from_kripke`
+        :type states: a container
+        :returns: the OBDD representing :param states:
+        :rtype: OBDD
+        '''
+        if self._code is None:
+            raise RuntimeError('{} has not been built '.format(self) +
+                               'from a Kripke structure')
+
+        try:
+            codes = [self._code[s] for s in states]
+        except KeyError as e:
+            raise RuntimeError('{} is not a state'.format(e.args[0]))
+
+        permutation = _sorting_permutation(self.ordering, self.variables)
+        variables = [self.variables[i] for i in permutation]
+        codes = [tuple([code[i] for i in permutation]) for code in codes]
+
+        bdd = _build_BDD(codes, variables)
+
+        return OBDD(bdd, self.ordering, check_ordering=False)
+
+    def clone(self):
+        r''' Clone a symbolic Kripke structure.
+
+        :returns: a clone of the current symbolic Kripke structure
+        :rtype: SymbolicKripke
+        '''
+        nK = self.__class__.__new__(self.__class__)
+        nK.__dict__.update(self.__dict__)
+        nK._labels = dict(self._labels)
+
+        return nK
+
+    @classmethod
+    def from_kripke(cls, kripke, prefix='s'):
+        r''' Build a symbolic representation of a Kripke structure.
+
+        The states of :param kripke: are binary encoded by using
+        :math:`\lceil \log_2 |S| \rceil` state variables.
+
+        :param kripke: a Kripke structure
+        :type kripke: Kripke
+        :param prefix: the prefix of the state variable names
+        :type prefix: str
+        :returns: a symbolic Kripke structure equivalent to :param kripke:
+        :rtype: SymbolicKripke
+        '''
+        if not isinstance(kripke, kripke_module.Kripke):
+            raise TypeError('expected a Kripke structure, ' +
+                            'got {}'.format(kripke))
+
+        states = list(kripke.states())
+        size = max(1, (len(states)-1).bit_length())
+
+        variables = ['{}{}'.format(prefix, i) for i in range(size)]
+
+        code = dict()
+        for i, state in enumerate(states):
+            code[state] = tuple([bool((i >> j) & 1) for j in range(size)])
+
+        def interleave(src, dst):
+            return tuple([b for pair in zip(code[src], code[dst])
+                          for b in pair])
+
+        K = cls.__new__(cls)
+        K._init_variables(variables)
+
+        K._code = code
+
+        K.S = K.encode(states)
+        K.S0 = K.encode(kripke.S0)
+
+        edges = [interleave(src, dst) for (src, dst)
+                 in kripke.transitions_iter()]
+        K.R = OBDD(_build_BDD(edges, K.ordering.get_list()), K.ordering,
+                   check_ordering=False)
+
+        K._labels = dict()
+        for AP in kripke.labels():
+            K._labels[AP] = K.encode(kripke.states_labelled_by(AP))
+
+        K._states = dict([(c, s) for s, c in code.items()])
+
+        return K
+
+    def __str__(self):
+        r''' Return a string that represents a symbolic Kripke structure.
+
+        :returns: a string that represents the symbolic Kripke structure
+        :rtype: str
+        '''
+        return ('(S={}, S0={}, R={}, L={})'.format(self.S, self.S0, self.R,
+                                                   self._labels))
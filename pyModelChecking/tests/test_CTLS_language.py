@@ -1,5 +1,7 @@
 from pyModelChecking.CTLS import *
+import pyModelChecking.CTL as CTL
 import unittest
+import pickle
 
 
 def formula_into_str(phi):
@@ -136,6 +138,34 @@ class TestFormulas(unittest.TestCase):
                       psi.get_equivalent_restricted_formula()))
         self.generic_test_binaryop(Imply, '-->', formula)
 
+    def test_hash_consing(self):
+        for phi in self.formulas[2:]:
+            psi = phi.clone()
+            self.assertIs(phi, psi)
+            self.assertIs(pickle.loads(pickle.dumps(phi)), phi)
+
+        phi = A(G(Imply('p', E(F('q')))))
+        self.assertIs(phi, A(G(Imply(AtomicProposition('p'), E(F('q'))))))
+        self.assertIs(phi.subformula(0).subformula(0).subformula(1),
+                      E(F('q')))
+
+        self.assertIsNot(And('p', 'q'), And('q', 'p'))
+        self.assertNotEqual(And('p', 'q'), And('q', 'p'))
+
+        for phi, psi in [(AtomicProposition('p'), CTL.AtomicProposition('p')),
+                         (Or('p', 'q'), CTL.Or('p', 'q'))]:
+            self.assertIsNot(phi, psi)
+            self.assertEqual(phi, psi)
+            self.assertEqual(hash(phi), hash(psi))
+
+        self.assertIn(AtomicProposition('p'), set(['p']))
+
+        phi, psi = AtomicProposition('p'), CTL.AtomicProposition('p')
+        for i in range(200):
+            phi, psi = And(phi, 'q{}'.format(i)), CTL.And(psi, 'q{}'.format(i))
+        self.assertEqual(hash(phi), hash(psi))
+        self.assertEqual(phi, psi)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,6 +1,9 @@
 from pyModelChecking import Kripke
 from pyModelChecking.CTLS import *
 
+import pyModelChecking.CTL as CTL
+
+import random
 import unittest
 
 
@@ -28,7 +31,7 @@ class TestCTLSModelChecking(unittest.TestCase):
                           [('A G (Start --> A F Heat) ', set(), None),
                            (A(G(Imply(And(Not('Close'), 'Start'),
                                       A(Or(G(Not('Heat')), F(Not('Error'))))))
-                              ), set(), set([6]))])]
+                              ), set([0, 1, 2, 3, 4, 5, 6]), set([6]))])]
 
     def test_modelchecking(self):
         for kripke, instances in self.problems:
@@ -37,6 +40,87 @@ class TestCTLSModelChecking(unittest.TestCase):
 
                 self.assertEqual(set(S), solution)
 
+    def test_fair_CTL_formulas(self):
+        K = Kripke(R=[(0, 0), (0, 1), (1, 1)],
+                   L={0: set(), 1: set(['p', 'q'])}, S0=[0])
+        self.assertEqual(modelcheck(K, 'A F q', F=[set([1])]), set([0, 1]))
+
+        # CTL formulas have the same fair semantics in CTL and in CTL*
+        random.seed(0)
+        formulas = ['p', 'E X p', 'A F q', 'E G p', 'A (p U q)',
+                    'A G (p --> E F q)', 'not A F (q and E X p)']
+        for i in range(30):
+            R = [(s, random.randrange(6)) for s in range(6)]
+            R += [(random.randrange(6), random.randrange(6))
+                  for j in range(6)]
+            L = dict([(s, set([ap for ap in 'pq' if random.random() < 0.5]))
+                      for s in range(6)])
+            K = Kripke(R=R, L=L)
+
+            F = [set(random.sample(range(6), random.randint(1, 3)))
+                 for j in range(random.randint(0, 2))]
+            for formula in formulas:
+                self.assertEqual(set(modelcheck(K, formula, F=F)),
+                                 set(CTL.modelcheck(K, formula, F=F)))
+
+    def test_modelcheck_many(self):
+        for kripke, instances in self.problems:
+            for formula, solution, Fconstraints in instances:
+                formulas = [formula, formula]
+                S, stats = modelcheck_many(kripke, formulas, F=Fconstraints)
+
+                self.assertEqual(S, [solution, solution])
+                self.assertEqual(stats['formulas'], 2)
+                self.assertGreater(stats['shared'], 0)
+
+
+    def test_local_modelchecking(self):
+        for kripke, instances in self.problems:
+            for formula, solution, Fconstraints in instances:
+                verdict, state = modelcheck(kripke, formula, F=Fconstraints,
+                                            local=True)
+
+                self.assertEqual(verdict, kripke.S0 <= solution)
+                if verdict:
+                    self.assertEqual(state, None)
+                else:
+                    self.assertIn(state, kripke.S0 - solution)
+
+    def test_fair_local_modelchecking(self):
+        # a local verdict holds iff every initial state is in the global
+        # result under the same fairness constraints
+        def check(K, formula, F):
+            S = set(modelcheck(K, formula, F=F))
+            verdict, state = modelcheck(K, formula, F=F, local=True)
+
+            self.assertEqual(verdict, K.S0 <= S)
+            if verdict:
+                self.assertEqual(state, None)
+            else:
+                self.assertIn(state, K.S0 - S)
+
+        K = Kripke(R=[(0, 0), (0, 1), (1, 1)],
+                   L={0: set(), 1: set(['p', 'q'])}, S0=[0])
+        self.assertEqual(modelcheck(K, 'A F q', F=[set([1])], local=True),
+                         (True, None))
+        self.assertEqual(modelcheck(K, 'A G F q', F=[set([0])], local=True),
+                         (False, 0))
+
+        random.seed(1)
+        formulas = ['A F q', 'E G p', 'A G F q', 'A F G p',
+                    'E (F q and G p)', 'A G (p --> F q)']
+        for i in range(30):
+            R = [(s, random.randrange(6)) for s in range(6)]
+            R += [(random.randrange(6), random.randrange(6))
+                  for j in range(6)]
+            L = dict([(s, set([ap for ap in 'pq' if random.random() < 0.5]))
+                      for s in range(6)])
+            K = Kripke(R=R, L=L, S0=random.sample(range(6), 2))
+
+            F = [set(random.sample(range(6), random.randint(1, 3)))
+                 for j in range(random.randint(0, 2))]
+            for formula in formulas:
+                check(K, formula, F)
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,6 +1,8 @@
-from pyModelChecking import Kripke
+from pyModelChecking import Kripke, SymbolicKripke
 from pyModelChecking.CTL import *
+from pyModelChecking.parser import UnexpectedToken
 
+import random
 import unittest
 
 
@@ -40,7 +42,19 @@ class TestCTLModelChecking(unittest.TestCase):
                             [set([5, 6])])]),
                          (Kripke(R  = [(0, 1), (1, 1)],
                                  L  = {0: set(), 1: set('p')}),
-                          [(A(R(Bool(True), 'p')), set([1]), None)])]
+                          [(A(R(Bool(True), 'p')), set([1]), None)]),
+                         (Kripke(R=[(0, 0), (0, 1), (1, 1), (1, 2), (2, 1),
+                                    (2, 3), (3, 3)],
+                                 L={0: set(['p']), 1: set(['p']),
+                                    2: set(['p']), 3: set(['p'])}),
+                          [(EG('p'), set([0, 1, 2, 3]), None),
+                           (EG('p'), set([0]), [set([0])]),
+                           (EG('p'), set([0, 1, 2]), [set([1]), set([2])]),
+                           (EG(Not(And('p', EX('p')))), set([]),
+                            [set([1])]),
+                           (EX('p'), set([0, 1, 2]), [set([1]), set([2])]),
+                           (EF(Not('p')), set([]), [set([1])]),
+                           (AF(Not('p')), set([3]), [set([1]), set([2])])])]
 
     def test_modelchecking(self):
         for kripke, instances in self.problems:
@@ -49,6 +63,220 @@ class TestCTLModelChecking(unittest.TestCase):
 
                 self.assertEqual(set(S), solution)
 
+    def test_modelcheck_many(self):
+        for kripke, instances in self.problems:
+            for formula, solution, Fconstraints in instances:
+                formulas = [formula, formula]
+                S, stats = modelcheck_many(kripke, formulas, F=Fconstraints)
+
+                self.assertEqual(S, [solution, solution])
+                self.assertEqual(stats['formulas'], 2)
+                self.assertGreater(stats['shared'], 0)
+
+    def test_modelcheck_many_engines(self):
+        for kripke, instances in self.problems:
+            for formula, solution, Fconstraints in instances:
+                for options in [{'bitset': True}, {'symbolic': True}]:
+                    S, stats = modelcheck_many(kripke, [formula, formula],
+                                               F=Fconstraints, **options)
+
+                    self.assertEqual(S, [solution, solution])
+
+                    # Boolean constants are not stored by these engines
+                    if stats['subformulas']:
+                        self.assertGreater(stats['shared'], 0)
+
+        # the results are read from and stored into the result cache
+        kripke, instances = self.problems[0]
+        formula, solution, Fconstraints = instances[0]
+        kripke = kripke.clone()
+        cache = kripke.enable_result_cache()
+        S = modelcheck(kripke, formula, F=Fconstraints)
+        for options in [{}, {'bitset': True}, {'symbolic': True}]:
+            cache_size = len(cache)
+            R, stats = modelcheck_many(kripke, [formula, 'E X p'],
+                                       F=Fconstraints, **options)
+
+            self.assertIs(R[0], S)
+            self.assertIsInstance(R[1], frozenset)
+            self.assertEqual(R[1], modelcheck(self.problems[0][0], 'E X p',
+                                              F=Fconstraints))
+            self.assertEqual(stats['cached'], 2 if options else 1)
+            self.assertEqual(len(cache), max(cache_size, 2))
+
+    def test_modelcheck_stream(self):
+        kripke = self.problems[0][0]
+        lines = ['# a comment', 'E F q', '', 'p and', 'A G p',
+                 'E F q', 'G p']
+
+        results = list(modelcheck_stream(kripke, lines, batch_size=2))
+        self.assertEqual([line_no for line_no, _ in results],
+                         [2, 4, 5, 6, 7])
+        self.assertEqual(results[0][1], set([0, 1, 2]))
+        self.assertIsInstance(results[1][1], UnexpectedToken)
+        self.assertEqual(results[2][1], set())
+        self.assertEqual(results[3][1], set([0, 1, 2]))
+        self.assertIsInstance(results[4][1], TypeError)
+
+        def outcomes(results):
+            return [(line_no, result.__class__ if isinstance(result,
+                                                             Exception)
+                     else result) for line_no, result in results]
+
+        self.assertEqual(outcomes(modelcheck_stream(kripke, lines,
+                                                    processes=2)),
+                         outcomes(results))
+
+    def test_local_modelchecking(self):
+        for kripke, instances in self.problems:
+            for formula, solution, Fconstraints in instances:
+                verdict, state = modelcheck(kripke, formula, F=Fconstraints,
+                                            local=True)
+
+                self.assertEqual(verdict, kripke.S0 <= solution)
+                if verdict:
+                    self.assertEqual(state, None)
+                else:
+                    self.assertIn(state, kripke.S0 - solution)
+
+    def test_fair_local_modelchecking(self):
+        random.seed(2)
+        formulas = ['E G p', 'A F q', 'E X (p and E G q)', 'A G E F p',
+                    'not E (p U q)']
+        for i in range(30):
+            # states 6 and 7 are never reached from the initial states
+            R = [(s, random.randrange(6)) for s in range(6)]
+            R += [(random.randrange(6), random.randrange(6))
+                  for j in range(6)]
+            R += [(6, 7), (7, 6), (7, 0)]
+            L = dict([(s, set([ap for ap in 'pq' if random.random() < 0.5]))
+                      for s in range(8)])
+            K = Kripke(R=R, L=L, S0=random.sample(range(6), 2))
+            reachable = K.get_reachable_set_from(K.S0)
+
+            F = [set(random.sample(range(8), random.randint(1, 4)))
+                 for j in range(random.randint(1, 2))]
+            for formula in formulas:
+                S = set(modelcheck(K, formula, F=F))
+                for options in [{}, {'bitset': True}, {'symbolic': True}]:
+                    verdict, state = modelcheck(K, formula, F=F, local=True,
+                                                **options)
+
+                    self.assertEqual(verdict, K.S0 <= S)
+                    if verdict:
+                        self.assertEqual(state, None)
+                    else:
+                        self.assertIn(state, K.S0 - S)
+
+                # the formula holds on the states reachable from S0 as it
+                # holds on the sub-structure of the reachable states
+                sub = K.get_substructure(reachable)
+                self.assertEqual(S & reachable,
+                                 set(modelcheck(sub, formula,
+                                                F=[P & reachable
+                                                   for P in F])))
+
+    def test_bitset_modelchecking(self):
+        for kripke, instances in self.problems:
+            for formula, solution, Fconstraints in instances:
+                for K in [kripke, kripke.freeze()]:
+                    S = modelcheck(K, formula, F=Fconstraints, bitset=True)
+
+                    self.assertEqual(set(S), solution)
+
+        # the CSR form is built once and rebuilt when the transitions change
+        K = Kripke(R=[(0, 1), (1, 1), (2, 2)], L={1: set(['p'])})
+        self.assertEqual(modelcheck(K, 'E X p', bitset=True), set([0, 1]))
+        graph = K._get_CSR_graph()
+        self.assertEqual(modelcheck(K, 'E F p', bitset=True), set([0, 1]))
+        self.assertIs(K._get_CSR_graph(), graph)
+
+        K.add_edge(2, 0)
+        self.assertIsNot(K._get_CSR_graph(), graph)
+        self.assertEqual(modelcheck(K, 'E F p', bitset=True),
+                         set([0, 1, 2]))
+
+    def test_fairness_constraints(self):
+        K = Kripke(R=[('s0', 's0'), ('s0', 's1'), ('s1', 's1')])
+
+        # a constraint is either a set of states or a single state
+        for F, solution in [(['s1'], set(['s0', 's1'])),
+                            ([set(['s1'])], set(['s0', 's1'])),
+                            (['s0'], set(['s0'])),
+                            ([['s0', 's1']], set(['s0', 's1']))]:
+            for bitset, symbolic in [(False, False), (True, False),
+                                     (False, True)]:
+                S = modelcheck(K, 'E G true', F=F, bitset=bitset,
+                               symbolic=symbolic)
+
+                self.assertEqual(set(S), solution)
+
+        with self.assertRaises(TypeError):
+            modelcheck(K, 'E G true', F=[3])
+
+    def test_EG_algorithms(self):
+        import pyModelChecking.CTL.model_checking as set_engine
+        import pyModelChecking.CTL.bitset_model_checking as bitset_engine
+
+        random.seed(0)
+        problems = []
+        for i in range(20):
+            R = [(s, random.randrange(30)) for s in range(30)]
+            R += [(random.randrange(30), random.randrange(30))
+                  for j in range(30)]
+            L = dict([(s, set(['p']) if random.random() < 0.6 else set())
+                      for s in range(30)])
+
+            problems.append(Kripke(R=R, L=L))
+
+        for engine in [set_engine, bitset_engine]:
+            ratio = engine._EG_SCC_RATIO
+            try:
+                for kripke in problems:
+                    results = []
+
+                    # the SCC and the fixpoint algorithms are forced
+                    for forced_ratio in [-1, float('inf')]:
+                        engine._EG_SCC_RATIO = forced_ratio
+                        results.append(modelcheck(
+                            kripke, 'E G p',
+                            bitset=(engine is bitset_engine)))
+
+                    self.assertEqual(set(results[0]), set(results[1]))
+            finally:
+                engine._EG_SCC_RATIO = ratio
+
+    def test_parallel_SCCs(self):
+        from pyModelChecking.graph import (enable_parallel_SCCs,
+                                           disable_parallel_SCCs)
+
+        try:
+            enable_parallel_SCCs(processes=2, threshold=0)
+            for kripke, instances in self.problems:
+                for formula, solution, Fconstraints in instances:
+                    for bitset in [False, True]:
+                        S = modelcheck(kripke, formula, F=Fconstraints,
+                                       bitset=bitset)
+
+                        self.assertEqual(set(S), solution)
+        finally:
+            disable_parallel_SCCs()
+
+    def test_symbolic_modelchecking(self):
+        for kripke, instances in self.problems:
+            for formula, solution, Fconstraints in instances:
+                S = modelcheck(kripke, formula, F=Fconstraints, symbolic=True)
+
+                self.assertEqual(set(S), solution)
+
+                K = SymbolicKripke.from_kripke(kripke)
+                if Fconstraints is not None:
+                    Fconstraints = [K.encode(P) for P in Fconstraints]
+
+                S = modelcheck(K, formula, F=Fconstraints)
+
+                self.assertEqual(K.get_states_in(S), solution)
+
 
 if __name__ == '__main__':
     unittest.main()
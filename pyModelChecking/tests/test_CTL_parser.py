@@ -39,6 +39,43 @@ class TestCTLParser(unittest.TestCase):
             with self.assertRaises(ErrorType):
                 phi = parser(phi_str)
 
+    def test_parser_cache(self):
+        parser = Parser()
+        self.assertIs(parser._parser, Parser()._parser)
+
+        import pyModelChecking.LTL as LTL
+        self.assertIsNot(parser._parser, LTL.Parser()._parser)
+
+        phi = parser('A G (p --> E F q)')
+        hits = parser.cache.hits
+        self.assertIs(Parser()('A G (p --> E F q)'), phi)
+        self.assertGreater(parser.cache.hits, hits)
+        self.assertLessEqual(len(parser.cache), Parser.cache_size)
+
+        for i in range(2):
+            with self.assertRaises(UnexpectedToken):
+                parser('p and')
+        self.assertNotIn('p and', parser.cache)
+
+    def test_parse_stream(self):
+        lines = [phi_str for _, phi_str in self.same_formulas]
+        lines += [phi_str.replace('\n', ' ')
+                  for phi_str, _ in self.wrong_formulas]
+        expected = [psi for psi, _ in self.same_formulas]
+        expected += [ErrorType for _, ErrorType in self.wrong_formulas]
+
+        for processes in [None, 2]:
+            parsed = list(Parser().parse_stream(['', '# comment'] + lines,
+                                                processes=processes))
+
+            self.assertEqual([line_no for line_no, _ in parsed],
+                             list(range(3, len(lines)+3)))
+            for (_, phi), psi in zip(parsed, expected):
+                if isinstance(phi, Exception):
+                    self.assertIsInstance(phi, psi)
+                else:
+                    self.assertIs(phi, psi)
+
 
 if __name__ == '__main__':
     unittest.main()
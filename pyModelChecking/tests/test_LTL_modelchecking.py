@@ -1,6 +1,8 @@
 from pyModelChecking import Kripke
 from pyModelChecking.LTL import *
+from pyModelChecking.LTL.automata import BuchiAutomaton
 
+import random
 import unittest
 
 
@@ -36,6 +38,152 @@ class TestLTLModelChecking(unittest.TestCase):
 
                 self.assertEqual(set(S), solution)
 
+    def test_modelcheck_many(self):
+        for kripke, instances in self.problems:
+            for formula, solution, Fconstraints in instances:
+                formulas = [formula, formula]
+                S, stats = modelcheck_many(kripke, formulas, F=Fconstraints)
+
+                self.assertEqual(S, [solution, solution])
+                self.assertEqual(stats['formulas'], 2)
+                self.assertGreater(stats['shared'], 0)
+
+    def test_formulas_built_from_strings(self):
+        # hash-consing returns this very object when the closure of the
+        # parsed formula is built, so its height must be right
+        phi = Or('p', 'q', True)
+        self.assertEqual(phi.height, 1)
+        self.assertEqual(Not(phi).height, 2)
+
+        K = Kripke(R=[(0, 0)], L={0: set(['r'])}, S0=[0])
+        phi = Or('p', 'q', 'r')
+        self.assertEqual(phi.height, 1)
+        self.assertEqual(modelcheck(K, 'A(not(p or q or r))'), set())
+        self.assertEqual(modelcheck(K, A(Not(phi))), set())
+
+    def test_fair_paths(self):
+        # the only path violating F q stays in 0 forever and is not fair
+        K = Kripke(R=[(0, 0), (0, 1), (1, 1)], S0=[0],
+                   L={0: set(), 1: set(['p', 'q'])})
+
+        self.assertEqual(modelcheck(K, 'A F q'), set([1]))
+        self.assertEqual(modelcheck(K, 'A F q', F=[set([1])]), set([0, 1]))
+        self.assertEqual(modelcheck(K, 'A G p', F=[set([1])]), set([1]))
+        self.assertEqual(modelcheck(K, 'A G F q', F=[set([0])]), set([1]))
+
+        S, stats = modelcheck_many(K, ['A F q', 'A G F q', 'A(true U q)'],
+                                   F=[set([1])])
+        self.assertEqual(S, [set([0, 1]), set([0, 1]), set([0, 1])])
+
+        # A F q and A(true U q) share the same normalized path formula
+        self.assertEqual(stats, {'formulas': 3, 'subformulas': 2,
+                                 'shared': 1})
+
+    def test_local_modelchecking(self):
+        for kripke, instances in self.problems:
+            for formula, solution, Fconstraints in instances:
+                verdict, state = modelcheck(kripke, formula, F=Fconstraints,
+                                            local=True)
+
+                self.assertEqual(verdict, kripke.S0 <= solution)
+                if verdict:
+                    self.assertEqual(state, None)
+                else:
+                    self.assertIn(state, kripke.S0 - solution)
+
+    def test_fair_local_modelchecking(self):
+        # a local verdict holds iff every initial state is in the global
+        # result under the same fairness constraints
+        def check(K, formula, F):
+            S = set(modelcheck(K, formula, F=F))
+            verdict, state = modelcheck(K, formula, F=F, local=True)
+
+            self.assertEqual(verdict, K.S0 <= S)
+            if verdict:
+                self.assertEqual(state, None)
+            else:
+                self.assertIn(state, K.S0 - S)
+
+        K = Kripke(R=[(0, 0), (0, 1), (1, 1)],
+                   L={0: set(), 1: set(['p', 'q'])}, S0=[0])
+        self.assertEqual(modelcheck(K, 'A F q', F=[set([1])], local=True),
+                         (True, None))
+        self.assertEqual(modelcheck(K, 'A G F q', F=[set([0])], local=True),
+                         (False, 0))
+
+        random.seed(1)
+        formulas = ['A F q', 'A G p', 'A (p U q)', 'A G F q',
+                    'A F G p', 'A G (p --> F q)']
+        for i in range(30):
+            R = [(s, random.randrange(6)) for s in range(6)]
+            R += [(random.randrange(6), random.randrange(6))
+                  for j in range(6)]
+            L = dict([(s, set([ap for ap in 'pq' if random.random() < 0.5]))
+                      for s in range(6)])
+            K = Kripke(R=R, L=L, S0=random.sample(range(6), 2))
+
+            F = [set(random.sample(range(6), random.randint(1, 3)))
+                 for j in range(random.randint(0, 2))]
+            for formula in formulas:
+                check(K, formula, F)
+
+    def test_find_counterexample(self):
+        for kripke, instances in self.problems:
+            for formula, solution, Fconstraints in instances:
+                lasso = find_counterexample(kripke, formula, F=Fconstraints)
+
+                if kripke.S0 <= solution:
+                    self.assertEqual(lasso, None)
+                else:
+                    prefix, cycle = lasso
+                    path = prefix + cycle + cycle[:1]
+
+                    self.assertIn(path[0], kripke.S0 - solution)
+                    for (src, dst) in zip(path, path[1:]):
+                        self.assertIn(dst, kripke.next(src))
+
+        K = Kripke(R=[(0, 1), (1, 0), (1, 2), (2, 2)], S0=[0],
+                   L={0: set(['p']), 1: set(), 2: set(['q'])})
+
+        prefix, cycle = find_counterexample(K, 'A F q')
+        self.assertEqual(set(prefix + cycle), set([0, 1]))
+        self.assertEqual(find_counterexample(K, 'A F q', F=[set([2])]), None)
+        prefix, cycle = find_counterexample(K, 'A G F p')
+        self.assertEqual(cycle, [2])
+        self.assertEqual(find_counterexample(K, 'A X not q'), None)
+
+    def test_n_ary_disjunctions(self):
+        K = Kripke(R=[(0, 0)], L={0: set(['r'])}, S0=[0])
+
+        prefix, cycle = find_counterexample(K, 'A G (not(p or q or r))')
+        self.assertEqual(cycle, [0])
+
+        K = Kripke(R=[(0, 1), (1, 2), (2, 0), (2, 3), (3, 3)], S0=[0, 2],
+                   L={0: set(['p']), 1: set(['q']), 2: set(['r']),
+                      3: set()})
+        for formula in ['A(not(p or q or r))', 'A G (p or q or r)',
+                        'A F (X s or q or G r)', 'A G F (p or q or r)',
+                        'A(not(p and q and r and s) U (p or q or r))']:
+            S = set(modelcheck(K, formula))
+            verdict, state = modelcheck(K, formula, local=True)
+
+            self.assertEqual(verdict, K.S0 <= S)
+            if verdict:
+                self.assertEqual(state, None)
+            else:
+                self.assertIn(state, K.S0 - S)
+
+    def test_buchi_automaton(self):
+        automaton = BuchiAutomaton(F('p'))
+
+        self.assertEqual(len(automaton.accepting), 1)
+        for q in automaton.initial:
+            if automaton.reads(q, set()):
+                self.assertNotIn(q, automaton.accepting[0])
+
+        with self.assertRaises(TypeError):
+            find_counterexample(Kripke(R=[(0, 0)]), 'p')
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,5 +1,7 @@
 from pyModelChecking.BDD import *
+from pyModelChecking.BDD.heuristics import *
 
+import random
 import unittest
 
 
@@ -37,6 +39,150 @@ class TestOBDD(unittest.TestCase):
         self.assertEqual(before_e, after_e)
         self.assertNotEqual(with_e, after_e)
 
+    def test_BDD_manager(self):
+        self.assertIs(BDDNode('c', self.b, BDDNode(0)), self.c)
+        self.assertTrue(set([self.c, ~self.c]) & manager.nodes())
+
+        ordering = ['a', 'b', 'c']
+        f = OBDD('(a & b) | (~a & c)', ordering)
+        g = OBDD('(b & ~c) | (~b & c)', ordering)
+
+        hits = manager.computed.hits
+        self.assertEqual(f & g, f & g)
+        self.assertGreater(manager.computed.hits, hits)
+
+        manager.set_cache_size(2)
+        self.assertLessEqual(len(manager.computed), 2)
+        self.assertEqual(f | g, OBDD('a | b | c', ordering) & (f | g))
+        self.assertLessEqual(len(manager.computed), 2)
+
+        manager.set_cache_size(2**18)
+        manager.clear_cache()
+        self.assertEqual(len(manager.computed), 0)
+
+    def test_BDD_collection(self):
+        ordering = ['a', 'b', 'c', 'd']
+        f = OBDD('(a & b) | (c & d)', ordering)
+        text = '{}'.format(f)
+
+        manager.collect()
+        living = len(manager)
+
+        g = OBDD('(a | b) & (c | ~d)', ordering)
+        row = g.root.handle >> 1
+        self.assertGreater(len(manager), living)
+
+        g = None
+        self.assertGreater(manager.collect(), 0)
+        self.assertEqual(len(manager), living)
+        self.assertIn(row, manager.free)
+
+        self.assertEqual('{}'.format(f), text)
+        self.assertEqual(f & ~f, 0)
+        self.assertEqual(f, OBDD('(c & d) | (b & a)', ordering))
+
+    def test_OBDD_ite(self):
+        ordering = ['a', 'b', 'c']
+        f = OBDD('a | b', ordering)
+        g = OBDD('b & c', ordering)
+        h = OBDD('~a & c', ordering)
+
+        self.assertEqual(f.ite(g, h), OBDD('((a | b) & b & c) | ' +
+                                          '(~(a | b) & ~a & c)', ordering))
+        self.assertEqual(f.ite(g, h), (f & g) | (~f & h))
+        self.assertEqual(f ^ g, (f & ~g) | (~f & g))
+
+        # negations share the nodes of the negated BDDs
+        self.assertEqual((~f).root.handle, f.root.handle ^ 1)
+        self.assertIs(~~f.root, f.root)
+
+        # commuted operands are normalized to the same standard triple
+        f & g
+        hits = manager.computed.hits
+        g & f
+        self.assertGreater(manager.computed.hits, hits)
+
+    def test_deep_OBDD(self):
+        ordering = ['x{}'.format(i) for i in range(5000)]
+
+        conj = BDDNode(True)
+        disj = BDDNode(False)
+        for var in reversed(ordering):
+            conj = BDDNode(var, BDDNode(False), conj)
+            disj = BDDNode(var, disj, BDDNode(True))
+
+        f = OBDD(conj, ordering)
+        g = OBDD(disj, ordering)
+
+        self.assertEqual(f & g, f)
+        self.assertEqual(f | g, g)
+        self.assertEqual(~(~f), f)
+        self.assertEqual(~f | ~g, ~f)
+        self.assertEqual(f.restrict('x2500', False), 0)
+        self.assertEqual(g.restrict('x2500', True), 1)
+        self.assertEqual(len(f.variables()), 5000)
+        self.assertEqual(f.exists(ordering[1:]), OBDD('x0', ordering))
+        self.assertTrue('{}'.format(f).endswith('x4999'))
+        self.assertEqual(f.satcount(), 1)
+        self.assertEqual(g.satcount(), 2**5000 - 1)
+        self.assertEqual(len(f.sample()), 5000)
+
+    def test_OBDD_reordering(self):
+        ordering = ['x0', 'x1', 'x2', 'y0', 'y1', 'y2']
+        text = ('((x0 & y0) | (~x0 & ~y0)) & ((x1 & y1) | (~x1 & ~y1)) & ' +
+                '((x2 & y2) | (~x2 & ~y2))')
+
+        for method in ['sifting', 'window']:
+            f = OBDD(text, ordering)
+            g = OBDD('(x0 & y2) | ~x1', ordering)
+
+            before, after = f.reorder(method=method)
+            self.assertLess(after, before)
+            self.assertEqual(after, len(manager))
+
+            # the ordering is changed in place for all the OBDDs
+            self.assertNotEqual(f.ordering.get_list(), ordering)
+            self.assertEqual(f.ordering, g.ordering)
+            self.assertTrue(f.root.respect_ordering(f.ordering))
+            self.assertTrue(g.root.respect_ordering(g.ordering))
+
+            self.assertEqual(f, OBDD(text, f.ordering))
+            self.assertEqual(g, OBDD('(x0 & y2) | ~x1', g.ordering))
+            self.assertEqual(f & g, OBDD('({}) & ~x1'.format(text) +
+                                         ' | ({}) & x0 & y2'.format(text),
+                                         f.ordering))
+
+        with self.assertRaises(ValueError):
+            f.reorder(method='random')
+
+    def test_ordering_heuristics(self):
+        x = ['x0', 'x1', 'x2']
+        y = ['y0', 'y1', 'y2']
+        conjuncts = ['(x{0} & y{0} | ~x{0} & ~y{0})'.format(i)
+                     for i in range(3)]
+        supports = [support(c) for c in conjuncts]
+
+        self.assertEqual(supports, split_support(' & '.join(conjuncts)))
+        self.assertEqual(split_support('x0 | y0 & x1'), [set(['x0', 'y0',
+                                                              'x1'])])
+
+        interleaved = ['x0', 'y0', 'x1', 'y1', 'x2', 'y2']
+        for heuristic in [dfs_ordering, force_ordering]:
+            self.assertEqual(heuristic(supports, x+y).get_list(),
+                             interleaved)
+
+        self.assertEqual(interleave(x, '_n').get_list(),
+                         ['x0', 'x0_n', 'x1', 'x1_n', 'x2', 'x2_n'])
+
+        text = ' & '.join(conjuncts)
+        parsed = OBDD('lambda {}: {}'.format(','.join(x+y), text))
+        self.assertEqual(parsed.ordering.get_list(), x+y)
+        self.assertEqual(parsed, OBDD(text, x+y))
+
+        ordered = OBDD(text, force_ordering(supports, x+y))
+        self.assertLess(len(ordered.root.descendents()),
+                        len(parsed.root.descendents()))
+
     def test_OBDD(self):
         oa = OBDD(self.a, self.ordering)
         ob = OBDD(self.c, self.ordering)
@@ -83,6 +229,93 @@ class TestOBDD(unittest.TestCase):
         with self.assertRaises(RuntimeError):
             OBDD('lambda c,a: a|~b')
 
+    def test_OBDD_quantification(self):
+        ordering = ['a', 'b', 'c']
+        f = OBDD('(a & b) | (~a & c)', ordering)
+
+        for (variables, result) in [('a', 'b | c'),
+                                    (['b'], 'a | c'),
+                                    (['a', 'c'], '1'),
+                                    ([], '(a & b) | (~a & c)')]:
+            self.assertEqual(f.exists(variables), OBDD(result, ordering))
+
+        self.assertEqual(f.and_exists(OBDD('~b', ordering), 'b'),
+                         OBDD('~a & c', ordering))
+
+        for (variables, result) in [('a', 'b & c'),
+                                    (['b'], '~a & c'),
+                                    (['a', 'c'], '0'),
+                                    ([], '(a & b) | (~a & c)')]:
+            self.assertEqual(f.forall(variables), OBDD(result, ordering))
+
+        g = OBDD('(b & ~c) | (~b & c)', ordering)
+        for variables in [[], ['a'], ['c'], ['a', 'b'], ['a', 'b', 'c']]:
+            self.assertEqual(f.and_exists(g, variables),
+                             (f & g).exists(variables))
+            self.assertEqual(f.and_exists(~f, variables), 0)
+            self.assertEqual(f.and_exists(f, variables), f.exists(variables))
+
+        # the relational product has its own computed table entries
+        f.and_exists(g, ['a', 'c'])
+        hits = manager.computed.hits
+        f.and_exists(g, ['a', 'c'])
+        self.assertGreater(manager.computed.hits, hits)
+
+        with self.assertRaises(RuntimeError):
+            f.and_exists(OBDD('a', ['a']), 'a')
+
+    def test_OBDD_satisfiability(self):
+        ordering = ['a', 'b', 'c']
+        f = OBDD('(a & b) | (~a & c)', ordering)
+
+        self.assertEqual(f.satcount(), 4)
+        self.assertEqual((~f).satcount(), 4)
+        self.assertEqual(f.satcount(['a', 'b', 'c', 'd']), 8)
+        self.assertEqual(OBDD('a', ordering).satcount(['a']), 1)
+        self.assertEqual(OBDD('0', ordering).satcount(), 0)
+        self.assertEqual(OBDD('1', ordering).satcount(), 8)
+
+        with self.assertRaises(RuntimeError):
+            f.satcount(['a', 'b'])
+
+        minterms = [(True, True, False), (True, True, True),
+                    (False, False, True), (False, True, True)]
+        self.assertEqual(sorted([(m['a'], m['b'], m['c'])
+                                 for m in f.minterms()]),
+                         sorted(minterms))
+
+        cubes = list(f.cubes())
+        self.assertEqual(len(cubes), 2)
+        for cube in cubes:
+            restricted = f
+            for var, value in cube.items():
+                restricted = restricted.restrict(var, value)
+            self.assertEqual(restricted, 1)
+
+        rng = random.Random(0)
+        counts = dict()
+        for i in range(400):
+            s = f.sample(rng=rng)
+            counts[(s['a'], s['b'], s['c'])] = counts.get((s['a'], s['b'],
+                                                           s['c']), 0) + 1
+        self.assertEqual(sorted(counts.keys()), sorted(minterms))
+        self.assertGreater(min(counts.values()), 50)
+        self.assertIsNone(OBDD('a & ~a', ordering).sample())
+
+    def test_OBDD_rename(self):
+        ordering = ['a', 'b', 'c']
+        f = OBDD('(a & b) | (~a & c)', ordering)
+
+        for (renaming, result) in [({'a': 'c', 'c': 'a'},
+                                    '(c & b) | (~c & a)'),
+                                   ({'b': 'a', 'a': 'b'},
+                                    '(b & a) | (~b & c)'),
+                                   ({}, '(a & b) | (~a & c)')]:
+            self.assertEqual(f.rename(renaming), OBDD(result, ordering))
+
+        with self.assertRaises(RuntimeError):
+            f.rename({'a': 'd'})
+
 
 if __name__ == '__main__':
     unittest.main()
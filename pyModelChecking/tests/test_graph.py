@@ -1,4 +1,5 @@
 from pyModelChecking.graph import *
+import random
 import unittest
 
 
@@ -42,8 +43,12 @@ class TestDiGraph(unittest.TestCase):
         E = set(self.G.edges_iter()) | set([(0, 3)])
         V = set(self.G.nodes()) | set([0, 3])
 
+        self.assertEqual(self.G.prev(3), set())
+
         self.G.add_edge(0, 3)
 
+        self.assertEqual(self.G.prev(3), set([0]))
+
         self.assertEqual(set(self.G.nodes()), V)
         self.assertEqual(set(self.G.edges_iter()), E)
 
@@ -75,6 +80,25 @@ class TestDiGraph(unittest.TestCase):
 
             self.assertEqual(self.G.next(s), N)
 
+    def test_prev(self):
+
+        for d in set(self.G.nodes()):
+            P = set()
+            for (p, q) in self.G.edges_iter():
+                if d == q:
+                    P.add(p)
+
+            self.assertEqual(self.G.prev(d), P)
+
+        with self.assertRaises(RuntimeError):
+            self.G.prev(5)
+
+    def test_backward_reachable_set(self):
+        self.assertEqual(self.G.get_backward_reachable_set_from([2]),
+                         set([0, 1, 2]))
+        self.assertEqual(self.G.get_backward_reachable_set_from([1, 3]),
+                         set([0, 1, 3]))
+
     def test_reversed(self):
         rG = self.G.get_reversed_graph()
 
@@ -97,6 +121,27 @@ class TestDiGraph(unittest.TestCase):
 
             self.assertIn((s, d), GE)
 
+    def test_subgraph_view(self):
+        Vp = set([0, 1, 4, 5])
+        SG = self.G.get_subgraph(Vp)
+
+        for view in [self.G.get_subgraph_view(Vp),
+                     self.G.get_subgraph_view(predicate=(lambda v: v in Vp))]:
+            self.assertEqual(set(view.nodes()), set(SG.nodes()))
+            self.assertEqual(set(view.edges_iter()), set(SG.edges_iter()))
+            self.assertEqual(view.next(0), set([1]))
+            self.assertEqual(view.prev(0), set([1]))
+            self.assertEqual(view.get_reachable_set_from([4]), set([4]))
+
+            SCCs = set([frozenset(s) for s in compute_SCCs(view)])
+            self.assertEqual(SCCs, set([frozenset([0, 1]), frozenset([4])]))
+
+            with self.assertRaises(RuntimeError):
+                view.next(2)
+
+            with self.assertRaises(RuntimeError):
+                view.add_edge(0, 4)
+
     def test_strongly_connected_components(self):
         SCCs = set([frozenset([0, 1]), frozenset([2]), frozenset([3]),
                     frozenset([4])])
@@ -106,6 +151,117 @@ class TestDiGraph(unittest.TestCase):
 
         self.assertEqual(computed_SCCs, SCCs)
 
+    def test_parallel_strongly_connected_components(self):
+        random.seed(0)
+        E = [(random.randrange(200), random.randrange(200))
+             for i in range(300)]
+        G = DiGraph(range(200), E)
+        view = G.freeze().get_subgraph_view(range(0, 200, 2))
+
+        for graph in [self.G, G, view]:
+            SCCs = set([frozenset(s) for s in compute_SCCs(graph)])
+
+            for threshold in [0, 1, 10]:
+                list_SCCs = [frozenset(s) for s in
+                             compute_SCCs_in_parallel(graph, 2, threshold)]
+
+                self.assertEqual(len(list_SCCs), len(SCCs))
+                self.assertEqual(set(list_SCCs), SCCs)
+
+            try:
+                enable_parallel_SCCs(processes=2, threshold=0)
+                computed_SCCs = set([frozenset(s)
+                                     for s in compute_SCCs(graph)])
+            finally:
+                disable_parallel_SCCs()
+
+            self.assertEqual(computed_SCCs, SCCs)
+
+    def test_parallel_SCCs_pool(self):
+        import pyModelChecking.graph as graph
+
+        G = DiGraph(range(50), [(i, (i*7) % 50) for i in range(50)])
+        SCCs = set([frozenset(s) for s in compute_SCCs(G)])
+        try:
+            enable_parallel_SCCs(processes=2, threshold=0)
+            for i in range(3):
+                computed_SCCs = set([frozenset(s)
+                                     for s in compute_SCCs(G)])
+                self.assertEqual(computed_SCCs, SCCs)
+
+                # all the decompositions share the same pool
+                if i == 0:
+                    pool = graph._pool
+                self.assertIsNotNone(pool)
+                self.assertIs(graph._pool, pool)
+
+            # a different number of processes requires a new pool
+            computed_SCCs = set([frozenset(s) for s in
+                                 compute_SCCs_in_parallel(G, 3, 0)])
+            self.assertEqual(computed_SCCs, SCCs)
+            self.assertIs(graph._pool, pool)
+        finally:
+            disable_parallel_SCCs()
+
+        self.assertIsNone(graph._pool)
+
+    def test_sequential_SCCs_without_shared_memory(self):
+        # multiprocessing.shared_memory is missing before Python 3.8
+        import os
+        import subprocess
+        import sys
+
+        code = ('import sys\n'
+                'sys.modules["multiprocessing.shared_memory"] = None\n'
+                'from pyModelChecking import Kripke\n'
+                'import pyModelChecking.CTL as CTL\n'
+                'K = Kripke(R=[(0, 1), (1, 0)], L={0: set(["p"])})\n'
+                'assert CTL.modelcheck(K, "E G E F p") == set([0, 1])\n')
+
+        root = os.path.dirname(os.path.dirname(os.path.dirname(
+            os.path.abspath(__file__))))
+        subprocess.check_call([sys.executable, '-c', code], cwd=root)
+
+
+class TestFrozenDiGraph(TestDiGraph):
+
+    def setUp(self):
+        self.V = set([0, 1, 3, 4])
+        self.E = set([(0, 2), (2, 2), (0, 1), (1, 0)])
+
+        self.G = DiGraph(self.V, self.E).freeze()
+
+    def test_init(self):
+        super(TestFrozenDiGraph, self).test_init()
+
+        G = FrozenDiGraph(self.V, list(self.E)+list(self.E))
+
+        self.assertEqual(set(G.edges_iter()), self.E)
+
+        with self.assertRaises(RuntimeError):
+            FrozenDiGraph(E=[(0, 1, 2)])
+
+    def test_add_node(self):
+        with self.assertRaises(RuntimeError):
+            self.G.add_node(5)
+
+    def test_add_edge(self):
+        with self.assertRaises(RuntimeError):
+            self.G.add_edge(0, 3)
+
+    def test_next(self):
+        super(TestFrozenDiGraph, self).test_next()
+
+        with self.assertRaises(RuntimeError):
+            self.G.next(5)
+
+    def test_reachable_set(self):
+        self.assertEqual(self.G.get_reachable_set_from([1]), set([0, 1, 2]))
+        self.assertEqual(self.G.get_reachable_set_from([2, 3]), set([2, 3]))
+
+        rG = self.G.get_reversed_graph()
+        self.assertEqual(rG.get_reachable_set_from([2]), set([0, 1, 2]))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,5 +1,9 @@
 from pyModelChecking.kripke import *
+from pyModelChecking.cache import LRUCache
+import pyModelChecking.CTL as CTL
+import pyModelChecking.LTL as LTL
 import unittest
+import sys
 
 
 class TestKripke(unittest.TestCase):
@@ -48,6 +52,40 @@ class TestKripke(unittest.TestCase):
         with self.assertRaises(RuntimeError):
             self.K.labels('a')
 
+    def test_states_labelled_by(self):
+        self.assertEqual(self.K.states_labelled_by('p'), set([1, 2]))
+        self.assertEqual(self.K.states_labelled_by('q'), set([1, 2, 3]))
+        self.assertEqual(self.K.states_labelled_by('r'), set())
+
+        C = self.K.clone()
+        C.label_states([0, 3], 'p')
+        C.label_states([0], 'r')
+        self.assertEqual(C.states_labelled_by('p'), set([0, 1, 2, 3]))
+        self.assertEqual(C.labels(), set(['p', 'q', 'r']))
+        self.assertEqual(self.K.states_labelled_by('p'), set([1, 2]))
+        self.assertEqual(self.K.labels(), set(['p', 'q']))
+
+        # changing the label sets or the labelling function returned by
+        # the structure never leaves the index stale
+        self.K.labels(0).add('p')
+        self.assertEqual(self.K.states_labelled_by('p'), set([0, 1, 2]))
+        labels = self.K.labels(1)
+        labels -= set(['p'])
+        self.assertEqual(self.K.states_labelled_by('p'), set([0, 2]))
+        L = self.K.labelling_function()
+        L[3] = set(['p'])
+        self.assertEqual(self.K.states_labelled_by('p'), set([0, 2, 3]))
+        L[3].clear()
+        L.update({2: set(['r'])})
+        self.assertEqual(self.K.states_labelled_by('p'), set([0]))
+        self.assertEqual(self.K.states_labelled_by('r'), set([2]))
+        self.assertEqual(C.states_labelled_by('p'), set([0, 1, 2, 3]))
+
+        self.K.replace_labelling_function({0: set(['r'])})
+        self.assertEqual(self.K.states_labelled_by('r'), set([0]))
+        self.assertEqual(self.K.states_labelled_by('p'), set())
+        self.assertEqual(self.K.labels(), set(['r']))
+
     def test_next(self):
 
         for s in self.K.nodes():
@@ -61,6 +99,177 @@ class TestKripke(unittest.TestCase):
         with self.assertRaises(RuntimeError):
             self.K.next('a')
 
+    def test_substructure(self):
+        K = self.K.get_substructure(set([0, 1, 2]))
+
+        self.assertEqual(set(K.states()), set([0, 1, 2]))
+        for v in K.states():
+            self.assertEqual(K.labels(v), self.K.labels(v))
+
+    def test_substructure_view(self):
+        K = self.K.get_substructure(set([0, 1, 2]))
+
+        for view in [self.K.get_substructure_view(set([0, 1, 2, 7])),
+                     self.K.get_substructure_view(lambda s: s != 3)]:
+            self.assertEqual(set(view.states()), set(K.states()))
+            self.assertEqual(set(view.transitions()), set(K.transitions()))
+            self.assertEqual(view.S0, K.S0)
+            self.assertEqual(view.labels(), K.labels())
+            self.assertEqual(view.labels(2), K.labels(2))
+
+            with self.assertRaises(RuntimeError):
+                view.labels(3)
+
+    def test_result_cache(self):
+        self.assertIsNone(self.K.result_cache())
+
+        cache = self.K.enable_result_cache()
+        self.assertIs(self.K.result_cache(), cache)
+
+        for (Lang, formula) in [(CTL, 'E F q'), (LTL, 'A G q')]:
+            S = Lang.modelcheck(self.K, formula)
+            self.assertIsInstance(S, frozenset)
+            self.assertIs(Lang.modelcheck(self.K, formula), S)
+            self.assertIsNot(Lang.modelcheck(self.K, formula, F=[]), S)
+
+        self.assertEqual(len(cache), 4)
+        self.assertEqual(cache.hits, 2)
+
+        self.K.replace_labelling_function(dict(self.L))
+        self.assertEqual(len(cache), 0)
+
+        K = Kripke(self.S, self.S0, self.R, self.L)
+        cache = K.enable_result_cache()
+
+        S = CTL.modelcheck(K, 'E X p')
+        K.add_edge(3, 1)
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(CTL.modelcheck(K, 'E X p'), S | set([3]))
+
+        K.disable_result_cache()
+        self.assertIsInstance(CTL.modelcheck(K, 'E X p'), set)
+
+    def test_fair_states(self):
+        fair = self.K.get_fair_states([set([0])])
+        self.assertEqual(fair, set([0, 1]))
+        self.assertIs(self.K.get_fair_states([set([0])]), fair)
+        self.assertEqual(self.K.get_fair_states([set([0]), set([2])]),
+                         set())
+        self.assertEqual(self.K.get_fair_states([]), set([0, 1, 2, 3]))
+
+        labels = dict((v, set(self.K.labels(v))) for v in self.K.states())
+        self.assertEqual(CTL.modelcheck(self.K, 'E F q', F=[set([0])]),
+                         set([0, 1]))
+        self.assertEqual(dict((v, self.K.labels(v))
+                              for v in self.K.states()), labels)
+
+        K = Kripke(self.S, self.S0, self.R, self.L)
+        self.assertEqual(K.get_fair_states([set([0])]), set([0, 1]))
+        K.add_edge(3, 1)
+        self.assertEqual(K.get_fair_states([set([0])]), set([0, 1, 3]))
+
+    def test_clone(self):
+        C = self.K.clone()
+        self.assertEqual(set(C.states()), set(self.K.states()))
+        self.assertEqual(set(C.transitions()), set(self.K.transitions()))
+        self.assertEqual(C.S0, self.K.S0)
+
+        C.label_states([0, 2], 'r')
+        self.K.label_states([3], 's')
+        for s in self.K.states():
+            self.assertEqual(C.labels(s) - set(['r', 's']),
+                             self.K.labels(s) - set(['r', 's']))
+            self.assertEqual('r' in C.labels(s), s in [0, 2])
+            self.assertNotIn('r', self.K.labels(s))
+            self.assertNotIn('s', C.labels(s))
+        self.assertEqual(C.labels(), set(['p', 'q', 'r']))
+
+        D = self.K.clone()
+        self.assertEqual(D.labels(3), set(['q', 's']))
+        self.assertIs(self.K.clone()._labels.base, D._labels.base)
+
+        # label sets are live, but changing them never affects a clone
+        labels = self.K.labels(0)
+        labels.add('z')
+        self.assertIs(self.K.labels(0), labels)
+        self.assertEqual(self.K.labels(0), set(['z']))
+        self.assertEqual(C.labels(0), set(['r']))
+        self.assertEqual(D.labels(0), set())
+        E = self.K.clone()
+        labels.discard('z')
+        self.assertEqual(E.labels(0), set(['z']))
+        E.labels(1).add('w')
+        self.assertNotIn('w', self.K.labels(1))
+        self.assertNotIn('w', C.labels(1))
+
+        L = self.K.labelling_function()
+        self.assertIsInstance(L, dict)
+        self.assertIs(self.K.labelling_function(), L)
+        L[0] = set(['z'])
+        self.assertEqual(self.K.labels(0), set(['z']))
+        self.assertEqual(D.labels(0), set())
+        L = E.labelling_function()
+        self.assertEqual(set(L), set(E.states()))
+        L[1].add('y')
+        self.assertEqual(E.labels(1), set(['p', 'q', 'w', 'y']))
+        self.assertEqual(self.K.labels(1), set(['p', 'q']))
+
+        old_L = C.replace_labelling_function({0: set(['x'])})
+        self.assertIsInstance(old_L, dict)
+        self.assertEqual(old_L[0], set(['r']))
+        old_L[1].add('v')
+        self.assertEqual(C.labels(0), set(['x']))
+        self.assertEqual(C.labels(1), set())
+        self.assertEqual(C.states_labelled_by('v'), set())
+        self.assertEqual(self.K.labels(0), set(['z']))
+
+        with self.assertRaises(RuntimeError):
+            self.K.label_states([0, 'a'], 'p')
+
+        if isinstance(self.K, FrozenKripke):
+            return
+
+        C.add_edge(3, 0)
+        self.K.add_edge(3, 1)
+        self.assertEqual(C.next(3), set([0, 2]))
+        self.assertEqual(self.K.next(3), set([1, 2]))
+        self.assertEqual(D.next(3), set([2]))
+        self.assertEqual(C.prev(0), set([1, 3]))
+        self.assertEqual(D.prev(0), set([1]))
+
+    def test_LRU_cache(self):
+        cache = LRUCache(max_entries=2)
+        for i in range(3):
+            cache[i] = frozenset([i])
+        cache.get(1)
+        cache[3] = frozenset()
+
+        self.assertEqual(set([i for i in range(4) if i in cache]),
+                         set([1, 3]))
+
+        cache = LRUCache(max_memory=2*sys.getsizeof(frozenset(range(10))))
+        for i in range(4):
+            cache[i] = frozenset(range(10))
+
+        self.assertEqual(len(cache), 2)
+        self.assertLessEqual(cache.memory, cache.max_memory)
+
+
+class TestFrozenKripke(TestKripke):
+
+    def setUp(self):
+        super(TestFrozenKripke, self).setUp()
+
+        self.K = self.K.freeze()
+
+    def test_freeze(self):
+        self.assertIsInstance(self.K, FrozenKripke)
+        self.assertIs(self.K.freeze(), self.K)
+        self.assertEqual(self.K.S0, set([0, 1]))
+
+        with self.assertRaises(RuntimeError):
+            self.K.add_edge(3, 0)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,122 @@
+from pyModelChecking.kripke import Kripke
+from pyModelChecking.symbolic_kripke import *
+from pyModelChecking.BDD import reorder
+import unittest
+
+
+class TestSymbolicKripke(unittest.TestCase):
+
+    def setUp(self):
+        # a 2-bit counter (x, y) that can either increment or reset
+        self.K = SymbolicKripke(['x', 'y'], S0='~x & ~y',
+                                R='(~x_next & ~y_next) | ' +
+                                  '(x_next & (x & ~y | ~x & y) | ' +
+                                  '~x_next & (x & y | ~x & ~y)) & ' +
+                                  '(y_next & ~y | ~y_next & y)',
+                                L={'p': 'x & y'})
+
+        self.E = Kripke(R=[(0, 1), (1, 2), (1, 0), (2, 0), (2, 2)],
+                        S0=[0], L={0: set(['p']), 2: set(['q'])})
+
+    def test_init(self):
+        self.assertEqual(self.K.labels(), set(['p']))
+        self.assertEqual(self.K.get_states_in(self.K.S0),
+                         set([(False, False)]))
+
+        with self.assertRaises(RuntimeError):
+            SymbolicKripke(['x'], S0='x', R='x & x_next')
+
+        with self.assertRaises(TypeError):
+            SymbolicKripke(['x'], S0=1, R=True)
+
+    def test_static_ordering(self):
+        variables = ['x0', 'x1', 'y0', 'y1']
+        R = ('(y0_next & x0 | ~y0_next & ~x0) & ' +
+             '(y1_next & x1 | ~y1_next & ~x1) & ' +
+             '(x0_next | ~x0_next) & (x1_next | ~x1_next)')
+
+        for method in ['dfs', 'force']:
+            self.assertEqual(SymbolicKripke.static_ordering(variables,
+                                                            True, R,
+                                                            method=method),
+                             ['x0', 'y0', 'x1', 'y1'])
+
+        K = SymbolicKripke(variables, S0='~y0 & ~y1', R=R,
+                           L={'p': 'x0 & y1'}, ordering='force',
+                           formulas=['A G p'])
+        ordering = K.ordering.get_list()
+        self.assertEqual(sorted(ordering[0::2]), variables)
+        self.assertEqual(ordering[1::2],
+                         [var+'_next' for var in ordering[0::2]])
+        self.assertEqual(K.get_states_in(K.post('x0 & ~x1 & ~y0 & ~y1')),
+                         set([(x0, x1, True, False)
+                              for x0 in [False, True]
+                              for x1 in [False, True]]))
+
+        with self.assertRaises(ValueError):
+            SymbolicKripke(variables, S0=True, R=R, ordering='random')
+
+    def test_images(self):
+        K = self.K
+
+        self.assertEqual(K.get_states_in(K.post('~x & ~y')),
+                         set([(False, False), (False, True)]))
+        self.assertEqual(K.get_states_in(K.pre('x & y')),
+                         set([(True, False)]))
+        self.assertEqual(K.get_states_in(K.get_reachable_states()),
+                         K.get_states_in(True))
+        self.assertEqual(K.count_states_in(K.get_reachable_states()), 4)
+        self.assertEqual(K.count_states_in(K.post('~x & ~y')), 2)
+
+    def test_from_kripke(self):
+        K = SymbolicKripke.from_kripke(self.E)
+
+        self.assertEqual(K.get_states_in(True), set(self.E.states()))
+        self.assertEqual(K.get_states_in(K.S0), self.E.S0)
+        for AP in self.E.labels():
+            self.assertEqual(K.get_states_in(K.states_labelled_by(AP)),
+                             set([s for s in self.E.states()
+                                  if AP in self.E.labels(s)]))
+
+        for s in self.E.states():
+            self.assertEqual(K.get_states_in(K.post(K.encode([s]))),
+                             self.E.next(s))
+
+        with self.assertRaises(RuntimeError):
+            K.encode([3])
+
+    def test_count_states(self):
+        K = SymbolicKripke.from_kripke(self.E)
+
+        self.assertEqual(K.count_states_in(True), len(self.E.states()))
+        self.assertEqual(K.count_states_in(K.encode([0, 2])), 2)
+        self.assertEqual(K.count_states_in(False), 0)
+
+    def test_reordering(self):
+        K = SymbolicKripke.from_kripke(self.E)
+        reorder(K.ordering)
+
+        self.assertEqual(K.get_states_in(True), set(self.E.states()))
+        for s in self.E.states():
+            self.assertEqual(K.get_states_in(K.post(K.encode([s]))),
+                             set(self.E.next(s)))
+            self.assertEqual(K.get_states_in(K.encode([s])), set([s]))
+
+    def test_fair_states(self):
+        K = SymbolicKripke.from_kripke(self.E)
+
+        for F, fair_states in [([], set([0, 1, 2])),
+                               ([set([1])], set([0, 1, 2])),
+                               ([set([2]), set([0, 1])], set([0, 1, 2]))]:
+            F = [K.encode(P) for P in F]
+            self.assertEqual(K.get_states_in(K.get_fair_states(F)),
+                             fair_states)
+
+        F = [K.encode(set([1]))]
+        self.assertEqual(K.get_states_in(K.get_fair_states(F,
+                                                           K.encode([1, 2]))),
+                         set())
+
+
+if __name__ == '__main__':
+    unittest.main()